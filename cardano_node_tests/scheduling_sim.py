@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Simulate scheduling of recorded tests on cluster instances.
+
+Replay tests recorded in scheduling events log (`SCHEDULING_EVENTS_LOG`) with different
+scheduling policies and predict total wall-clock time and utilization of cluster instances.
+"""
+import argparse
+import logging
+import statistics
+import sys
+from typing import List
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import scheduling_sim
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_args() -> argparse.Namespace:
+    """Get command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument(
+        "-e",
+        "--events-log",
+        required=True,
+        type=helpers.check_file_arg,
+        help="Path to scheduling events log",
+    )
+    parser.add_argument(
+        "-i",
+        "--instances",
+        type=int,
+        nargs="+",
+        help="Number(s) of cluster instances to simulate (default: as recorded)",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        help="Number of pytest workers (default: as recorded)",
+    )
+    parser.add_argument(
+        "-r",
+        "--restart-duration",
+        type=float,
+        help="Duration of cluster restart in seconds (default: mean of recorded restarts)",
+    )
+    parser.add_argument(
+        "--drop-marks",
+        action="store_true",
+        help="Ignore marks of tests that don't use custom start command",
+    )
+    parser.add_argument(
+        "--drop-epoch-profiles",
+        action="store_true",
+        help="Ignore epoch-time profiles of tests, i.e. don't co-locate tests waiting for epochs",
+    )
+    parser.add_argument(
+        "--drop-resource",
+        action="append",
+        default=[],
+        help="Ignore the resource when locked or used by tests (can be repeated)",
+    )
+    return parser.parse_args()
+
+
+def _format_result(
+    result: scheduling_sim.SimResult, session: scheduling_sim.SimSession
+) -> List[str]:
+    policy = result.policy
+    lines = [
+        f"instances: {policy.num_instances}, workers: {policy.num_workers}, "
+        f"wall-clock: {result.wall_clock:.0f}s, restarts: {result.restarts}",
+    ]
+    for reason, wait_time in sorted(result.wait_times.items()):
+        lines.append(f"  wait '{reason}': {wait_time:.0f}s")
+    # the recorded utilization is comparable only for the same number of instances
+    actual = session.utilization if policy.num_instances == session.num_instances else {}
+    for instance_num, utilization in sorted(result.utilization.items()):
+        restarting = result.instance_restarting.get(instance_num, 0.0)
+        actual_str = (
+            f" (actual {actual.get(instance_num, 0.0):.1%})" if instance_num in actual else ""
+        )
+        lines.append(
+            f"  c{instance_num}: utilization {utilization:.1%}{actual_str}, "
+            f"restarting {restarting:.0f}s"
+        )
+    return lines
+
+
+def main() -> int:
+    logging.basicConfig(
+        format="%(name)s:%(levelname)s:%(message)s",
+        level=logging.INFO,
+    )
+    args = get_args()
+
+    session = scheduling_sim.load_session(args.events_log)
+    if not session.tests:
+        LOGGER.error("No finished tests found in the events log")
+        return 1
+
+    restart_duration = args.restart_duration
+    if restart_duration is None:
+        restart_duration = (
+            statistics.mean(session.restart_durations)
+            if session.restart_durations
+            else scheduling_sim.DEFAULT_RESTART_DURATION
+        )
+
+    epoch_tests = sum(1 for t in session.tests if t.epoch_profile.boundaries > 0)
+    print(
+        f"recorded: {len(session.tests)} tests ({epoch_tests} waiting for epochs), "
+        f"instances: {session.num_instances}, workers: {session.num_workers}, "
+        f"wall-clock: {session.wall_clock:.0f}s"
+    )
+    for instance_num, utilization in sorted(session.utilization.items()):
+        print(f"  c{instance_num}: utilization {utilization:.1%}")
+
+    for num_instances in args.instances or [session.num_instances]:
+        policy = scheduling_sim.SimPolicy(
+            num_instances=num_instances,
+            num_workers=args.workers or session.num_workers,
+            restart_duration=restart_duration,
+            drop_marks=args.drop_marks,
+            drop_epoch_profiles=args.drop_epoch_profiles,
+            drop_resources=set(args.drop_resource),
+        )
+        result = scheduling_sim.simulate(session=session, policy=policy)
+        print("\n".join(_format_result(result=result, session=session)))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
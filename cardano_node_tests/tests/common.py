@@ -1,5 +1,4 @@
 import logging
-import time
 from typing import Any
 from typing import Set
 from typing import Tuple
@@ -11,6 +10,7 @@ from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import fork_detection
 from cardano_node_tests.utils import pytest_utils
 from cardano_node_tests.utils.versions import VERSIONS
 
@@ -127,65 +127,49 @@ def detect_fork(
     cluster_manager: cluster_management.ClusterManager,
     cluster_obj: clusterlib.ClusterLib,
     temp_template: str,
+    tips_only: bool = False,
 ) -> Tuple[Set[str], Set[str]]:
-    """Detect if one or more nodes have forked blockchain or is out of sync."""
-    forked_nodes: Set[str] = set()
-    unsynced_nodes: Set[str] = set()
+    """Detect if one or more nodes have forked blockchain or is out of sync.
 
+    All nodes are queried concurrently. With `tips_only`, only tips of the nodes are compared.
+    Otherwise a new UTxO is created and the nodes are compared by their view of it.
+    """
     known_nodes = cluster_nodes.get_cluster_type().NODES
     if len(known_nodes) <= 1:
         LOGGER.warning("WARNING: Not enough nodes available to detect forks, skipping the check.")
-        return forked_nodes, unsynced_nodes
-
-    instance_num = cluster_nodes.get_instance_num()
-
-    # create a UTxO
-    payment_rec = cluster_obj.gen_payment_addr_and_keys(
-        name=temp_template,
-    )
-    tx_raw_output = clusterlib_utils.fund_from_faucet(
-        payment_rec,
-        cluster_obj=cluster_obj,
-        faucet_data=cluster_manager.cache.addrs_data["user1"],
-        amount=2_000_000,
-    )
-    assert tx_raw_output
-    utxos = cluster_obj.get_utxo(tx_raw_output=tx_raw_output)
-
-    # check if all nodes know about the UTxO
-    for node in known_nodes:
-        # set 'CARDANO_NODE_SOCKET_PATH' to point to socket of the selected node
-        cluster_nodes.set_cluster_env(instance_num=instance_num, socket_file_name=f"{node}.socket")
-
-        for __ in range(5):
-            if float(cluster_obj.get_tip()["syncProgress"]) == 100:
-                break
-            time.sleep(1)
-        else:
-            unsynced_nodes.add(node)
-            continue
-
-        if not cluster_obj.get_utxo(utxo=utxos):
-            forked_nodes.add(node)
-
-    # restore 'CARDANO_NODE_SOCKET_PATH' to original value
-    cluster_nodes.set_cluster_env(instance_num=instance_num)
-
-    # forked nodes are the ones that differ from the majority of nodes
-    if forked_nodes and len(forked_nodes) > (len(known_nodes) // 2):
-        forked_nodes = known_nodes - forked_nodes
-
-    return forked_nodes, unsynced_nodes
+        return set(), set()
+
+    address = ""
+    if not tips_only:
+        # create a UTxO
+        payment_rec = cluster_obj.gen_payment_addr_and_keys(
+            name=temp_template,
+        )
+        tx_raw_output = clusterlib_utils.fund_from_faucet(
+            payment_rec,
+            cluster_obj=cluster_obj,
+            faucet_data=cluster_manager.cache.addrs_data["user1"],
+            amount=2_000_000,
+        )
+        assert tx_raw_output
+        address = payment_rec.address
+
+    report = fork_detection.detect_fork(cluster_obj=cluster_obj, address=address)
+    return report.forked_nodes, report.unsynced_nodes
 
 
 def fail_on_fork(
     cluster_manager: cluster_management.ClusterManager,
     cluster_obj: clusterlib.ClusterLib,
     temp_template: str,
+    tips_only: bool = False,
 ) -> None:
     """Fail if one or more nodes have forked blockchain or is out of sync."""
     forked_nodes, unsynced_nodes = detect_fork(
-        cluster_manager=cluster_manager, cluster_obj=cluster_obj, temp_template=temp_template
+        cluster_manager=cluster_manager,
+        cluster_obj=cluster_obj,
+        temp_template=temp_template,
+        tips_only=tips_only,
     )
 
     err_msg = []
@@ -14,6 +14,7 @@ from _pytest.tmpdir import TempPathFactory
 from cardano_clusterlib import clusterlib
 from xdist import workermanage
 
+from cardano_node_tests.utils import active_slots
 from cardano_node_tests.utils import artifacts
 from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import cluster_nodes
@@ -23,6 +24,7 @@ from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import temptools
 from cardano_node_tests.utils import testnet_cleanup
+from cardano_node_tests.utils import wakeup
 from cardano_node_tests.utils.versions import VERSIONS
 
 LOGGER = logging.getLogger(__name__)
@@ -189,6 +191,27 @@ def _save_env_for_allure(pytest_config: Config) -> None:
             infile.write(f"{name}={v}\n")
 
 
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item: Any) -> Generator[None, None, None]:
+    """Take an active slot before setup of the test, if active slots are enabled."""
+    # pylint: disable=protected-access
+    pytest_root_tmp = temptools.get_pytest_root_tmp(item.config._tmp_path_factory)
+    worker_id = getattr(item.config, "workerinput", {}).get("workerid", "master")
+    slots = active_slots.init(pytest_tmp_dir=pytest_root_tmp, worker_id=worker_id)
+    if slots:
+        slots.acquire()
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item: Any) -> Generator[None, None, None]:
+    """Give up the active slot after teardown of the test."""
+    # pylint: disable=unused-argument
+    yield
+    if active_slots.ActiveSlots.current:
+        active_slots.ActiveSlots.current.release()
+
+
 @pytest.fixture(scope="session")
 def testenv_setup_teardown(
     tmp_path_factory: TempPathFactory, worker_id: str, request: FixtureRequest
@@ -204,6 +227,9 @@ def testenv_setup_teardown(
 
     yield
 
+    # the worker will not wait for cluster instances anymore
+    wakeup.WakeupChannel.close_all()
+
     with locking.FileLockIfXdist(f"{pytest_root_tmp}/{cluster_management.CLUSTER_LOCK}"):
         # save CLI coverage to dir specified by `--cli-coverage-dir`
         cluster_manager_obj = cluster_management.ClusterManager(
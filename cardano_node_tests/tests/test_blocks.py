@@ -83,12 +83,10 @@ class TestLeadershipSchedule:
         cluster.wait_for_new_epoch(new_epochs=1 if for_epoch == "current" else 2)
 
         # get info about minted blocks in queried epoch for the selected pool
-        minted_blocks = list(
-            dbsync_queries.query_blocks(
-                pool_id_bech32=pool_id, epoch_from=queried_epoch, epoch_to=queried_epoch
-            )
+        minted_blocks = dbsync_queries.query_blocks_columns(
+            pool_id_bech32=pool_id, epoch_from=queried_epoch, epoch_to=queried_epoch
         )
-        slots_when_minted = {r.slot_no for r in minted_blocks}
+        slots_when_minted = set(minted_blocks["slot_no"])
 
         errors: List[str] = []
 
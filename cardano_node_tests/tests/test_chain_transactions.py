@@ -1,6 +1,5 @@
 """Tests for transactions chaining."""
 import logging
-import time
 from pathlib import Path
 from typing import Tuple
 
@@ -141,14 +140,13 @@ class TestTxChaining:
             cluster.submit_tx_bare(tx_file=tx_file)
 
         if configuration.HAS_DBSYNC:
-            # wait a bit for all Txs to appear in db-sync
-            time.sleep(5)
-
-            check_tx_outs = [
-                dbsync_utils.check_tx(cluster_obj=cluster, tx_raw_output=t) for t in tx_raw_outputs
-            ]
+            # all the Txs are expected to fit in less than `iterations // 30` blocks, so it is
+            # enough to wait for that many new blocks
+            check_tx_outs = dbsync_utils.check_txs(
+                cluster_obj=cluster, tx_raw_outputs=tx_raw_outputs, retry_num=iterations // 30
+            )
 
-            block_ids = [r.block_id for r in check_tx_outs if r]
+            block_ids = [r.block_id for r in check_tx_outs]
             assert block_ids == sorted(block_ids), "Block IDs of Txs are not ordered"
 
             how_many_blocks = block_ids[-1] - block_ids[0]
@@ -2,8 +2,6 @@
 import functools
 import itertools
 import logging
-from typing import Dict
-from typing import List
 from typing import Set
 
 import allure
@@ -13,6 +11,7 @@ from cardano_clusterlib import clusterlib
 from cardano_node_tests.tests import common
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import ledger_state_view
 
 LOGGER = logging.getLogger(__name__)
 
@@ -64,30 +63,7 @@ class TestLedgerState:
             state_name=temp_template,
             ledger_state=ledger_state,
         )
-        es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-
-        def _get_hashes(snapshot: str) -> Dict[str, int]:
-            hashes: Dict[str, int] = {}
-            for r in es_snapshot[snapshot]["stake"]:
-                r_hash_rec = r[0]
-                r_hash = r_hash_rec.get("script hash") or r_hash_rec.get("key hash")
-                if r_hash in hashes:
-                    hashes[r_hash] += r[1]
-                else:
-                    hashes[r_hash] = r[1]
-            return hashes
-
-        def _get_delegations(snapshot: str) -> Dict[str, List[str]]:
-            delegations: Dict[str, List[str]] = {}
-            for r in es_snapshot[snapshot]["delegations"]:
-                r_hash_rec = r[0]
-                r_hash = r_hash_rec.get("script hash") or r_hash_rec.get("key hash")
-                r_pool_id = r[1]
-                if r_pool_id in delegations:
-                    delegations[r_pool_id].append(r_hash)
-                else:
-                    delegations[r_pool_id] = [r_hash]
-            return delegations
+        ledger_view = ledger_state_view.LedgerStateView(ledger_state)
 
         errors = []
 
@@ -100,14 +76,14 @@ class TestLedgerState:
             )
 
         # stake addresses (hashes) and corresponding amounts
-        stake_mark = _get_hashes("pstakeMark")
-        stake_set = _get_hashes("pstakeSet")
-        stake_go = _get_hashes("pstakeGo")
+        stake_mark = ledger_view.snapshots["mark"].stake
+        stake_set = ledger_view.snapshots["set"].stake
+        stake_go = ledger_view.snapshots["go"].stake
 
         # pools (hashes) and stake addresses (hashes) delegated to corresponding pool
-        delegations_mark = _get_delegations("pstakeMark")
-        delegations_set = _get_delegations("pstakeSet")
-        delegations_go = _get_delegations("pstakeGo")
+        delegations_mark = ledger_view.snapshots["mark"].pool_delegators
+        delegations_set = ledger_view.snapshots["set"].pool_delegators
+        delegations_go = ledger_view.snapshots["go"].pool_delegators
 
         # all delegated stake addresses (hashes)
         delegated_hashes_mark = set(itertools.chain.from_iterable(delegations_mark.values()))
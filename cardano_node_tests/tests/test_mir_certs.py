@@ -19,12 +19,17 @@ from cardano_node_tests.utils.versions import VERSIONS
 LOGGER = logging.getLogger(__name__)
 
 
-def _wait_for_ada_pots(epoch_from: int, expected_len: int = 2) -> List[dbsync_queries.ADAPotsDBRow]:
+def _wait_for_ada_pots(
+    cluster_obj: clusterlib.ClusterLib, epoch_from: int, expected_len: int = 2
+) -> List[dbsync_queries.ADAPotsDBRow]:
+    # ADA pots are recorded when db-sync indexes the first block of an epoch
+    dbsync_utils.wait_for_tip(cluster_obj=cluster_obj)
+
     pots_records = []
     for r in range(4):
         if r > 0:
             LOGGER.warning(f"Repeating the `ada_pots` SQL query for the {r} time.")
-            time.sleep(2 + r * r)
+            dbsync_utils.wait_for_new_block()
         pots_records = list(dbsync_queries.query_ada_pots(epoch_from=epoch_from))
         if len(pots_records) == expected_len:
             break
@@ -176,7 +181,7 @@ class TestMIRCerts:
 
             cluster.wait_for_new_epoch()
 
-            pots_records = _wait_for_ada_pots(epoch_from=tx_epoch)
+            pots_records = _wait_for_ada_pots(cluster_obj=cluster, epoch_from=tx_epoch)
             # normally `treasury[-1]` > `treasury[-2]`
             assert (pots_records[-1].treasury - pots_records[-2].treasury) > amount
             # normally `reserves[-1]` < `reserves[-2]`
@@ -250,7 +255,7 @@ class TestMIRCerts:
 
             cluster.wait_for_new_epoch()
 
-            pots_records = _wait_for_ada_pots(epoch_from=tx_epoch)
+            pots_records = _wait_for_ada_pots(cluster_obj=cluster, epoch_from=tx_epoch)
             # normally `treasury[-1]` > `treasury[-2]`
             assert (pots_records[-1].treasury - pots_records[-2].treasury) > amount
             # normally `reserves[-1]` < `reserves[-2]`
@@ -328,7 +333,7 @@ class TestMIRCerts:
 
             cluster.wait_for_new_epoch()
 
-            pots_records = _wait_for_ada_pots(epoch_from=tx_epoch)
+            pots_records = _wait_for_ada_pots(cluster_obj=cluster, epoch_from=tx_epoch)
             # normally `treasury[-1]` > `treasury[-2]`
             assert pots_records[-1].treasury < pots_records[-2].treasury
             # normally `reserves[-1]` < `reserves[-2]`
@@ -402,7 +407,7 @@ class TestMIRCerts:
 
             cluster.wait_for_new_epoch()
 
-            pots_records = _wait_for_ada_pots(epoch_from=tx_epoch)
+            pots_records = _wait_for_ada_pots(cluster_obj=cluster, epoch_from=tx_epoch)
             # normally `treasury[-1]` > `treasury[-2]`
             assert pots_records[-1].treasury < pots_records[-2].treasury
             # normally `reserves[-1]` < `reserves[-2]`
@@ -1028,7 +1033,7 @@ class TestMIRCerts:
 
         if tx_db_record:
             # check that the amount was not transferred out of the pot
-            pots_records = _wait_for_ada_pots(epoch_from=tx_epoch)
+            pots_records = _wait_for_ada_pots(cluster_obj=cluster, epoch_from=tx_epoch)
 
             if fund_src == self.TREASURY:
                 # normally `treasury[-1]` > `treasury[-2]`
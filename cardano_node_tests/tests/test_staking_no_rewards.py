@@ -13,6 +13,7 @@ from cardano_node_tests.tests import delegation
 from cardano_node_tests.tests import kes
 from cardano_node_tests.utils import cluster_management
 from cardano_node_tests.utils import clusterlib_utils
+from cardano_node_tests.utils import epoch_batching
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils.versions import VERSIONS
 
@@ -21,7 +22,13 @@ LOGGER = logging.getLogger(__name__)
 
 @pytest.fixture
 def cluster_lock_pool2(cluster_manager: cluster_management.ClusterManager) -> clusterlib.ClusterLib:
-    return cluster_manager.get(lock_resources=[cluster_management.Resources.POOL2])
+    return cluster_manager.get(
+        lock_resources=[cluster_management.Resources.POOL2],
+        # the tests wait for several epochs, starting at the same interval within an epoch
+        epoch_profile=epoch_batching.EpochProfile(
+            boundaries=4, start=5, stop=common.EPOCH_STOP_SEC_BUFFER
+        ),
+    )
 
 
 @pytest.mark.order(6)
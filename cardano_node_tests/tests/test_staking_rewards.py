@@ -18,6 +18,7 @@ from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import dbsync_utils
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import ledger_state_view
 from cardano_node_tests.utils import tx_view
 from cardano_node_tests.utils.versions import VERSIONS
 
@@ -201,49 +202,6 @@ def _dbsync_check_rewards(
     return reward_db_record
 
 
-def _get_rec_hash(rec: List[dict]):
-    """Get credential hash (key or script) from record."""
-    # make it fail when neither key nor script hash is present
-    return rec[0].get("key hash") or rec[0]["script hash"]
-
-
-def _get_cred_hashes(rec: dict) -> List[str]:
-    """Get credential hashes in ledger state snapshot record."""
-    return [_get_rec_hash(r) for r in rec]
-
-
-def _get_val_for_cred_hash(key_hash: str, rec: list) -> Any:
-    """Get value for credential hash in ledger state snapshot record."""
-    for r in rec:
-        if _get_rec_hash(r) == key_hash:
-            return r[1]
-    return None
-
-
-def _get_rew_amount_for_cred_hash(key_hash: str, rec: list) -> int:
-    """Get reward amount for credential hash in ledger state snapshot record."""
-    for r in rec:
-        if _get_rec_hash(r) != key_hash:
-            continue
-        rew_amount = 0
-        for sr in r[1]:
-            rew_amount += sr["rewardAmount"]
-        return rew_amount
-    return 0
-
-
-def _get_rew_type_for_cred_hash(key_hash: str, rec: list) -> List[str]:
-    """Get reward types for credential hash in ledger state snapshot record."""
-    rew_types = []
-    for r in rec:
-        if _get_rec_hash(r) != key_hash:
-            continue
-        for sr in r[1]:
-            rew_types.append(sr["rewardType"])
-        return rew_types
-    return rew_types
-
-
 @pytest.mark.order(6)
 @pytest.mark.long
 class TestRewards:
@@ -443,7 +401,7 @@ class TestRewards:
         ]
 
         # ledger state db
-        rs_records: dict = {init_epoch: None}
+        ledger_views: dict = {init_epoch: None}
 
         def _check_ledger_state(
             this_epoch: int,
@@ -454,27 +412,24 @@ class TestRewards:
                 state_name=f"{temp_template}_{this_epoch}",
                 ledger_state=ledger_state,
             )
-            es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-            rs_record: list = ledger_state["possibleRewardUpdate"]["rs"]
-            rs_records[this_epoch] = rs_record
+            ledger_view = ledger_state_view.LedgerStateView(ledger_state)
+            ledger_views[this_epoch] = ledger_view
 
             # Make sure reward amount corresponds with ledger state.
             # Reward is received on epoch boundary, so check reward with record for previous epoch.
-            prev_rs_record = rs_records.get(this_epoch - 1)
+            prev_ledger_view = ledger_views.get(this_epoch - 1)
             user_reward_epoch = user_rewards[-1].reward_per_epoch
-            if user_reward_epoch and prev_rs_record:
-                assert user_reward_epoch == _get_rew_amount_for_cred_hash(
-                    user_stake_addr_dec, prev_rs_record
-                )
+            if user_reward_epoch and prev_ledger_view and prev_ledger_view.rewards:
+                assert user_reward_epoch == prev_ledger_view.get_reward_amount(user_stake_addr_dec)
             owner_reward_epoch = owner_rewards[-1].reward_per_epoch
-            if owner_reward_epoch and prev_rs_record:
-                assert owner_reward_epoch == _get_rew_amount_for_cred_hash(
-                    pool_reward_addr_dec, prev_rs_record
+            if owner_reward_epoch and prev_ledger_view and prev_ledger_view.rewards:
+                assert owner_reward_epoch == prev_ledger_view.get_reward_amount(
+                    pool_reward_addr_dec
                 )
 
-            pstake_mark = _get_cred_hashes(es_snapshot["pstakeMark"]["stake"])
-            pstake_set = _get_cred_hashes(es_snapshot["pstakeSet"]["stake"])
-            pstake_go = _get_cred_hashes(es_snapshot["pstakeGo"]["stake"])
+            pstake_mark = ledger_view.snapshots["mark"].stake
+            pstake_set = ledger_view.snapshots["set"].stake
+            pstake_go = ledger_view.snapshots["go"].stake
 
             if this_epoch == init_epoch + 1:
                 assert pool_stake_addr_dec in pstake_mark
@@ -485,24 +440,15 @@ class TestRewards:
                 assert user_stake_addr_dec not in pstake_go
 
                 # make sure ledger state and actual stake correspond
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == user_rewards[-1].stake_total
-                )
+                assert pstake_mark.get(user_stake_addr_dec) == user_rewards[-1].stake_total
 
             if this_epoch == init_epoch + 2:
                 assert user_stake_addr_dec in pstake_mark
                 assert user_stake_addr_dec in pstake_set
                 assert user_stake_addr_dec not in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == user_rewards[-1].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == user_rewards[-2].stake_total
-                )
+                assert pstake_mark.get(user_stake_addr_dec) == user_rewards[-1].stake_total
+                assert pstake_set.get(user_stake_addr_dec) == user_rewards[-2].stake_total
 
             if this_epoch >= init_epoch + 2:
                 assert pool_stake_addr_dec in pstake_mark
@@ -514,18 +460,9 @@ class TestRewards:
                 assert user_stake_addr_dec in pstake_set
                 assert user_stake_addr_dec in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == user_rewards[-1].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == user_rewards[-2].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(user_stake_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == user_rewards[-3].stake_total
-                )
+                assert pstake_mark.get(user_stake_addr_dec) == user_rewards[-1].stake_total
+                assert pstake_set.get(user_stake_addr_dec) == user_rewards[-2].stake_total
+                assert pstake_go.get(user_stake_addr_dec) == user_rewards[-3].stake_total
 
         LOGGER.info("Checking rewards for 9 epochs.")
         for __ in range(9):
@@ -712,7 +649,7 @@ class TestRewards:
         reward_records: List[RewardRecord] = []
 
         # ledger state db
-        rs_records: dict = {init_epoch: None}
+        ledger_views: dict = {init_epoch: None}
 
         def _check_ledger_state(
             this_epoch: int,
@@ -723,26 +660,23 @@ class TestRewards:
                 state_name=f"{temp_template}_{this_epoch}",
                 ledger_state=ledger_state,
             )
-            es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-            rs_record: list = ledger_state["possibleRewardUpdate"]["rs"]
-            rs_records[this_epoch] = rs_record
+            ledger_view = ledger_state_view.LedgerStateView(ledger_state)
+            ledger_views[this_epoch] = ledger_view
 
             # Make sure reward amount corresponds with ledger state.
             # Reward is received on epoch boundary, so check reward with record for previous epoch.
-            prev_rs_record = rs_records.get(this_epoch - 1)
+            prev_ledger_view = ledger_views.get(this_epoch - 1)
             reward_per_epoch = reward_records[-1].reward_per_epoch
-            if reward_per_epoch and prev_rs_record:
-                prev_recorded_reward = _get_rew_amount_for_cred_hash(
-                    reward_addr_dec, prev_rs_record
-                )
+            if reward_per_epoch and prev_ledger_view and prev_ledger_view.rewards:
+                prev_recorded_reward = prev_ledger_view.get_reward_amount(reward_addr_dec)
                 assert reward_per_epoch in (
                     prev_recorded_reward,
                     prev_recorded_reward + mir_reward,
                 )
 
-            pstake_mark = _get_cred_hashes(es_snapshot["pstakeMark"]["stake"])
-            pstake_set = _get_cred_hashes(es_snapshot["pstakeSet"]["stake"])
-            pstake_go = _get_cred_hashes(es_snapshot["pstakeGo"]["stake"])
+            pstake_mark = ledger_view.snapshots["mark"].stake
+            pstake_set = ledger_view.snapshots["set"].stake
+            pstake_go = ledger_view.snapshots["go"].stake
 
             if this_epoch == init_epoch + 1:
                 assert reward_addr_dec in pstake_mark
@@ -750,66 +684,39 @@ class TestRewards:
                 assert reward_addr_dec not in pstake_go
 
                 # make sure ledger state and actual stake correspond
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].reward_total
-                )
+                assert pstake_mark.get(reward_addr_dec) == reward_records[-1].reward_total
 
             if this_epoch == init_epoch + 2:
                 assert reward_addr_dec in pstake_mark
                 assert reward_addr_dec in pstake_set
                 assert reward_addr_dec not in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].reward_total
-                )
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == reward_records[-2].reward_total
-                )
+                assert pstake_mark.get(reward_addr_dec) == reward_records[-1].reward_total
+                assert pstake_set.get(reward_addr_dec) == reward_records[-2].reward_total
 
             if init_epoch + 3 <= this_epoch <= init_epoch + 5:
                 assert reward_addr_dec in pstake_mark
                 assert reward_addr_dec in pstake_set
                 assert reward_addr_dec in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].reward_total
-                )
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == reward_records[-2].reward_total
-                )
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == reward_records[-3].reward_total
-                )
+                assert pstake_mark.get(reward_addr_dec) == reward_records[-1].reward_total
+                assert pstake_set.get(reward_addr_dec) == reward_records[-2].reward_total
+                assert pstake_go.get(reward_addr_dec) == reward_records[-3].reward_total
 
             if this_epoch == init_epoch + 6:
                 assert reward_addr_dec not in pstake_mark
                 assert reward_addr_dec in pstake_set
                 assert reward_addr_dec in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == reward_records[-2].reward_total
-                )
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == reward_records[-3].reward_total
-                )
+                assert pstake_set.get(reward_addr_dec) == reward_records[-2].reward_total
+                assert pstake_go.get(reward_addr_dec) == reward_records[-3].reward_total
 
             if this_epoch == init_epoch + 7:
                 assert reward_addr_dec not in pstake_mark
                 assert reward_addr_dec not in pstake_set
                 assert reward_addr_dec in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(reward_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == reward_records[-3].reward_total
-                )
+                assert pstake_go.get(reward_addr_dec) == reward_records[-3].reward_total
 
             if this_epoch > init_epoch + 7:
                 assert reward_addr_dec not in pstake_mark
@@ -819,11 +726,11 @@ class TestRewards:
             # check that rewards are coming from multiple sources where expected
             # ("LeaderReward" and "MemberReward")
             if init_epoch + 3 <= this_epoch <= init_epoch + 7:
-                assert ["LeaderReward", "MemberReward"] == _get_rew_type_for_cred_hash(
-                    reward_addr_dec, rs_record
+                assert ["LeaderReward", "MemberReward"] == ledger_view.get_reward_types(
+                    reward_addr_dec
                 )
             else:
-                assert ["LeaderReward"] == _get_rew_type_for_cred_hash(reward_addr_dec, rs_record)
+                assert ["LeaderReward"] == ledger_view.get_reward_types(reward_addr_dec)
 
         def _mir_tx(fund_src: str) -> clusterlib.TxRawOutput:
             mir_cert = cluster.gen_mir_cert_stake_addr(
@@ -1474,7 +1381,7 @@ class TestRewards:
         stake_addr_dec = helpers.decode_bech32(delegation_out.pool_user.stake.address)[2:]
 
         # ledger state db
-        rs_records: dict = {init_epoch: None}
+        ledger_views: dict = {init_epoch: None}
 
         def _check_ledger_state(
             this_epoch: int,
@@ -1485,22 +1392,19 @@ class TestRewards:
                 state_name=f"{temp_template}_{this_epoch}",
                 ledger_state=ledger_state,
             )
-            es_snapshot: dict = ledger_state["stateBefore"]["esSnapshots"]
-            rs_record: list = ledger_state["possibleRewardUpdate"]["rs"]
-            rs_records[this_epoch] = rs_record
+            ledger_view = ledger_state_view.LedgerStateView(ledger_state)
+            ledger_views[this_epoch] = ledger_view
 
             # Make sure reward amount corresponds with ledger state.
             # Reward is received on epoch boundary, so check reward with record for previous epoch.
-            prev_rs_record = rs_records.get(this_epoch - 1)
+            prev_ledger_view = ledger_views.get(this_epoch - 1)
             reward_per_epoch = reward_records[-1].reward_per_epoch
-            if reward_per_epoch and prev_rs_record:
-                assert reward_per_epoch == _get_rew_amount_for_cred_hash(
-                    stake_addr_dec, prev_rs_record
-                )
+            if reward_per_epoch and prev_ledger_view and prev_ledger_view.rewards:
+                assert reward_per_epoch == prev_ledger_view.get_reward_amount(stake_addr_dec)
 
-            pstake_mark = _get_cred_hashes(es_snapshot["pstakeMark"]["stake"])
-            pstake_set = _get_cred_hashes(es_snapshot["pstakeSet"]["stake"])
-            pstake_go = _get_cred_hashes(es_snapshot["pstakeGo"]["stake"])
+            pstake_mark = ledger_view.snapshots["mark"].stake
+            pstake_set = ledger_view.snapshots["set"].stake
+            pstake_go = ledger_view.snapshots["go"].stake
 
             if this_epoch == init_epoch + 1:
                 assert stake_addr_dec in pstake_mark
@@ -1508,42 +1412,24 @@ class TestRewards:
                 assert stake_addr_dec not in pstake_go
 
                 # make sure ledger state and actual stake correspond
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].stake_total
-                )
+                assert pstake_mark.get(stake_addr_dec) == reward_records[-1].stake_total
 
             if this_epoch == init_epoch + 2:
                 assert stake_addr_dec in pstake_mark
                 assert stake_addr_dec in pstake_set
                 assert stake_addr_dec not in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == reward_records[-2].stake_total
-                )
+                assert pstake_mark.get(stake_addr_dec) == reward_records[-1].stake_total
+                assert pstake_set.get(stake_addr_dec) == reward_records[-2].stake_total
 
             if this_epoch >= init_epoch + 3:
                 assert stake_addr_dec in pstake_mark
                 assert stake_addr_dec in pstake_set
                 assert stake_addr_dec in pstake_go
 
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeMark"]["stake"])
-                    == reward_records[-1].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeSet"]["stake"])
-                    == reward_records[-2].stake_total
-                )
-                assert (
-                    _get_val_for_cred_hash(stake_addr_dec, es_snapshot["pstakeGo"]["stake"])
-                    == reward_records[-3].stake_total
-                )
+                assert pstake_mark.get(stake_addr_dec) == reward_records[-1].stake_total
+                assert pstake_set.get(stake_addr_dec) == reward_records[-2].stake_total
+                assert pstake_go.get(stake_addr_dec) == reward_records[-3].stake_total
 
         LOGGER.info("Checking rewards for 8 epochs.")
         withdrawal_past_epoch = False
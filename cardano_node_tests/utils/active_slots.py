@@ -0,0 +1,123 @@
+"""Cooperative suspension of tests that wait for an epoch boundary.
+
+Tests can't be interleaved within a single pytest worker, so the suspendable execution contexts
+are the pytest workers themselves. With `ACTIVE_WORKERS` set, pytest runs with more workers than
+is the number of active slots. A worker needs an active slot for running a test (from the start
+of the test setup to the end of its teardown).
+
+A test that sleeps until an epoch boundary, or until a time interval within an epoch, suspends
+itself - it gives up its active slot, so a test in another worker can run in the meantime. Tests
+running in the meantime get cluster instances and resources through the cluster manager as usual,
+so they never conflict with resources locked by the suspended test.
+
+When the sleep is over, the suspended test resumes right away, as the epoch boundary can't be
+missed. If all the slots are taken by then, the number of running tests exceeds `ACTIVE_WORKERS`
+until the resumed test finishes.
+"""
+import contextlib
+import logging
+import time
+from pathlib import Path
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+from filelock import FileLock
+from filelock import Timeout
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import wakeup
+
+LOGGER = logging.getLogger(__name__)
+
+SLOTS_DIR = ".active_slots"
+# shorter sleeps are not worth the suspension
+MIN_SUSPEND_SEC = 30
+# safety net in case a wakeup notification is lost
+SLOT_WAIT_TIMEOUT_SEC = 10
+
+
+class ActiveSlots:
+    """Active slots shared by all pytest workers."""
+
+    # active slots of the current worker, if enabled
+    current: Optional["ActiveSlots"] = None
+
+    def __init__(self, pytest_tmp_dir: Path, worker_id: str, count: int) -> None:
+        slots_dir = pytest_tmp_dir / SLOTS_DIR
+        slots_dir.mkdir(parents=True, exist_ok=True)
+        self._locks: List[FileLock] = [FileLock(slots_dir / f"slot_{i}.lock") for i in range(count)]
+        self._held: Optional[FileLock] = None
+        self.wakeup = wakeup.WakeupChannel(pytest_tmp_dir=pytest_tmp_dir, worker_id=worker_id)
+
+    @property
+    def is_held(self) -> bool:
+        return self._held is not None
+
+    def try_acquire(self) -> bool:
+        """Take a free active slot, if there is any."""
+        if self._held is not None:
+            return True
+        for lock in self._locks:
+            try:
+                lock.acquire(timeout=0)
+            except Timeout:
+                continue
+            self._held = lock
+            return True
+        return False
+
+    def acquire(self) -> None:
+        """Wait for a free active slot and take it."""
+        wait_start = time.monotonic()
+        while True:
+            # discard notifications sent before the slots are checked
+            self.wakeup.drain()
+            if self.try_acquire():
+                break
+            self.wakeup.wait(timeout=SLOT_WAIT_TIMEOUT_SEC)
+
+        waited_sec = time.monotonic() - wait_start
+        if waited_sec > 1:
+            LOGGER.debug(f"Waited {waited_sec:.1f} sec for an active slot.")
+
+    def release(self) -> None:
+        """Give up the active slot, let the waiting workers know."""
+        if self._held is None:
+            return
+        self._held.release()
+        self._held = None
+        self.wakeup.notify_all()
+
+    @contextlib.contextmanager
+    def suspended(self) -> Iterator[None]:
+        """Give up the active slot for the duration of the context, take it back if possible."""
+        self.release()
+        try:
+            yield
+        finally:
+            if not self.try_acquire():
+                LOGGER.debug("No free active slot, resuming the suspended test anyway.")
+
+
+def init(pytest_tmp_dir: Path, worker_id: str) -> Optional[ActiveSlots]:
+    """Initialize active slots of the current worker, if enabled."""
+    if not configuration.ACTIVE_WORKERS:
+        return None
+    if ActiveSlots.current is None:
+        ActiveSlots.current = ActiveSlots(
+            pytest_tmp_dir=pytest_tmp_dir, worker_id=worker_id, count=configuration.ACTIVE_WORKERS
+        )
+    return ActiveSlots.current
+
+
+def sleep(seconds: float) -> None:
+    """Sleep, suspend the current test if the sleep is long enough."""
+    slots = ActiveSlots.current
+    if slots is None or not slots.is_held or seconds < MIN_SUSPEND_SEC:
+        time.sleep(seconds)
+        return
+
+    LOGGER.debug(f"Suspending the test for {seconds:.1f} sec.")
+    with slots.suspended():
+        time.sleep(seconds)
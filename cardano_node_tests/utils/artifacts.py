@@ -33,7 +33,13 @@ def save_cli_coverage(cluster_obj: clusterlib.ClusterLib, pytest_config: Config)
 
 def save_start_script_coverage(log_file: Path, pytest_config: Config) -> Optional[Path]:
     """Save info about CLI commands executed by cluster start script."""
-    cli_coverage_dir = pytest_config.getoption(CLI_COVERAGE_ARG)
+    return copy_start_script_coverage(
+        log_file=log_file, cli_coverage_dir=pytest_config.getoption(CLI_COVERAGE_ARG)
+    )
+
+
+def copy_start_script_coverage(log_file: Path, cli_coverage_dir: Optional[Path]) -> Optional[Path]:
+    """Copy info about CLI commands executed by cluster start script to CLI coverage dir."""
     if not (cli_coverage_dir and log_file.exists()):
         return None
 
@@ -0,0 +1,150 @@
+"""Persistent cache of results of pure `cardano-cli` commands.
+
+Many `cardano-cli` commands are deterministic functions of their arguments and of content
+of their input files (e.g. computing of transaction ID, policy ID, key hash or address). Results
+of these commands are stored on disk, keyed by the command, hashes of content of the input files
+and version of `cardano-cli`, so the cache can be shared by pytest workers and by test runs.
+
+The cache is enabled by setting `CLI_CACHE_DIR`.
+"""
+import functools
+import hashlib
+import json
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+from cardano_clusterlib import clusterlib
+from cardano_clusterlib import coverage
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import slot_clock
+
+LOGGER = logging.getLogger(__name__)
+
+# commands whose result depends only on the arguments and on content of the input files
+PURE_COMMANDS = (
+    ("address", "build"),
+    ("address", "key-hash"),
+    ("key", "verification-key"),
+    ("stake-address", "build"),
+    ("stake-address", "key-hash"),
+    ("stake-pool", "id"),
+    ("transaction", "hash-script-data"),
+    ("transaction", "policyid"),
+    ("transaction", "txid"),
+)
+
+# options whose values are files written by the command
+OUT_FILE_OPTS = ("--out-file", "--verification-key-file")
+
+
+class CachedResult(NamedTuple):
+    stdout: bytes
+    stderr: bytes
+    out_files: List[bytes]
+
+
+@functools.lru_cache
+def _get_cli_version() -> str:
+    return helpers.run_command("cardano-cli --version").decode().strip()
+
+
+def _is_pure(cli_args: List[str]) -> bool:
+    return tuple(cli_args[:2]) in PURE_COMMANDS
+
+
+def _get_cache_key(cli_args: List[str]) -> Optional[Tuple[str, List[Path]]]:
+    """Return cache key of the command and paths to its output files.
+
+    Returns:
+        Optional[Tuple[str, List[Path]]]: A cache key and paths to output files, or None
+            if the result can't be cached.
+    """
+    key_args: List[str] = [_get_cli_version()]
+    out_files: List[Path] = []
+    prev_arg = ""
+    for arg in cli_args:
+        if prev_arg in OUT_FILE_OPTS:
+            out_files.append(Path(arg))
+            key_args.append(f"<out{len(out_files)}>")
+        elif prev_arg.endswith("-file"):
+            in_file = Path(arg)
+            if not in_file.is_file():
+                return None
+            key_args.append(f"<in:{helpers.checksum(in_file)}>")
+        else:
+            key_args.append(arg)
+        prev_arg = arg
+
+    cache_key = hashlib.sha256(json.dumps(key_args).encode("utf-8")).hexdigest()
+    return cache_key, out_files
+
+
+def _get_cache_file(cache_key: str) -> Path:
+    return Path(configuration.CLI_CACHE_DIR) / cache_key[:2] / f"{cache_key}.pickle"
+
+
+def _load(cache_file: Path) -> Optional[CachedResult]:
+    try:
+        with open(cache_file, "rb") as in_data:
+            cached_result: CachedResult = pickle.load(in_data)
+    except FileNotFoundError:
+        return None
+    except Exception as err:
+        LOGGER.warning(f"Failed to load cached CLI result '{cache_file}': {err}")
+        return None
+    return cached_result
+
+
+def _store(cache_file: Path, cached_result: CachedResult) -> None:
+    """Write the file atomically, so concurrent readers and writers never see incomplete data."""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = cache_file.with_name(f".{cache_file.name}_{helpers.get_rand_str(8)}")
+    try:
+        with open(tmp_file, "wb") as out_data:
+            pickle.dump(cached_result, out_data)
+        os.replace(tmp_file, cache_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+
+
+class CliCacheClusterLib(slot_clock.SlotClockClusterLib):
+    """`ClusterLib` that reuses cached results of pure `cardano-cli` commands."""
+
+    def cli(self, cli_args: List[str]) -> clusterlib.CLIOut:
+        """Run the `cardano-cli` command, or return its cached result."""
+        if not (configuration.CLI_CACHE_DIR and _is_pure(cli_args)):
+            return super().cli(cli_args)
+
+        key_rec = _get_cache_key(cli_args)
+        if key_rec is None:
+            return super().cli(cli_args)
+        cache_key, out_files = key_rec
+        cache_file = _get_cache_file(cache_key)
+
+        cached_result = _load(cache_file)
+        if cached_result and len(cached_result.out_files) == len(out_files):
+            coverage.record_cli_coverage(
+                cli_args=["cardano-cli", *cli_args], coverage_dict=self.cli_coverage
+            )
+            for out_file, content in zip(out_files, cached_result.out_files):
+                out_file.write_bytes(content)
+            return clusterlib.CLIOut(cached_result.stdout, cached_result.stderr)
+
+        cli_out = super().cli(cli_args)
+        _store(
+            cache_file=cache_file,
+            cached_result=CachedResult(
+                stdout=cli_out.stdout,
+                stderr=cli_out.stderr,
+                out_files=[f.read_bytes() for f in out_files],
+            ),
+        )
+        return cli_out
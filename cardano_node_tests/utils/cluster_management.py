@@ -5,17 +5,23 @@ import dataclasses
 import datetime
 import hashlib
 import inspect
+import json
 import logging
 import os
 import random
 import shutil
+import subprocess
+import sys
 import time
 from pathlib import Path
 from typing import Any
+from typing import Callable
 from typing import Dict
 from typing import Iterable
 from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Sequence
 
 import pytest
 from _pytest.config import Config
@@ -25,23 +31,22 @@ from cardano_clusterlib import clusterlib
 from cardano_node_tests.utils import artifacts
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import cluster_scripts
+from cardano_node_tests.utils import cluster_snapshot
 from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import epoch_batching
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import locking
 from cardano_node_tests.utils import logfiles
+from cardano_node_tests.utils import scheduling_state
+from cardano_node_tests.utils import supervisor_rpc
 from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils import wakeup
+from cardano_node_tests.utils.scheduling_state import StandbyStates
+from cardano_node_tests.utils.scheduling_state import StatusKinds
+from cardano_node_tests.utils.scheduling_state import StatusRecord
 
 LOGGER = logging.getLogger(__name__)
 
-if configuration.IS_XDIST:
-    xdist_sleep = time.sleep
-else:
-
-    def xdist_sleep(secs: float) -> None:
-        """No need to sleep if tests are running on a single pytest worker."""
-        # pylint: disable=unused-argument,unnecessary-pass
-        pass
-
 
 class Resources:
     """Resources that can be used for `lock_resources` or `use_resources`."""
@@ -57,19 +62,21 @@ class Resources:
     PERF = "performance"
 
 
+class WaitReasons:
+    """Reasons why a test cannot start on a cluster instance."""
+
+    CLUSTER_DEAD = "cluster_dead"
+    MARK_CONFLICT = "mark_conflict"
+    RESOURCE_LOCKED = "resource_locked"
+    RESTART_IN_PROGRESS = "restart_in_progress"
+    RESTART_PENDING = "restart_pending"
+    UNKNOWN = "unknown"
+
+
 CLUSTER_LOCK = ".cluster.lock"
 LOG_LOCK = ".manager_log.lock"
 
-RESOURCE_LOCKED_GLOB = ".resource_locked"
-RESOURCE_IN_USE_GLOB = ".resource_in_use"
-RESTART_NEEDED_GLOB = ".needs_restart"
-RESTART_IN_PROGRESS_GLOB = ".restart_in_progress"
-RESTART_AFTER_MARK_GLOB = ".restart_after_mark"
-TEST_RUNNING_GLOB = ".test_running"
-TEST_CURR_MARK_GLOB = ".curr_test_mark"
-TEST_MARK_STARTING_GLOB = ".starting_marked_tests"
-
-CLUSTER_DIR_TEMPLATE = "cluster"
+CLUSTER_DIR_TEMPLATE = scheduling_state.CLUSTER_DIR_TEMPLATE
 CLUSTER_RUNNING_FILE = ".cluster_running"
 CLUSTER_STOPPED_FILE = ".cluster_stopped"
 CLUSTER_DEAD_FILE = ".cluster_dead"
@@ -78,7 +85,16 @@ CLUSTER_STARTED_BY_FRAMEWORK = ".cluster_started_by_cnt"
 if configuration.CLUSTERS_COUNT > 1 and configuration.DEV_CLUSTER_RUNNING:
     raise RuntimeError("Cannot run multiple cluster instances when 'DEV_CLUSTER_RUNNING' is set.")
 
+# how long to wait for the next marked test before the mark is cleared
+MARK_STALE_SEC = 40
+
 CLUSTER_START_CMDS_LOG = "start_cluster_cmds.log"
+STANDBY_BOOT_LOG = "standby_boot.log"
+# PID of the boot process and number of boot attempts of the standby cluster instance
+STANDBY_BOOT_FILE = ".standby_boot.json"
+STANDBY_WORKER_ID = "standby"
+# how many times a standby cluster instance is booted before it is given up
+STANDBY_BOOT_ATTEMPTS = 3
 
 
 def _kill_supervisor(instance_num: int) -> None:
@@ -97,6 +113,162 @@ def _kill_supervisor(instance_num: int) -> None:
         return
 
 
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    # process that exited but was not reaped by its parent yet
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as infile:
+            return infile.read().rpartition(")")[2].split()[0] != "Z"
+    except (OSError, IndexError):
+        return True
+
+
+def _load_standby_boot(instance_dir: Path) -> dict:
+    try:
+        with open(instance_dir / STANDBY_BOOT_FILE, encoding="utf-8") as infile:
+            boot_info: dict = json.load(infile)
+    except (FileNotFoundError, ValueError):
+        boot_info = {"pid": 0, "attempts": 0}
+    return boot_info
+
+
+def _fail_dead_standby_boots(
+    sched_state: scheduling_state.SchedulingState, pytest_tmp_dir: Path
+) -> List[int]:
+    """Mark standby cluster instances whose boot process is gone (e.g. killed) as failed.
+
+    Must be called under global lock.
+
+    Returns:
+        List[int]: Standby cluster instances that were marked as failed.
+    """
+    failed = []
+    for rec in sched_state.query(kind=StatusKinds.STANDBY_STATE, name=StandbyStates.BOOTING):
+        instance_dir = pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{rec.instance_num}"
+        pid = _load_standby_boot(instance_dir)["pid"]
+        if pid and _is_process_alive(pid):
+            continue
+        sched_state.set_standby_state(
+            instance_num=rec.instance_num, state=StandbyStates.FAILED, worker_id=STANDBY_WORKER_ID
+        )
+        failed.append(rec.instance_num)
+    return failed
+
+
+def restart_instance(
+    instance_num: int,
+    startup_files: cluster_scripts.InstanceFiles,
+    pytest_tmp_dir: Path,
+    addrs_data_dir: Path,
+    cli_coverage_dir: Optional[Path],
+    log_func: Callable[[str], None],
+) -> Optional[clusterlib.ClusterLib]:
+    """Stop the cluster instance, save its artifacts and start it again.
+
+    The env variables for the cluster instance (see `cluster_nodes.set_cluster_env`) need
+    to be already set.
+
+    Returns:
+        Optional[clusterlib.ClusterLib]: Instance of `ClusterLib`, or None if the cluster instance
+            failed to start.
+    """
+    # pylint: disable=too-many-arguments
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    instance_dir = pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+    cluster_running_file = instance_dir / CLUSTER_RUNNING_FILE
+
+    snapshot_file = cluster_snapshot.get_snapshot_file(startup_files=startup_files)
+    use_snapshot = bool(snapshot_file and snapshot_file.exists())
+
+    excp: Optional[Exception] = None
+    for i in range(2):
+        if i > 0:
+            log_func(f"c{instance_num}: failed to start cluster:\n{excp}\nretrying")
+            time.sleep(0.2)
+
+        try:
+            LOGGER.info(f"Stopping cluster with `{startup_files.stop_script}`.")
+            helpers.run_command(str(startup_files.stop_script))
+        except Exception as err:
+            log_func(f"c{instance_num}: failed to stop cluster:\n{err}")
+
+        # save artifacts only when produced during this test run
+        if cluster_running_file.exists():
+            artifacts.copy_start_script_coverage(
+                log_file=state_dir / CLUSTER_START_CMDS_LOG,
+                cli_coverage_dir=cli_coverage_dir,
+            )
+            artifacts.save_cluster_artifacts(save_dir=pytest_tmp_dir, state_dir=state_dir)
+
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+        with contextlib.suppress(Exception):
+            _kill_supervisor(instance_num)
+
+        try:
+            if use_snapshot and snapshot_file:
+                log_func(f"c{instance_num}: restoring cluster from snapshot '{snapshot_file}'")
+                cluster_obj = cluster_snapshot.restore_snapshot(
+                    snapshot_file=snapshot_file, addrs_data_dir=addrs_data_dir
+                )
+            else:
+                cluster_obj = cluster_nodes.start_cluster(
+                    cmd=str(startup_files.start_script), args=startup_files.start_script_args
+                )
+        except Exception as err:
+            LOGGER.error(f"Failed to start cluster: {err}")
+            excp = err
+            # the snapshot might be broken, do the full bootstrap and create new snapshot
+            if use_snapshot and snapshot_file:
+                snapshot_file.unlink(missing_ok=True)
+                use_snapshot = False
+        else:
+            break
+    else:
+        log_func(f"c{instance_num}: failed to start cluster:\n{excp}\ncluster dead")
+        return None
+
+    cluster_nodes.invalidate_services_status(instance_num=instance_num)
+
+    # generate ID for the new cluster instance so it is possible to match log entries with
+    # cluster instance files saved as artifacts
+    cluster_instance_id = helpers.get_rand_str(8)
+    with open(state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME, "w", encoding="utf-8") as fp_out:
+        fp_out.write(cluster_instance_id)
+    log_func(f"c{instance_num}: started cluster instance '{cluster_instance_id}'")
+
+    # faucet addresses are part of the snapshot
+    if not use_snapshot:
+        # setup faucet addresses
+        cluster_nodes.setup_test_addrs(cluster_obj=cluster_obj, destination_dir=addrs_data_dir)
+
+        if snapshot_file:
+            try:
+                cluster_snapshot.save_snapshot(
+                    snapshot_file=snapshot_file,
+                    cluster_obj=cluster_obj,
+                    addrs_data_dir=addrs_data_dir,
+                )
+            except Exception as err:
+                log_func(f"c{instance_num}: failed to save snapshot:\n{err}")
+
+    # create file that indicates that the cluster is running
+    if not cluster_running_file.exists():
+        helpers.touch(cluster_running_file)
+
+    # create file that indicates that the cluster was started by framework
+    if not (state_dir / CLUSTER_STARTED_BY_FRAMEWORK).exists():
+        helpers.touch(state_dir / CLUSTER_STARTED_BY_FRAMEWORK)
+
+    return cluster_obj
+
+
 def _get_fixture_hash() -> int:
     """Get hash of fixture, using hash of `filename#lineno`."""
     # get past `cache_fixture` and `contextmanager` to the fixture
@@ -118,6 +290,12 @@ class ClusterManagerCache:
     last_checksum: str = ""
 
 
+class StandbyBootCache:
+    """Standby boot processes spawned by this worker, kept for reaping them when they exit."""
+
+    procs: List[subprocess.Popen] = []
+
+
 @dataclasses.dataclass
 class FixtureCache:
     """Cache for a fixture."""
@@ -127,7 +305,8 @@ class FixtureCache:
 
 @dataclasses.dataclass
 class MarkedTestsStatus:
-    no_marked_tests_iter: int = 0
+    # since when no marked test is running or starting, -1 when there is one
+    idle_since: float = -1.0
 
 
 @dataclasses.dataclass
@@ -140,17 +319,26 @@ class ClusterGetStatus:
     cleanup: bool
     start_cmd: str
     current_test: str
+    epoch_profile: epoch_batching.EpochProfile = epoch_batching.EpochProfile()
     selected_instance: int = -1
     instance_num: int = -1
     sleep_delay: int = 1
     restart_here: bool = False
     restart_ready: bool = False
     first_iteration: bool = True
+    notified: bool = False
     instance_dir: Path = Path("/nonexistent")
-    # status files
-    started_tests_sfiles: Iterable[Path] = ()
-    marked_starting_sfiles: Iterable[Path] = ()
-    marked_running_sfiles: Iterable[Path] = ()
+    # status records
+    started_tests: Sequence[StatusRecord] = ()
+    marked_starting: Sequence[StatusRecord] = ()
+    marked_running: Sequence[StatusRecord] = ()
+    # scheduling stats
+    get_start: float = dataclasses.field(default_factory=time.perf_counter)
+    iterations: int = 0
+    lock_time: float = 0.0
+    restart_time: float = 0.0
+    wait_reason: str = ""
+    wait_times: Dict[str, float] = dataclasses.field(default_factory=dict)
 
 
 class ClusterManager:
@@ -174,13 +362,17 @@ class ClusterManager:
         self.is_xdist = configuration.IS_XDIST
         if self.is_xdist:
             self.range_num = 5
-            self.num_of_instances = configuration.CLUSTERS_COUNT
+            self.num_of_instances = (
+                configuration.CLUSTERS_COUNT + configuration.CLUSTERS_STANDBY_COUNT
+            )
         else:
             self.range_num = 1
             self.num_of_instances = 1
 
         self.cluster_lock = f"{self.pytest_tmp_dir}/{CLUSTER_LOCK}"
         self.log_lock = f"{self.pytest_tmp_dir}/{LOG_LOCK}"
+        self.sched_state = scheduling_state.get_scheduling_state(pytest_tmp_dir=self.pytest_tmp_dir)
+        self.wakeup = wakeup.WakeupChannel(pytest_tmp_dir=self.pytest_tmp_dir, worker_id=worker_id)
 
         self._cluster_instance_num = -1
 
@@ -221,6 +413,17 @@ class ClusterManager:
         ) as logfile:
             logfile.write(f"{datetime.datetime.now()} on {self.worker_id}: {msg}\n")
 
+    def _log_event(self, event: str, **data: Any) -> None:
+        """Log structured scheduling event as a single JSON line."""
+        if not configuration.SCHEDULING_EVENTS_LOG:
+            return
+
+        record = {"event": event, "ts": time.time(), "worker": self.worker_id, **data}
+        with locking.FileLockIfXdist(self.log_lock), open(
+            configuration.SCHEDULING_EVENTS_LOG, "a", encoding="utf-8"
+        ) as logfile:
+            logfile.write(f"{json.dumps(record)}\n")
+
     def _create_startup_files_dir(self, instance_num: int) -> Path:
         instance_dir = self.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
         rand_str = clusterlib.get_rand_str(8)
@@ -243,6 +446,16 @@ class ClusterManager:
 
             artifacts.save_cli_coverage(cluster_obj=cluster_obj, pytest_config=self.pytest_config)
 
+    def _is_standby_boot_finished(self) -> bool:
+        """Check that no standby cluster instance is being booted in background."""
+        with locking.FileLockIfXdist(self.cluster_lock), self.sched_state.transaction():
+            _fail_dead_standby_boots(
+                sched_state=self.sched_state, pytest_tmp_dir=self.pytest_tmp_dir
+            )
+            return not self.sched_state.exists(
+                kind=StatusKinds.STANDBY_STATE, name=StandbyStates.BOOTING
+            )
+
     def stop_all_clusters(self) -> None:
         """Stop all cluster instances."""
         self._log("called `stop_all_clusters`")
@@ -252,6 +465,16 @@ class ClusterManager:
             LOGGER.warning("Ignoring request to stop clusters as 'DEV_CLUSTER_RUNNING' is set.")
             return
 
+        # standby cluster instances that are being booted would be left running otherwise
+        if configuration.CLUSTERS_STANDBY_COUNT:
+            helpers.wait_for(
+                self._is_standby_boot_finished,
+                delay=5,
+                num_sec=900,
+                message="boot standby cluster instances",
+                silent=True,
+            )
+
         work_dir = cluster_nodes.get_cluster_env().work_dir
 
         for instance_num in range(self.num_of_instances):
@@ -295,7 +518,9 @@ class ClusterManager:
         """Indicate that the cluster instance needs restart."""
         with locking.FileLockIfXdist(self.cluster_lock):
             self._log(f"c{self.cluster_instance_num}: called `set_needs_restart`")
-            helpers.touch(self.instance_dir / f"{RESTART_NEEDED_GLOB}_{self.worker_id}")
+            self.sched_state.set_needs_restart(
+                instance_num=self.cluster_instance_num, worker_id=self.worker_id
+            )
 
     @contextlib.contextmanager
     def restart_on_failure(self) -> Iterator[None]:
@@ -329,7 +554,8 @@ class ClusterManager:
         # search for errors in cluster logfiles
         errors = logfiles.search_cluster_artifacts()
 
-        with locking.FileLockIfXdist(self.cluster_lock):
+        instance_num = self._cluster_instance_num
+        with locking.FileLockIfXdist(self.cluster_lock), self.sched_state.transaction():
             # There's only one test running on a worker at a time. Deleting the coresponding rules
             # file right after a test is finished is therefore safe. The effect is that the rules
             # apply only from the time they were added (by `logfiles.add_ignore_rule`) until the end
@@ -340,31 +566,34 @@ class ClusterManager:
             # If the ignored error continues to get printed into log file, tests that are still
             # running on the cluster instance would report that error. Therefore if the cluster
             # instance is scheduled for restart, don't delete the rules file.
-            if not list(self.instance_dir.glob(f"{RESTART_NEEDED_GLOB}_*")):
+            if not self.sched_state.exists(
+                kind=StatusKinds.RESTART_NEEDED, instance_num=instance_num
+            ):
                 logfiles.clean_ignore_rules(ignore_file_id=self.worker_id)
 
-            # remove resource locking files created by the worker
-            resource_locking_files = list(
-                self.instance_dir.glob(f"{RESOURCE_LOCKED_GLOB}_*_{self.worker_id}")
+            # release resources locked or used by the worker
+            self.sched_state.release_resources(instance_num=instance_num, worker_id=self.worker_id)
+            self.sched_state.remove(
+                instance_num=instance_num, kind=StatusKinds.EPOCH_WAIT, worker_id=self.worker_id
             )
-            for f in resource_locking_files:
-                f.unlink()
 
-            # remove "resource in use" files created by the worker
-            resource_in_use_files = list(
-                self.instance_dir.glob(f"{RESOURCE_IN_USE_GLOB}_*_{self.worker_id}")
+            # remove record that indicates that a test is running on the worker
+            self.sched_state.remove(
+                instance_num=instance_num, kind=StatusKinds.TEST_RUNNING, worker_id=self.worker_id
             )
-            for f in resource_in_use_files:
-                f.unlink()
-
-            # remove file that indicates that a test is running on the worker
-            (self.instance_dir / f"{TEST_RUNNING_GLOB}_{self.worker_id}").unlink(missing_ok=True)
 
             # log how many tests keep running on the cluster instance
-            num_tests_running = len(list(self.instance_dir.glob(f"{TEST_RUNNING_GLOB}_*")))
+            num_tests_running = len(
+                self.sched_state.query(kind=StatusKinds.TEST_RUNNING, instance_num=instance_num)
+            )
             if num_tests_running:
                 self._log(f"c{self._cluster_instance_num}: {num_tests_running} running tests")
 
+        # let waiting workers know that the test finished and resources were released
+        self.wakeup.notify_all()
+
+        self._log_event("test_stop", test=current_test, instance=instance_num, errors=len(errors))
+
         if errors:
             logfiles.report_artifacts_errors(errors)
 
@@ -375,6 +604,7 @@ class ClusterManager:
         use_resources: Iterable[str] = (),
         cleanup: bool = False,
         start_cmd: str = "",
+        epoch_profile: epoch_batching.EpochProfile = epoch_batching.EpochProfile(),
     ) -> clusterlib.ClusterLib:
         """Wrap a call to `_ClusterGetter.get`."""
         return _ClusterGetter(self).get(
@@ -383,6 +613,7 @@ class ClusterManager:
             use_resources=use_resources,
             cleanup=cleanup,
             start_cmd=start_cmd,
+            epoch_profile=epoch_profile,
         )
 
 
@@ -392,12 +623,11 @@ class _ClusterGetter:
     def __init__(self, cluster_manager: ClusterManager) -> None:
         self.cm = cluster_manager  # pylint: disable=invalid-name
 
-    def _restart(self, start_cmd: str = "", stop_cmd: str = "") -> bool:  # noqa: C901
+    def _restart(self, start_cmd: str = "", stop_cmd: str = "") -> bool:
         """Restart cluster.
 
         Not called under global lock!
         """
-        # pylint: disable=too-many-branches,too-many-statements
         cluster_running_file = self.cm.instance_dir / CLUSTER_RUNNING_FILE
 
         # don't restart cluster if it was started outside of test framework
@@ -440,80 +670,28 @@ class _ClusterGetter:
             f"stop_cmd='{startup_files.stop_script}'"
         )
 
-        excp: Optional[Exception] = None
-        for i in range(2):
-            if i > 0:
-                self.cm._log(
-                    f"c{self.cm.cluster_instance_num}: failed to start cluster:\n{excp}\nretrying"
-                )
-                time.sleep(0.2)
-
-            try:
-                LOGGER.info(f"Stopping cluster with `{startup_files.stop_script}`.")
-                helpers.run_command(str(startup_files.stop_script))
-            except Exception as err:
-                self.cm._log(f"c{self.cm.cluster_instance_num}: failed to stop cluster:\n{err}")
-
-            # save artifacts only when produced during this test run
-            if cluster_running_file.exists():
-                artifacts.save_start_script_coverage(
-                    log_file=state_dir / CLUSTER_START_CMDS_LOG,
-                    pytest_config=self.cm.pytest_config,
-                )
-                artifacts.save_cluster_artifacts(
-                    save_dir=self.cm.pytest_tmp_dir, state_dir=state_dir
-                )
-
-            shutil.rmtree(state_dir, ignore_errors=True)
-
-            with contextlib.suppress(Exception):
-                _kill_supervisor(self.cm.cluster_instance_num)
-
-            try:
-                cluster_obj = cluster_nodes.start_cluster(
-                    cmd=str(startup_files.start_script), args=startup_files.start_script_args
-                )
-            except Exception as err:
-                LOGGER.error(f"Failed to start cluster: {err}")
-                excp = err
-            else:
-                break
-        else:
-            self.cm._log(
-                f"c{self.cm.cluster_instance_num}: failed to start cluster:\n{excp}\ncluster dead"
-            )
-            if not configuration.IS_XDIST:
-                pytest.exit(msg=f"Failed to start cluster, exception: {excp}", returncode=1)
-            helpers.touch(self.cm.instance_dir / CLUSTER_DEAD_FILE)
-            return False
-
-        # generate ID for the new cluster instance so it is possible to match log entries with
-        # cluster instance files saved as artifacts
-        cluster_instance_id = helpers.get_rand_str(8)
-        with open(
-            state_dir / artifacts.CLUSTER_INSTANCE_ID_FILENAME, "w", encoding="utf-8"
-        ) as fp_out:
-            fp_out.write(cluster_instance_id)
-        self.cm._log(
-            f"c{self.cm.cluster_instance_num}: started cluster instance '{cluster_instance_id}'"
-        )
-
         # Create temp dir for faucet addresses data.
         # Pytest's mktemp adds number to the end of the dir name, so keep the trailing '_'
         # as separator. Resulting dir name is e.g. 'addrs_data_ci3_0'.
-        tmp_path = Path(
+        addrs_data_dir = Path(
             self.cm.tmp_path_factory.mktemp(f"addrs_data_ci{self.cm.cluster_instance_num}_")
         )
-        # setup faucet addresses
-        cluster_nodes.setup_test_addrs(cluster_obj=cluster_obj, destination_dir=tmp_path)
-
-        # create file that indicates that the cluster is running
-        if not cluster_running_file.exists():
-            helpers.touch(cluster_running_file)
 
-        # create file that indicates that the cluster was started by framework
-        if not (state_dir / CLUSTER_STARTED_BY_FRAMEWORK).exists():
-            helpers.touch(state_dir / CLUSTER_STARTED_BY_FRAMEWORK)
+        cluster_obj = restart_instance(
+            instance_num=self.cm.cluster_instance_num,
+            startup_files=startup_files,
+            pytest_tmp_dir=self.cm.pytest_tmp_dir,
+            addrs_data_dir=addrs_data_dir,
+            cli_coverage_dir=self.cm.pytest_config.getoption(artifacts.CLI_COVERAGE_ARG),
+            log_func=self.cm._log,
+        )
+        if not cluster_obj:
+            if not configuration.IS_XDIST:
+                pytest.exit(msg="Failed to start cluster, see the log for details.", returncode=1)
+            helpers.touch(self.cm.instance_dir / CLUSTER_DEAD_FILE)
+            # let waiting workers know they need to move on to other cluster instance
+            self.cm.wakeup.notify_all()
+            return False
 
         return True
 
@@ -542,9 +720,18 @@ class _ClusterGetter:
         cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
         cluster_nodes.setup_test_addrs(cluster_obj=cluster_obj, destination_dir=tmp_path)
 
+    def _now(self) -> float:
+        """Return current time for measuring scheduling timeouts."""
+        return time.monotonic()
+
     def _is_healthy(self, instance_num: int) -> bool:
-        """Check health of cluster services."""
-        statuses = cluster_nodes.services_status(instance_num=instance_num)
+        """Check health of cluster services.
+
+        Called repeatedly under global lock, so recent cached status of services is good enough.
+        """
+        statuses = cluster_nodes.services_status(
+            instance_num=instance_num, max_age=supervisor_rpc.STATUS_TTL_SEC
+        )
         failed_services = [s.name for s in statuses if s.status == "FATAL"]
         not_running_services = [(s.name, s.status) for s in statuses if s.status != "RUNNING"]
         if failed_services:
@@ -560,7 +747,7 @@ class _ClusterGetter:
         if not (instance_dir / CLUSTER_RUNNING_FILE).exists():
             return True
         # if it was indicated that the cluster instance needs to be restarted
-        if list(instance_dir.glob(f"{RESTART_NEEDED_GLOB}_*")):
+        if self.cm.sched_state.exists(kind=StatusKinds.RESTART_NEEDED, instance_num=instance_num):
             return True
         # if a service failed on cluster instance
         if not self._is_healthy(instance_num):
@@ -570,22 +757,20 @@ class _ClusterGetter:
     def _on_marked_test_stop(self, instance_num: int) -> None:
         """Perform actions after marked tests are finished."""
         self.cm._log(f"c{instance_num}: in `_on_marked_test_stop`")
-        instance_dir = self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+        sched_state = self.cm.sched_state
 
         # set cluster instance to be restarted if needed
-        restart_after_mark_files = list(instance_dir.glob(f"{RESTART_AFTER_MARK_GLOB}_*"))
-        if restart_after_mark_files:
-            for f in restart_after_mark_files:
-                f.unlink()
+        if sched_state.remove(instance_num=instance_num, kind=StatusKinds.RESTART_AFTER_MARK):
             self.cm._log(
-                f"c{instance_num}: in `_on_marked_test_stop`, creating 'restart needed' file"
+                f"c{instance_num}: in `_on_marked_test_stop`, setting 'restart needed' status"
             )
-            helpers.touch(instance_dir / f"{RESTART_NEEDED_GLOB}_{self.cm.worker_id}")
+            sched_state.set_needs_restart(instance_num=instance_num, worker_id=self.cm.worker_id)
+
+        # remove record that indicates that tests with the mark are running
+        sched_state.remove(instance_num=instance_num, kind=StatusKinds.TEST_CURR_MARK)
 
-        # remove file that indicates that tests with the mark are running
-        marked_running_sfiles = list(instance_dir.glob(f"{TEST_CURR_MARK_GLOB}_*"))
-        if marked_running_sfiles:
-            marked_running_sfiles[0].unlink()
+        # tests with other marks or without mark can now start
+        self.cm.wakeup.notify_all()
 
     def _get_marked_tests_status(
         self, cache: Dict[int, MarkedTestsStatus], instance_num: int
@@ -609,7 +794,7 @@ class _ClusterGetter:
         keeps track of marked tests and clear the mark and cluster instance only when no marked
         test was running for some time.
         """
-        if not cget_status.marked_running_sfiles:
+        if not cget_status.marked_running:
             return
 
         # get marked tests status
@@ -618,34 +803,44 @@ class _ClusterGetter:
         )
 
         # update marked tests status
-        in_progress = bool(cget_status.started_tests_sfiles or cget_status.marked_starting_sfiles)
+        in_progress = bool(cget_status.started_tests or cget_status.marked_starting)
         instance_num = cget_status.instance_num
 
+        now = self._now()
         if in_progress:
             # test with mark is currently running or starting
-            marked_tests_status.no_marked_tests_iter = 0
-        else:
-            # mark is set and no test is currently running, i.e. we are waiting for next marked test
-            marked_tests_status.no_marked_tests_iter += 1
+            marked_tests_status.idle_since = -1.0
+        elif marked_tests_status.idle_since < 0:
+            # Mark is set and no test is currently running, i.e. we are waiting for next marked
+            # test. The time is measured, so how long we are willing to wait doesn't depend on
+            # how often other workers send wakeup notifications.
+            marked_tests_status.idle_since = now
 
         # clean the stale status file if we are waiting too long for the next marked test
-        if marked_tests_status.no_marked_tests_iter >= 20:
+        if (
+            marked_tests_status.idle_since >= 0
+            and now - marked_tests_status.idle_since >= MARK_STALE_SEC
+        ):
             self.cm._log(
                 f"c{instance_num}: no marked tests running for a while, "
                 "cleaning the mark status file"
             )
             self._on_marked_test_stop(instance_num)
+            marked_tests_status.idle_since = -1.0
 
-    def _are_resources_usable(
-        self, resources: Iterable[str], instance_dir: Path, instance_num: int
-    ) -> bool:
+    def _are_resources_usable(self, resources: Iterable[str], instance_num: int) -> bool:
         """Check if resources are locked or in use."""
+        sched_state = self.cm.sched_state
         for res in resources:
-            res_locked = list(instance_dir.glob(f"{RESOURCE_LOCKED_GLOB}_{res}_*"))
+            res_locked = sched_state.exists(
+                kind=StatusKinds.RESOURCE_LOCKED, instance_num=instance_num, name=res
+            )
             if res_locked:
                 self.cm._log(f"c{instance_num}: resource '{res}' locked, cannot start")
                 break
-            res_used = list(instance_dir.glob(f"{RESOURCE_IN_USE_GLOB}_{res}_*"))
+            res_used = sched_state.exists(
+                kind=StatusKinds.RESOURCE_IN_USE, instance_num=instance_num, name=res
+            )
             if res_used:
                 self.cm._log(f"c{instance_num}: resource '{res}' in use, cannot lock and start")
                 break
@@ -657,27 +852,26 @@ class _ClusterGetter:
             return True
         return False
 
-    def _are_resources_locked(
-        self, resources: Iterable[str], instance_dir: Path, instance_num: int
-    ) -> bool:
+    def _are_resources_locked(self, resources: Iterable[str], instance_num: int) -> bool:
         """Check if resources are locked."""
-        res_locked = []
+        res_locked = False
         for res in resources:
-            res_locked = list(instance_dir.glob(f"{RESOURCE_LOCKED_GLOB}_{res}_*"))
+            res_locked = self.cm.sched_state.exists(
+                kind=StatusKinds.RESOURCE_LOCKED, instance_num=instance_num, name=res
+            )
             if res_locked:
                 self.cm._log(f"c{instance_num}: resource '{res}' locked, cannot start")
                 break
 
         if not res_locked:
             self.cm._log(f"c{instance_num}: none of the resources in {resources} locked, can start")
-        return bool(res_locked)
+        return res_locked
 
     def _are_resources_available(self, cget_status: ClusterGetStatus) -> bool:
         """Check if all required "use" and "lock" resources are available."""
         if cget_status.lock_resources:
             res_usable = self._are_resources_usable(
                 resources=cget_status.lock_resources,
-                instance_dir=cget_status.instance_dir,
                 instance_num=cget_status.instance_num,
             )
             if not res_usable:
@@ -687,7 +881,6 @@ class _ClusterGetter:
         if cget_status.use_resources:
             res_locked = self._are_resources_locked(
                 resources=cget_status.use_resources,
-                instance_dir=cget_status.instance_dir,
                 instance_num=cget_status.instance_num,
             )
             if res_locked:
@@ -721,10 +914,8 @@ class _ClusterGetter:
 
     def _is_already_running(self, cget_status: ClusterGetStatus) -> bool:
         """Check if the test is already setup and running."""
-        test_on_worker = list(
-            self.cm.pytest_tmp_dir.glob(
-                f"{CLUSTER_DIR_TEMPLATE}*/{TEST_RUNNING_GLOB}_{self.cm.worker_id}"
-            )
+        test_on_worker = self.cm.sched_state.query(
+            kind=StatusKinds.TEST_RUNNING, worker_id=self.cm.worker_id
         )
 
         # test is already running, nothing to set up
@@ -734,7 +925,7 @@ class _ClusterGetter:
             and self.cm._cluster_instance_num != -1
             and self.cm.cache.cluster_obj
         ):
-            self.cm._log(f"{test_on_worker[0]} already exists")
+            self.cm._log(f"c{test_on_worker[0].instance_num}: test already running on the worker")
             return True
 
         return False
@@ -744,7 +935,9 @@ class _ClusterGetter:
         if cget_status.restart_here:
             return False
 
-        restart_in_progress = list(cget_status.instance_dir.glob(f"{RESTART_IN_PROGRESS_GLOB}_*"))
+        restart_in_progress = self.cm.sched_state.exists(
+            kind=StatusKinds.RESTART_IN_PROGRESS, instance_num=cget_status.instance_num
+        )
         if restart_in_progress:
             # no log message here, it would be too many of them
             return True
@@ -753,14 +946,13 @@ class _ClusterGetter:
 
     def _marked_select_instance(self, cget_status: ClusterGetStatus) -> bool:
         """Select this cluster instance for running marked tests if possible."""
-        marked_running_my_here = list(
-            cget_status.instance_dir.glob(f"{TEST_CURR_MARK_GLOB}_{cget_status.mark}_*")
-        )
-        marked_running_my_anywhere = list(
-            self.cm.pytest_tmp_dir.glob(
-                f"{CLUSTER_DIR_TEMPLATE}*/{TEST_CURR_MARK_GLOB}_{cget_status.mark}_*"
-            )
+        sched_state = self.cm.sched_state
+        marked_running_my_anywhere = sched_state.query(
+            kind=StatusKinds.TEST_CURR_MARK, name=cget_status.mark
         )
+        marked_running_my_here = [
+            r for r in marked_running_my_anywhere if r.instance_num == cget_status.instance_num
+        ]
         if not marked_running_my_here and marked_running_my_anywhere:
             self.cm._log(
                 f"c{cget_status.instance_num}: tests marked with my mark '{cget_status.mark}' "
@@ -768,14 +960,12 @@ class _ClusterGetter:
             )
             return False
 
-        marked_starting_my_here = list(
-            cget_status.instance_dir.glob(f"{TEST_MARK_STARTING_GLOB}_{cget_status.mark}_*")
-        )
-        marked_starting_my_anywhere = list(
-            self.cm.pytest_tmp_dir.glob(
-                f"{CLUSTER_DIR_TEMPLATE}*/{TEST_MARK_STARTING_GLOB}_{cget_status.mark}_*"
-            )
+        marked_starting_my_anywhere = sched_state.query(
+            kind=StatusKinds.TEST_MARK_STARTING, name=cget_status.mark
         )
+        marked_starting_my_here = [
+            r for r in marked_starting_my_anywhere if r.instance_num == cget_status.instance_num
+        ]
         if not marked_starting_my_here and marked_starting_my_anywhere:
             self.cm._log(
                 f"c{cget_status.instance_num}: tests marked with my mark '{cget_status.mark}' "
@@ -789,7 +979,7 @@ class _ClusterGetter:
                 f"c{cget_status.instance_num}: locking to this cluster instance, "
                 f"it has my mark '{cget_status.mark}'"
             )
-        elif cget_status.marked_running_sfiles or cget_status.marked_starting_sfiles:
+        elif cget_status.marked_running or cget_status.marked_starting:
             self.cm._log(
                 f"c{cget_status.instance_num}: tests marked with other mark starting "
                 f"or running, I have different mark '{cget_status.mark}'"
@@ -800,13 +990,13 @@ class _ClusterGetter:
             # soon as possible (when all currently running tests are finished or the cluster is
             # restarted).
             cget_status.selected_instance = cget_status.instance_num
-            mark_starting_file = (
-                cget_status.instance_dir
-                / f"{TEST_MARK_STARTING_GLOB}_{cget_status.mark}_{self.cm.worker_id}"
+            self.cm._log(f"c{cget_status.instance_num}: initialized mark '{cget_status.mark}'")
+            sched_state.add(
+                instance_num=cget_status.instance_num,
+                kind=StatusKinds.TEST_MARK_STARTING,
+                worker_id=self.cm.worker_id,
+                name=cget_status.mark,
             )
-            if not mark_starting_file.exists():
-                self.cm._log(f"c{cget_status.instance_num}: initialized mark '{cget_status.mark}'")
-                helpers.touch(mark_starting_file)
 
         return True
 
@@ -817,12 +1007,9 @@ class _ClusterGetter:
         cget_status.restart_here = False
         cget_status.restart_ready = False
 
-        # remove status files that are checked by other workers
-        for sf in (
-            *cget_status.instance_dir.glob(f"{TEST_CURR_MARK_GLOB}_*"),
-            *cget_status.instance_dir.glob(f"{TEST_MARK_STARTING_GLOB}_*"),
-        ):
-            sf.unlink()
+        # remove status records that are checked by other workers
+        for kind in (StatusKinds.TEST_CURR_MARK, StatusKinds.TEST_MARK_STARTING):
+            self.cm.sched_state.remove(instance_num=cget_status.instance_num, kind=kind)
 
         dead_clusters = list(
             self.cm.pytest_tmp_dir.glob(f"{CLUSTER_DIR_TEMPLATE}*/{CLUSTER_DEAD_FILE}")
@@ -838,7 +1025,7 @@ class _ClusterGetter:
 
         # restart is needed when custom start command was specified and the test is marked test or
         # singleton
-        initial_marked_test = bool(cget_status.mark and not cget_status.marked_running_sfiles)
+        initial_marked_test = bool(cget_status.mark and not cget_status.marked_running)
         singleton_test = Resources.CLUSTER in cget_status.lock_resources
         new_cmd_restart = bool(cget_status.start_cmd and (initial_marked_test or singleton_test))
         will_restart = new_cmd_restart or self._is_restart_needed(cget_status.instance_num)
@@ -846,7 +1033,7 @@ class _ClusterGetter:
             return True
 
         # if tests are running on the instance, we cannot restart, therefore we cannot continue
-        if cget_status.started_tests_sfiles:
+        if cget_status.started_tests:
             self.cm._log(f"c{cget_status.instance_num}: tests are running, cannot restart")
             return False
 
@@ -859,11 +1046,9 @@ class _ClusterGetter:
         cget_status.restart_here = True
         cget_status.selected_instance = cget_status.instance_num
 
-        restart_in_progress_file = (
-            cget_status.instance_dir / f"{RESTART_IN_PROGRESS_GLOB}_{self.cm.worker_id}"
+        self.cm.sched_state.set_restart_in_progress(
+            instance_num=cget_status.instance_num, worker_id=self.cm.worker_id
         )
-        if not restart_in_progress_file.exists():
-            helpers.touch(restart_in_progress_file)
 
         return True
 
@@ -878,11 +1063,14 @@ class _ClusterGetter:
             cget_status.restart_ready = False
             cget_status.restart_here = False
 
-            # remove status files that are no longer valid after restart
-            for f in cget_status.instance_dir.glob(f"{RESTART_IN_PROGRESS_GLOB}_*"):
-                f.unlink()
-            for f in cget_status.instance_dir.glob(f"{RESTART_NEEDED_GLOB}_*"):
-                f.unlink()
+            # remove status records that are no longer valid after restart
+            self.cm.sched_state.finish_restart(instance_num=cget_status.instance_num)
+            # tests waiting for the restart to finish can now start
+            self.cm.wakeup.notify_all()
+            return True
+
+        # no need to wait for restart if there's a standby cluster instance ready to use
+        if self._swap_standby(cget_status):
             return True
 
         # NOTE: when `_restart` is called, the env variables needed for cluster start scripts need
@@ -893,42 +1081,381 @@ class _ClusterGetter:
         cget_status.restart_ready = True
         return False
 
-    def _create_test_status_files(self, cget_status: ClusterGetStatus) -> None:
-        """Create status files for test that is about to start on this cluster instance."""
-        # this test is a first marked test
-        if cget_status.mark and not cget_status.marked_running_sfiles:
-            self.cm._log(f"c{cget_status.instance_num}: starting '{cget_status.mark}' tests")
-            helpers.touch(
-                self.cm.instance_dir
-                / f"{TEST_CURR_MARK_GLOB}_{cget_status.mark}_{self.cm.worker_id}"
+    def _spawn_standby_boot(self, instance_num: int) -> None:
+        """Start booting of the standby cluster instance in a detached background process."""
+        instance_dir = self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+        instance_dir.mkdir(exist_ok=True)
+
+        cmd = [
+            sys.executable,
+            "-m",
+            "cardano_node_tests.utils.cluster_standby",
+            "--instance-num",
+            str(instance_num),
+            "--pytest-tmp-dir",
+            str(self.cm.pytest_tmp_dir),
+        ]
+        cli_coverage_dir = self.cm.pytest_config.getoption(artifacts.CLI_COVERAGE_ARG)
+        if cli_coverage_dir:
+            cmd.extend(["--cli-coverage-dir", str(cli_coverage_dir)])
+
+        # the env of this worker is set for the cluster instance the worker is using
+        env = {
+            **os.environ,
+            "CARDANO_NODE_SOCKET_PATH": str(configuration.STARTUP_CARDANO_NODE_SOCKET_PATH),
+        }
+
+        attempts = _load_standby_boot(instance_dir)["attempts"] + 1
+        self.cm._log(f"c{instance_num}: booting standby cluster instance (attempt {attempts})")
+        with open(instance_dir / STANDBY_BOOT_LOG, "a", encoding="utf-8") as logfile:
+            # pylint: disable=consider-using-with
+            proc = subprocess.Popen(
+                cmd,
+                stdout=logfile,
+                stderr=subprocess.STDOUT,
+                env=env,
+                cwd=instance_dir,
+                start_new_session=True,
+            )
+        StandbyBootCache.procs.append(proc)
+
+        # the PID is recorded under global lock, together with the `BOOTING` state
+        with open(instance_dir / STANDBY_BOOT_FILE, "w", encoding="utf-8") as outfile:
+            json.dump({"pid": proc.pid, "attempts": attempts}, outfile)
+
+    def _manage_standby_instances(self) -> None:
+        """Initialize pool of standby cluster instances and boot the pending ones.
+
+        Must be called under global lock.
+        """
+        sched_state = self.cm.sched_state
+
+        # the last `CLUSTERS_STANDBY_COUNT` instances start as standby
+        if not sched_state.exists(kind=StatusKinds.STANDBY_POOL, instance_num=0):
+            (self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}0").mkdir(exist_ok=True)
+            sched_state.add(
+                instance_num=0, kind=StatusKinds.STANDBY_POOL, worker_id=self.cm.worker_id
             )
-            for sf in cget_status.marked_starting_sfiles:
-                sf.unlink()
+            for instance_num in range(configuration.CLUSTERS_COUNT, self.cm.num_of_instances):
+                (self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}").mkdir(
+                    exist_ok=True
+                )
+                sched_state.set_standby_state(
+                    instance_num=instance_num,
+                    state=StandbyStates.PENDING,
+                    worker_id=self.cm.worker_id,
+                )
+
+        # reap boot processes that already exited
+        StandbyBootCache.procs = [p for p in StandbyBootCache.procs if p.poll() is None]
+
+        for instance_num in _fail_dead_standby_boots(
+            sched_state=sched_state, pytest_tmp_dir=self.cm.pytest_tmp_dir
+        ):
+            self.cm._log(f"c{instance_num}: standby boot process is gone")
+
+        # boot the failed standby instances again, unless they failed too many times
+        for rec in sched_state.query(kind=StatusKinds.STANDBY_STATE, name=StandbyStates.FAILED):
+            instance_dir = self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{rec.instance_num}"
+            if _load_standby_boot(instance_dir)["attempts"] >= STANDBY_BOOT_ATTEMPTS:
+                continue
+            self.cm._log(f"c{rec.instance_num}: retrying boot of standby cluster instance")
+            sched_state.set_standby_state(
+                instance_num=rec.instance_num,
+                state=StandbyStates.PENDING,
+                worker_id=self.cm.worker_id,
+            )
+
+        for rec in sched_state.query(kind=StatusKinds.STANDBY_STATE, name=StandbyStates.PENDING):
+            sched_state.set_standby_state(
+                instance_num=rec.instance_num,
+                state=StandbyStates.BOOTING,
+                worker_id=self.cm.worker_id,
+            )
+            self._spawn_standby_boot(rec.instance_num)
+
+    def _swap_standby(self, cget_status: ClusterGetStatus) -> bool:
+        """Replace cluster instance that needs restart with a ready standby cluster instance.
+
+        The replaced cluster instance becomes standby and is restarted in background.
+        Custom `start_cmd` still needs restart of the cluster instance by this worker.
+
+        Must be called under global lock.
+        """
+        if not configuration.CLUSTERS_STANDBY_COUNT or cget_status.start_cmd:
+            return False
+
+        sched_state = self.cm.sched_state
+        for rec in sched_state.query(kind=StatusKinds.STANDBY_STATE, name=StandbyStates.READY):
+            if self._is_healthy(rec.instance_num):
+                standby_num = rec.instance_num
+                break
+            # boot the unhealthy standby instance again
+            sched_state.set_standby_state(
+                instance_num=rec.instance_num,
+                state=StandbyStates.PENDING,
+                worker_id=self.cm.worker_id,
+            )
+        else:
+            return False
 
-        # create status file for each in-use resource
-        for r in cget_status.use_resources:
-            helpers.touch(self.cm.instance_dir / f"{RESOURCE_IN_USE_GLOB}_{r}_{self.cm.worker_id}")
+        dirty_num = cget_status.instance_num
+        self.cm._log(f"c{dirty_num}: swapping in standby cluster instance c{standby_num}")
 
-        # create status file for each locked resource
-        for r in cget_status.lock_resources:
-            helpers.touch(self.cm.instance_dir / f"{RESOURCE_LOCKED_GLOB}_{r}_{self.cm.worker_id}")
+        # remove status records that are no longer valid on the replaced cluster instance
+        for kind in (
+            StatusKinds.RESTART_IN_PROGRESS,
+            StatusKinds.RESTART_NEEDED,
+            StatusKinds.RESTART_AFTER_MARK,
+            StatusKinds.TEST_CURR_MARK,
+            StatusKinds.TEST_MARK_STARTING,
+        ):
+            sched_state.remove(instance_num=dirty_num, kind=kind)
+        sched_state.set_standby_state(
+            instance_num=dirty_num, state=StandbyStates.PENDING, worker_id=self.cm.worker_id
+        )
+        # new boot of the replaced instance, the boot attempts are counted from the start
+        (cget_status.instance_dir / STANDBY_BOOT_FILE).unlink(missing_ok=True)
+        sched_state.remove(instance_num=standby_num, kind=StatusKinds.STANDBY_STATE)
+
+        # continue on the standby cluster instance, it is freshly started
+        cget_status.restart_here = False
+        cget_status.selected_instance = standby_num
+        cget_status.instance_num = standby_num
+        cget_status.instance_dir = self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{standby_num}"
+        cget_status.started_tests = ()
+        cget_status.marked_starting = ()
+        cget_status.marked_running = ()
+        self.cm._cluster_instance_num = standby_num
+        cluster_nodes.set_cluster_env(standby_num)
+
+        self.cm._log_event("standby_swap", instance=dirty_num, standby=standby_num)
+        # tests waiting for the restart can now start on the standby instance
+        self.cm.wakeup.notify_all()
+        return True
+
+    @contextlib.contextmanager
+    def _scheduling_lock(self, cget_status: ClusterGetStatus) -> Iterator[None]:
+        """Acquire the global cluster lock and record for how long it was held - context manager.
+
+        All changes to scheduling state made under the lock are done in a single transaction.
+        """
+        with locking.FileLockIfXdist(self.cm.cluster_lock):
+            lock_start = time.perf_counter()
+            try:
+                with self.cm.sched_state.transaction():
+                    yield
+            finally:
+                cget_status.lock_time += time.perf_counter() - lock_start
+
+    def _create_test_status_records(self, cget_status: ClusterGetStatus) -> None:
+        """Create status records for test that is about to start on this cluster instance."""
+        sched_state = self.cm.sched_state
+        instance_num = cget_status.instance_num
+
+        # this test is a first marked test
+        if cget_status.mark and not cget_status.marked_running:
+            self.cm._log(f"c{instance_num}: starting '{cget_status.mark}' tests")
+            sched_state.set_mark(
+                instance_num=instance_num, mark=cget_status.mark, worker_id=self.cm.worker_id
+            )
+
+        # create status record for each in-use and locked resource
+        sched_state.acquire_resources(
+            instance_num=instance_num,
+            worker_id=self.cm.worker_id,
+            lock=list(cget_status.lock_resources),
+            use=list(cget_status.use_resources),
+        )
 
         # cleanup = cluster restart after test (group of tests) is finished
         if cget_status.cleanup:
             # cleanup after group of test that are marked with a marker
             if cget_status.mark:
-                self.cm._log(f"c{cget_status.instance_num}: cleanup and mark")
-                helpers.touch(
-                    self.cm.instance_dir / f"{RESTART_AFTER_MARK_GLOB}_{self.cm.worker_id}"
+                self.cm._log(f"c{instance_num}: cleanup and mark")
+                sched_state.add(
+                    instance_num=instance_num,
+                    kind=StatusKinds.RESTART_AFTER_MARK,
+                    worker_id=self.cm.worker_id,
                 )
             # cleanup after single test (e.g. singleton)
             else:
-                self.cm._log(f"c{cget_status.instance_num}: cleanup and not mark")
-                helpers.touch(self.cm.instance_dir / f"{RESTART_NEEDED_GLOB}_{self.cm.worker_id}")
+                self.cm._log(f"c{instance_num}: cleanup and not mark")
+                sched_state.set_needs_restart(
+                    instance_num=instance_num, worker_id=self.cm.worker_id
+                )
+
+        # test that waits for epoch boundaries, see `epoch_batching`
+        if cget_status.epoch_profile.boundaries > 0:
+            sched_state.add(
+                instance_num=instance_num,
+                kind=StatusKinds.EPOCH_WAIT,
+                worker_id=self.cm.worker_id,
+                name=cget_status.epoch_profile.to_name(),
+            )
+
+        self.cm._log(f"c{instance_num}: creating 'test running' status record")
+        sched_state.add(
+            instance_num=instance_num, kind=StatusKinds.TEST_RUNNING, worker_id=self.cm.worker_id
+        )
+
+    def _get_instances_order(self, cget_status: ClusterGetStatus) -> List[int]:
+        """Return cluster instances in order in which the test should try them."""
+        instances = range(self.cm.num_of_instances)
+        if cget_status.epoch_profile.boundaries < 1 or cget_status.selected_instance != -1:
+            return list(instances)
+
+        running: Dict[int, List[epoch_batching.EpochProfile]] = {}
+        for rec in self.cm.sched_state.query(kind=StatusKinds.EPOCH_WAIT):
+            running.setdefault(rec.instance_num, []).append(
+                epoch_batching.EpochProfile.from_name(rec.name)
+            )
+
+        return epoch_batching.order_instances(
+            profile=cget_status.epoch_profile, instances=instances, running=running
+        )
+
+    def _select_instance(  # noqa: C901
+        self,
+        cget_status: ClusterGetStatus,
+        marked_tests_cache: Dict[int, MarkedTestsStatus],
+    ) -> bool:
+        """Try all cluster instances and select the one where the test can start.
 
-        self.cm._log(f"c{self.cm.cluster_instance_num}: creating 'test running' status file")
-        test_running_file = self.cm.instance_dir / f"{TEST_RUNNING_GLOB}_{self.cm.worker_id}"
-        helpers.touch(test_running_file)
+        Must be called under global lock.
+
+        Returns:
+            bool: True if the test can start on the selected instance.
+        """
+        # pylint: disable=too-many-branches
+        sched_state = self.cm.sched_state
+        mark = cget_status.mark
+
+        # The selected instance could have been swapped out for a standby instance by other
+        # worker in the meantime (e.g. when restarting after tests with the same mark), select
+        # the instance again.
+        if (
+            configuration.CLUSTERS_STANDBY_COUNT
+            and cget_status.selected_instance != -1
+            and sched_state.exists(
+                kind=StatusKinds.STANDBY_STATE, instance_num=cget_status.selected_instance
+            )
+        ):
+            self.cm._log(f"c{cget_status.selected_instance}: selected instance is now standby")
+            cget_status.selected_instance = -1
+            cget_status.restart_here = False
+
+        for instance_num in self._get_instances_order(cget_status):
+            # there's only one cluster instance when `DEV_CLUSTER_RUNNING` is set
+            if configuration.DEV_CLUSTER_RUNNING and instance_num != 0:
+                continue
+
+            # if instance to run the test on was already decided, skip all other instances
+            # pylint: disable=consider-using-in
+            if (
+                cget_status.selected_instance != -1
+                and instance_num != cget_status.selected_instance
+            ):
+                continue
+
+            # standby cluster instances are not used for running tests until swapped in
+            if configuration.CLUSTERS_STANDBY_COUNT and sched_state.exists(
+                kind=StatusKinds.STANDBY_STATE, instance_num=instance_num
+            ):
+                continue
+
+            cget_status.instance_num = instance_num
+            cget_status.instance_dir = (
+                self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+            )
+            cget_status.instance_dir.mkdir(exist_ok=True)
+
+            # cleanup cluster instance where attempt to start cluster failed repeatedly
+            if (cget_status.instance_dir / CLUSTER_DEAD_FILE).exists():
+                self._cleanup_dead_clusters(cget_status)
+                cget_status.wait_reason = WaitReasons.CLUSTER_DEAD
+                continue
+
+            # cluster restart planned or in progress, so no new tests can start
+            if self._restarted_by_other_worker(cget_status):
+                cget_status.sleep_delay = 5
+                cget_status.wait_reason = WaitReasons.RESTART_IN_PROGRESS
+                continue
+
+            # are there tests already running on this cluster instance?
+            cget_status.started_tests = sched_state.query(
+                kind=StatusKinds.TEST_RUNNING, instance_num=instance_num
+            )
+
+            # "marked tests" = group of tests marked with a specific mark.
+            # While these tests are running, no unmarked test can start.
+            cget_status.marked_starting = sched_state.query(
+                kind=StatusKinds.TEST_MARK_STARTING, instance_num=instance_num
+            )
+            cget_status.marked_running = sched_state.query(
+                kind=StatusKinds.TEST_CURR_MARK, instance_num=instance_num
+            )
+
+            # if marked tests are already running, update their status
+            self._update_marked_tests(
+                marked_tests_cache=marked_tests_cache, cget_status=cget_status
+            )
+
+            # test has mark
+            if mark:
+                # select this instance for running marked tests if possible
+                if not self._marked_select_instance(cget_status):
+                    cget_status.sleep_delay = 2
+                    cget_status.wait_reason = WaitReasons.MARK_CONFLICT
+                    continue
+
+                # check if we need to wait until unmarked tests are finished
+                if not cget_status.marked_running and cget_status.started_tests:
+                    cget_status.sleep_delay = 10
+                    cget_status.wait_reason = WaitReasons.MARK_CONFLICT
+                    continue
+
+                self.cm._log(
+                    f"c{instance_num}: in marked tests branch, I have required mark '{mark}'"
+                )
+
+            # no unmarked test can run while marked tests are starting or running
+            elif cget_status.marked_running or cget_status.marked_starting:
+                self.cm._log(
+                    f"c{instance_num}: marked tests starting or running, I don't have mark"
+                )
+                cget_status.sleep_delay = 2
+                cget_status.wait_reason = WaitReasons.MARK_CONFLICT
+                continue
+
+            # check availability of the required resources
+            if not self._are_resources_available(cget_status):
+                cget_status.sleep_delay = 5
+                cget_status.wait_reason = WaitReasons.RESOURCE_LOCKED
+                continue
+
+            # if restart is needed, indicate that the cluster will be restarted
+            # (after all currently running tests are finished)
+            if not self._init_restart(cget_status):
+                cget_status.wait_reason = WaitReasons.RESTART_PENDING
+                continue
+
+            # we've found suitable cluster instance
+            cget_status.selected_instance = instance_num
+            self.cm._cluster_instance_num = instance_num
+            self.cm._log(f"c{instance_num}: can run test '{cget_status.current_test}'")
+            # set environment variables that are needed when restarting the cluster
+            # and running tests
+            cluster_nodes.set_cluster_env(instance_num)
+
+            # if needed, finish restart related actions
+            if not self._finish_restart(cget_status):
+                continue
+
+            # from this point on, all conditions needed to start the test are met
+            return True
+
+        return False
 
     def get(  # noqa: C901
         self,
@@ -937,11 +1464,13 @@ class _ClusterGetter:
         use_resources: Iterable[str] = (),
         cleanup: bool = False,
         start_cmd: str = "",
+        epoch_profile: epoch_batching.EpochProfile = epoch_batching.EpochProfile(),
     ) -> clusterlib.ClusterLib:
         """Return the `clusterlib.ClusterLib` instance once we can start the test.
 
         It checks current conditions and waits if the conditions don't allow to start the test
-        right away.
+        right away. Tests that declare epoch-time profile prefer cluster instances where tests
+        with compatible profile are running, see `epoch_batching`.
         """
         # pylint: disable=too-many-statements,too-many-branches
         assert not isinstance(lock_resources, str), "`lock_resources` must be sequence of strings"
@@ -981,6 +1510,7 @@ class _ClusterGetter:
             cleanup=cleanup,
             start_cmd=start_cmd,
             current_test=os.environ.get("PYTEST_CURRENT_TEST") or "",
+            epoch_profile=epoch_profile,
         )
         marked_tests_cache: Dict[int, MarkedTestsStatus] = {}
 
@@ -989,13 +1519,37 @@ class _ClusterGetter:
         # iterate until it is possible to start the test
         while True:
             if cget_status.restart_ready:
-                self._restart(start_cmd=start_cmd)
+                restart_start = time.perf_counter()
+                restarted = self._restart(start_cmd=start_cmd)
+                restart_time = time.perf_counter() - restart_start
+                cget_status.restart_time += restart_time
+                self.cm._log_event(
+                    "restart",
+                    instance=cget_status.instance_num,
+                    duration=restart_time,
+                    start_cmd=start_cmd,
+                    success=restarted,
+                )
+            # Wait until other worker changes scheduling state, or until the delay expires.
+            # The notification is just a hint to check again, the delay is a safety net
+            # for changes that are not notified (e.g. failed services).
+            elif not cget_status.first_iteration:
+                wait_start = time.perf_counter()
+                cget_status.notified = self.cm.wakeup.wait(
+                    timeout=random.uniform(0.6, 1.2) * cget_status.sleep_delay
+                )
+                wait_reason = cget_status.wait_reason or WaitReasons.UNKNOWN
+                cget_status.wait_times[wait_reason] = (
+                    cget_status.wait_times.get(wait_reason, 0.0) + time.perf_counter() - wait_start
+                )
 
-            if not cget_status.first_iteration:
-                xdist_sleep(random.uniform(0.6, 1.2) * cget_status.sleep_delay)
+            cget_status.iterations += 1
 
             # nothing time consuming can go under this lock as all other workers will need to wait
-            with locking.FileLockIfXdist(self.cm.cluster_lock):
+            with self._scheduling_lock(cget_status):
+                # all notifications sent so far are reflected in the current scheduling state
+                self.cm.wakeup.drain()
+
                 if self._is_already_running(cget_status):
                     if not self.cm.cache.cluster_obj:
                         raise AssertionError("`cluster_obj` not available, that cannot happen")
@@ -1005,113 +1559,16 @@ class _ClusterGetter:
                 cget_status.first_iteration = False
                 self.cm._cluster_instance_num = -1
 
-                # try all existing cluster instances
-                for instance_num in range(self.cm.num_of_instances):
-                    # there's only one cluster instance when `DEV_CLUSTER_RUNNING` is set
-                    if configuration.DEV_CLUSTER_RUNNING and instance_num != 0:
-                        continue
-
-                    # if instance to run the test on was already decided, skip all other instances
-                    # pylint: disable=consider-using-in
-                    if (
-                        cget_status.selected_instance != -1
-                        and instance_num != cget_status.selected_instance
-                    ):
-                        continue
-
-                    cget_status.instance_num = instance_num
-                    cget_status.instance_dir = (
-                        self.cm.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
-                    )
-                    cget_status.instance_dir.mkdir(exist_ok=True)
-
-                    # cleanup cluster instance where attempt to start cluster failed repeatedly
-                    if (cget_status.instance_dir / CLUSTER_DEAD_FILE).exists():
-                        self._cleanup_dead_clusters(cget_status)
-                        continue
-
-                    # cluster restart planned or in progress, so no new tests can start
-                    if self._restarted_by_other_worker(cget_status):
-                        cget_status.sleep_delay = 5
-                        continue
-
-                    # are there tests already running on this cluster instance?
-                    cget_status.started_tests_sfiles = list(
-                        cget_status.instance_dir.glob(f"{TEST_RUNNING_GLOB}_*")
-                    )
-
-                    # "marked tests" = group of tests marked with a specific mark.
-                    # While these tests are running, no unmarked test can start.
-                    cget_status.marked_starting_sfiles = list(
-                        cget_status.instance_dir.glob(f"{TEST_MARK_STARTING_GLOB}_*")
-                    )
-                    cget_status.marked_running_sfiles = list(
-                        cget_status.instance_dir.glob(f"{TEST_CURR_MARK_GLOB}_*")
-                    )
-
-                    # if marked tests are already running, update their status
-                    self._update_marked_tests(
-                        marked_tests_cache=marked_tests_cache, cget_status=cget_status
-                    )
-
-                    # test has mark
-                    if mark:
-                        # select this instance for running marked tests if possible
-                        if not self._marked_select_instance(cget_status):
-                            cget_status.sleep_delay = 2
-                            continue
-
-                        # check if we need to wait until unmarked tests are finished
-                        if (
-                            not cget_status.marked_running_sfiles
-                            and cget_status.started_tests_sfiles
-                        ):
-                            cget_status.sleep_delay = 10
-                            continue
-
-                        self.cm._log(
-                            f"c{instance_num}: in marked tests branch, "
-                            f"I have required mark '{mark}'"
-                        )
-
-                    # no unmarked test can run while marked tests are starting or running
-                    elif cget_status.marked_running_sfiles or cget_status.marked_starting_sfiles:
-                        self.cm._log(
-                            f"c{instance_num}: marked tests starting or running, "
-                            f"I don't have mark"
-                        )
-                        cget_status.sleep_delay = 2
-                        continue
-
-                    # check availability of the required resources
-                    if not self._are_resources_available(cget_status):
-                        cget_status.sleep_delay = 5
-                        continue
-
-                    # if restart is needed, indicate that the cluster will be restarted
-                    # (after all currently running tests are finished)
-                    if not self._init_restart(cget_status):
-                        continue
-
-                    # we've found suitable cluster instance
-                    cget_status.selected_instance = instance_num
-                    self.cm._cluster_instance_num = instance_num
-                    self.cm._log(f"c{instance_num}: can run test '{cget_status.current_test}'")
-                    # set environment variables that are needed when restarting the cluster
-                    # and running tests
-                    cluster_nodes.set_cluster_env(instance_num)
-
-                    # if needed, finish restart related actions
-                    if not self._finish_restart(cget_status):
-                        continue
-
-                    # from this point on, all conditions needed to start the test are met
-                    break
-                else:
-                    # if the test cannot start on any instance, return to top-level loop
+                if configuration.CLUSTERS_STANDBY_COUNT:
+                    self._manage_standby_instances()
+
+                # if the test cannot start on any instance, return to top-level loop
+                if not self._select_instance(
+                    cget_status=cget_status, marked_tests_cache=marked_tests_cache
+                ):
                     continue
 
-                self._create_test_status_files(cget_status)
+                self._create_test_status_records(cget_status)
 
                 # Check if it is necessary to reload data. This still needs to happen under
                 # global lock.
@@ -1121,6 +1578,28 @@ class _ClusterGetter:
                 # cluster is ready, we can start the test
                 break
 
+        instance_num = cget_status.instance_num
+        self.cm._log(
+            f"c{instance_num}: got cluster instance after {cget_status.iterations} iteration(s), "
+            f"global lock held for {cget_status.lock_time:.3f}s"
+        )
+        self.cm._log_event(
+            "test_start",
+            test=cget_status.current_test,
+            instance=instance_num,
+            mark=cget_status.mark,
+            lock_resources=sorted(cget_status.lock_resources),
+            use_resources=sorted(cget_status.use_resources),
+            cleanup=cget_status.cleanup,
+            start_cmd=cget_status.start_cmd,
+            epoch_profile=cget_status.epoch_profile._asdict(),
+            iterations=cget_status.iterations,
+            lock_time=cget_status.lock_time,
+            restart_time=cget_status.restart_time,
+            wait_times=cget_status.wait_times,
+            get_time=time.perf_counter() - cget_status.get_start,
+        )
+
         cluster_obj = self.cm.cache.cluster_obj
         if not cluster_obj:
             raise AssertionError("`cluster_obj` not available, that cannot happen")
@@ -3,6 +3,7 @@ import json
 import logging
 import os
 import pickle
+import re
 from pathlib import Path
 from typing import Any
 from typing import Dict
@@ -14,11 +15,14 @@ from typing import Union
 
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import cli_cache
 from cardano_node_tests.utils import cluster_scripts
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import slots_offset
+from cardano_node_tests.utils import supervisor_rpc
+from cardano_node_tests.utils import utxo_cache
 from cardano_node_tests.utils.types import FileType
 
 LOGGER = logging.getLogger(__name__)
@@ -120,7 +124,7 @@ class LocalCluster(ClusterType):
     ) -> clusterlib.ClusterLib:
         """Return instance of `ClusterLib` (cluster_obj)."""
         cluster_env = get_cluster_env()
-        cluster_obj = clusterlib.ClusterLib(
+        cluster_obj = utxo_cache.UtxoCacheClusterLib(
             state_dir=cluster_env.state_dir,
             protocol=protocol or clusterlib.Protocols.CARDANO,
             tx_era=tx_era or cluster_env.tx_era,
@@ -153,6 +157,17 @@ class LocalCluster(ClusterType):
                 "payment": payment,
             }
 
+        # split faucet into shards, so multiple workers can fund addresses at the same time
+        faucet_shards = [
+            cluster_obj.gen_payment_addr_and_keys(
+                name=f"{self.test_addr_records[0]}_ci{instance_num}_shard{i}",
+                destination_dir=destination_dir,
+            )
+            for i in range(configuration.FAUCET_SHARDS)
+        ]
+        if faucet_shards:
+            new_addrs_data[self.test_addr_records[0]]["shards"] = faucet_shards
+
         # create records for existing byron addresses
         byron_addrs_data: Dict[str, Dict[str, Any]] = {}
         byron_dir = get_cluster_env().state_dir / "byron"
@@ -171,6 +186,7 @@ class LocalCluster(ClusterType):
         # fund new addresses from byron address
         LOGGER.debug("Funding created addresses.")
         to_fund = [d["payment"] for d in new_addrs_data.values()]
+        to_fund.extend(faucet_shards)
         clusterlib_utils.fund_from_faucet(
             *to_fund,
             cluster_obj=cluster_obj,
@@ -259,7 +275,7 @@ class TestnetCluster(ClusterType):
     ) -> clusterlib.ClusterLib:
         """Return instance of `ClusterLib` (cluster_obj)."""
         cluster_env = get_cluster_env()
-        cluster_obj = clusterlib.ClusterLib(
+        cluster_obj = cli_cache.CliCacheClusterLib(
             state_dir=cluster_env.state_dir,
             protocol=protocol or clusterlib.Protocols.CARDANO,
             tx_era=tx_era or cluster_env.tx_era,
@@ -377,37 +393,43 @@ def start_cluster(cmd: str, args: List[str]) -> clusterlib.ClusterLib:
     return get_cluster_type().get_cluster_obj()
 
 
-def restart_all_nodes(instance_num: Optional[int] = None) -> None:
-    """Restart all Cardano nodes of the running cluster."""
-    LOGGER.info("Restarting all cluster nodes.")
-
+def _get_supervisor_client(instance_num: Optional[int] = None) -> supervisor_rpc.SupervisorClient:
     if instance_num is None:
         instance_num = get_cluster_env().instance_num
-
     supervisor_port = get_cluster_type().cluster_scripts.get_instance_ports(instance_num).supervisor
-    try:
-        helpers.run_command(f"supervisorctl -s http://localhost:{supervisor_port} restart nodes:")
-    except Exception as exc:
-        LOGGER.debug(f"Failed to restart cluster nodes: {exc}")
+    return supervisor_rpc.get_client(port=supervisor_port)
+
+
+def invalidate_services_status(instance_num: Optional[int] = None) -> None:
+    """Drop cached status of services, e.g. when the cluster instance was restarted."""
+    _get_supervisor_client(instance_num=instance_num).invalidate_status()
+
+
+def restart_all_nodes(instance_num: Optional[int] = None) -> None:
+    """Restart all Cardano nodes of the running cluster."""
+    LOGGER.info("Restarting all cluster nodes.")
+    services_action(service_names=["nodes:"], action="restart", instance_num=instance_num)
 
 
 def services_action(
     service_names: List[str], action: str, instance_num: Optional[int] = None
 ) -> None:
-    """Restart list of services running on the running cluster."""
+    """Perform action on list of services running on the running cluster.
+
+    The action is performed on all the services in a single request to supervisord.
+    """
     LOGGER.info(f"Performing '{action}' action on services {service_names}.")
 
-    if instance_num is None:
-        instance_num = get_cluster_env().instance_num
+    try:
+        faults = _get_supervisor_client(instance_num=instance_num).services_action(
+            service_names=service_names, action=action
+        )
+    except Exception as exc:
+        LOGGER.debug(f"Failed to {action} services {service_names}: {exc}")
+        return
 
-    supervisor_port = get_cluster_type().cluster_scripts.get_instance_ports(instance_num).supervisor
-    for service_name in service_names:
-        try:
-            helpers.run_command(
-                f"supervisorctl -s http://localhost:{supervisor_port} {action} {service_name}"
-            )
-        except Exception as exc:
-            LOGGER.debug(f"Failed to restart service `{service_name}`: {exc}")
+    for fault in faults:
+        LOGGER.debug(f"Failed to {action} service: {fault}")
 
 
 def start_nodes(node_names: List[str], instance_num: Optional[int] = None) -> None:
@@ -428,44 +450,49 @@ def restart_nodes(node_names: List[str], instance_num: Optional[int] = None) ->
     services_action(service_names=service_names, action="restart", instance_num=instance_num)
 
 
+def _get_service_status(process_info: Dict[str, Any]) -> ServiceStatus:
+    """Convert process info returned by supervisord to `ServiceStatus`."""
+    description = process_info["description"]
+    # description of running process is e.g. "pid 1234, uptime 0:01:02"
+    uptime_match = re.search(r"uptime (\S+)", description)
+    is_running_desc = description.startswith("pid ")
+    return ServiceStatus(
+        name=supervisor_rpc.get_namespec(process_info),
+        status=process_info["statename"],
+        pid=process_info["pid"] or None,
+        uptime=uptime_match.group(1) if uptime_match else None,
+        message="" if is_running_desc else description,
+    )
+
+
 def services_status(
-    service_names: Optional[List[str]] = None, instance_num: Optional[int] = None
+    service_names: Optional[List[str]] = None,
+    instance_num: Optional[int] = None,
+    max_age: float = 0.0,
 ) -> List[ServiceStatus]:
-    """Return status info for list of services running on the running cluster (all by default)."""
-    if instance_num is None:
-        instance_num = get_cluster_env().instance_num
+    """Return status info for list of services running on the running cluster (all by default).
 
-    supervisor_port = get_cluster_type().cluster_scripts.get_instance_ports(instance_num).supervisor
-    service_names_arg = " ".join(service_names) if service_names else "all"
+    Args:
+        service_names: A list of service names, e.g. "nodes:pool1", "nodes:" (optional).
+        instance_num: A cluster instance number (optional, current instance by default).
+        max_age: Max age in seconds of cached status snapshot that can be used (optional,
+            the status is always fetched by default).
 
-    status_out = (
-        helpers.run_command(
-            f"supervisorctl -s http://localhost:{supervisor_port} status {service_names_arg}",
-            ignore_fail=True,
+    Returns:
+        List[ServiceStatus]: A list of services statuses.
+    """
+    try:
+        process_infos = _get_supervisor_client(instance_num=instance_num).get_all_process_info(
+            max_age=max_age
         )
-        .decode()
-        .strip()
-        .split("\n")
-    )
+    except Exception as exc:
+        LOGGER.debug(f"Failed to get status of services: {exc}")
+        return []
 
-    statuses = []
-    for status_line in status_out:
-        service_name, status, *running_status = status_line.split()
-        if running_status and running_status[0] == "pid":
-            _pid, pid, _uptime, uptime, *other = running_status
-            message = " ".join(other)
-        else:
-            pid, uptime = "", ""
-            message = " ".join(running_status)
-        statuses.append(
-            ServiceStatus(
-                name=service_name,
-                status=status,
-                pid=int(pid.rstrip(",")) if pid else None,
-                uptime=uptime or None,
-                message=message,
-            )
-        )
+    statuses = [_get_service_status(p) for p in process_infos]
+    if service_names:
+        names = set(service_names)
+        statuses = [s for s in statuses if s.name in names or f"{s.name.split(':')[0]}:" in names]
 
     return statuses
 
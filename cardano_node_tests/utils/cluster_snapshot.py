@@ -0,0 +1,278 @@
+"""Snapshots of local cluster instance state.
+
+Starting a local cluster instance replays the whole bootstrap (genesis creation, hard forks
+through eras, pools registration, funding of faucet addresses). After the first successful start
+of a given set of cluster scripts, the state of the cluster instance is archived. Subsequent
+restarts restore the archive instead, with system start times in genesis files shifted by the time
+elapsed since the snapshot was taken, so the restored chain continues from its tip.
+
+Shifting the start times changes the genesis hashes the node databases were built with. A restored
+cluster instance whose tip is behind the tip recorded in the snapshot (e.g. the nodes dropped
+their databases and started from genesis) is considered broken, and the snapshot is discarded.
+
+Snapshots are enabled by setting `CLUSTER_SNAPSHOTS_DIR`.
+"""
+import datetime
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+import tarfile
+import time
+from pathlib import Path
+from typing import Any
+from typing import Optional
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import cluster_scripts
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils.versions import VERSIONS
+
+LOGGER = logging.getLogger(__name__)
+
+SNAPSHOT_SUFFIX = ".tar.gz"
+SNAPSHOT_META = "snapshot_meta.json"
+ADDRS_DATA_ARCNAME = "addrs_data"
+
+# env variables that change the state of started cluster instance
+SNAPSHOT_ENV_KNOBS = ("ENABLE_P2P", "FAUCET_SHARDS", "SKIP_PLUTUSV2", "UPDATE_COST_MODEL")
+
+# runtime files that must not be restored
+EXCLUDED_SUFFIXES = (".socket", ".pid", ".stdout", ".stderr", ".log")
+
+SHELLEY_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def get_snapshot_file(startup_files: cluster_scripts.InstanceFiles) -> Optional[Path]:
+    """Return path to snapshot of cluster instance started with the given startup files.
+
+    Returns:
+        Optional[Path]: Path to the snapshot file (it doesn't need to exist yet), or None
+            if snapshots are not available.
+    """
+    if not configuration.CLUSTER_SNAPSHOTS_DIR:
+        return None
+    # the db-sync database is not part of the snapshot
+    if configuration.HAS_DBSYNC:
+        return None
+    if cluster_nodes.get_cluster_type().type != cluster_nodes.ClusterType.LOCAL:
+        return None
+
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    hash_o = hashlib.sha256()
+    for fpath in sorted(p for p in startup_files.dir.rglob("*") if p.is_file()):
+        hash_o.update(str(fpath.relative_to(startup_files.dir)).encode("utf-8"))
+        hash_o.update(helpers.checksum(fpath).encode("utf-8"))
+    hash_o.update(startup_files.start_script.name.encode("utf-8"))
+    hash_o.update(" ".join(startup_files.start_script_args).encode("utf-8"))
+    for knob in SNAPSHOT_ENV_KNOBS:
+        hash_o.update(f"{knob}={os.environ.get(knob) or ''}".encode("utf-8"))
+    hash_o.update(f"{VERSIONS.node}+{VERSIONS.git_rev}".encode("utf-8"))
+    # paths to the state dir are recorded in files of the cluster instance
+    hash_o.update(str(state_dir).encode("utf-8"))
+
+    return (
+        Path(configuration.CLUSTER_SNAPSHOTS_DIR)
+        / f"{state_dir.name}_{hash_o.hexdigest()[:16]}{SNAPSHOT_SUFFIX}"
+    )
+
+
+def _is_excluded(tarinfo: tarfile.TarInfo) -> Optional[tarfile.TarInfo]:
+    if tarinfo.name.endswith(EXCLUDED_SUFFIXES) or tarinfo.isfifo():
+        return None
+    return tarinfo
+
+
+def _wait_for_nodes(cluster_obj: clusterlib.ClusterLib) -> None:
+    """Wait until the cluster instance is producing blocks."""
+    socket_path = cluster_nodes.get_cluster_env().socket_path
+    helpers.wait_for(socket_path.is_socket, delay=2, num_sec=60, message="start cluster nodes")
+    cluster_obj.wait_for_new_block()
+
+
+def save_snapshot(
+    snapshot_file: Path, cluster_obj: clusterlib.ClusterLib, addrs_data_dir: Path
+) -> None:
+    """Save snapshot of running cluster instance.
+
+    Cluster nodes are stopped for the time the state is archived, so the node databases
+    are consistent.
+    """
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    LOGGER.info(f"Saving snapshot of '{state_dir}' to '{snapshot_file}'.")
+
+    # the nodes can produce more blocks until they are stopped, so this is the lowest tip
+    tip = cluster_obj.get_tip()
+    helpers.run_command(str(state_dir / "supervisord_stop"))
+    # the chain tip can't be past this time
+    snapshot_time = time.time()
+
+    with open(state_dir / SNAPSHOT_META, "w", encoding="utf-8") as out_json:
+        json.dump(
+            {
+                "snapshot_time": snapshot_time,
+                "addrs_data_dir": str(addrs_data_dir),
+                "tip_era": tip["era"],
+                "tip_block": tip["block"],
+            },
+            out_json,
+        )
+
+    # write to temporary file first, so incomplete snapshot is never used
+    tmp_file = snapshot_file.with_name(f".{snapshot_file.name}_{helpers.get_rand_str(4)}")
+    try:
+        snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        with tarfile.open(tmp_file, "w:gz") as tar:
+            tar.add(state_dir, arcname=state_dir.name, filter=_is_excluded)
+            tar.add(addrs_data_dir, arcname=ADDRS_DATA_ARCNAME, filter=_is_excluded)
+        os.replace(tmp_file, snapshot_file)
+    finally:
+        tmp_file.unlink(missing_ok=True)
+        (state_dir / SNAPSHOT_META).unlink(missing_ok=True)
+
+        # the cluster instance needs to keep running even if the snapshot failed
+        helpers.run_command(str(state_dir / "supervisord_start"))
+        _start_extra_services(state_dir)
+        _wait_for_nodes(cluster_obj)
+
+
+def _start_extra_services(state_dir: Path) -> None:
+    """Start services that are not started automatically by supervisord."""
+    with open(state_dir / "supervisor.conf", encoding="utf-8") as in_fp:
+        supervisor_conf = in_fp.read()
+    if "[program:submit_api]" in supervisor_conf:
+        helpers.run_command(f"{state_dir / 'supervisorctl'} start submit_api")
+
+
+def _shift_start_times(state_dir: Path, shift_sec: int) -> None:
+    """Shift system start times in genesis files and update genesis hashes in node configs."""
+    byron_genesis = state_dir / "byron" / "genesis.json"
+    shelley_genesis = state_dir / "shelley" / "genesis.json"
+
+    with open(byron_genesis, encoding="utf-8") as in_json:
+        byron_json = json.load(in_json)
+    byron_json["startTime"] = int(byron_json["startTime"]) + shift_sec
+    with open(byron_genesis, "w", encoding="utf-8") as out_json:
+        json.dump(byron_json, out_json, indent=4)
+
+    with open(shelley_genesis, encoding="utf-8") as in_json:
+        shelley_json = json.load(in_json)
+    shelley_start = datetime.datetime.strptime(shelley_json["systemStart"], SHELLEY_TIME_FORMAT)
+    shelley_json["systemStart"] = (shelley_start + datetime.timedelta(seconds=shift_sec)).strftime(
+        SHELLEY_TIME_FORMAT
+    )
+    with open(shelley_genesis, "w", encoding="utf-8") as out_json:
+        json.dump(shelley_json, out_json, indent=4)
+
+    with open(state_dir / "cluster_start_time", "w", encoding="utf-8") as out_fp:
+        out_fp.write(str(byron_json["startTime"]))
+
+    byron_hash = (
+        helpers.run_command(
+            f"cardano-cli byron genesis print-genesis-hash --genesis-json {byron_genesis}"
+        )
+        .decode()
+        .strip()
+    )
+    shelley_hash = (
+        helpers.run_command(f"cardano-cli genesis hash --genesis {shelley_genesis}")
+        .decode()
+        .strip()
+    )
+    for conf in state_dir.glob("config-*.json"):
+        with open(conf, encoding="utf-8") as in_json:
+            conf_json = json.load(in_json)
+        conf_json["ByronGenesisHash"] = byron_hash
+        conf_json["ShelleyGenesisHash"] = shelley_hash
+        with open(conf, "w", encoding="utf-8") as out_json:
+            json.dump(conf_json, out_json, indent=4)
+
+
+def _get_era_num(era_name: str) -> int:
+    era_num: int = getattr(VERSIONS, era_name.upper())
+    return era_num
+
+
+def _check_restored_tip(cluster_obj: clusterlib.ClusterLib, snapshot_meta: dict) -> None:
+    """Check that the restored chain continues from the tip recorded in the snapshot."""
+    if "tip_block" not in snapshot_meta:
+        raise RuntimeError("The snapshot doesn't contain the recorded tip.")
+
+    tip = cluster_obj.get_tip()
+    tip_era, tip_block = tip["era"], int(tip["block"])
+    snapshot_era, snapshot_block = snapshot_meta["tip_era"], int(snapshot_meta["tip_block"])
+    if _get_era_num(tip_era) < _get_era_num(snapshot_era) or tip_block < snapshot_block:
+        raise RuntimeError(
+            f"The restored chain doesn't continue from the snapshot: tip is at block "
+            f"{tip_block} in {tip_era} era, snapshot tip was at block {snapshot_block} "
+            f"in {snapshot_era} era."
+        )
+
+
+def _rebase_paths(obj: Any, old_dir: Path, new_dir: Path) -> Any:
+    """Replace `old_dir` with `new_dir` in all paths contained in `obj`."""
+    if isinstance(obj, Path):
+        try:
+            return new_dir / obj.relative_to(old_dir)
+        except ValueError:
+            return obj
+    if isinstance(obj, dict):
+        return {k: _rebase_paths(v, old_dir, new_dir) for k, v in obj.items()}
+    if isinstance(obj, tuple) and hasattr(obj, "_fields"):
+        return type(obj)(*(_rebase_paths(v, old_dir, new_dir) for v in obj))
+    if isinstance(obj, (list, tuple)):
+        return type(obj)(_rebase_paths(v, old_dir, new_dir) for v in obj)
+    return obj
+
+
+def restore_snapshot(snapshot_file: Path, addrs_data_dir: Path) -> clusterlib.ClusterLib:
+    """Restore cluster instance from snapshot and start it.
+
+    The cluster instance needs to be stopped and its state dir removed.
+    """
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    LOGGER.info(f"Restoring '{state_dir}' from snapshot '{snapshot_file}'.")
+
+    extract_dir = state_dir.parent / f".{state_dir.name}_{helpers.get_rand_str(4)}"
+    try:
+        with tarfile.open(snapshot_file, "r:gz") as tar:
+            tar.extractall(extract_dir)
+        (extract_dir / state_dir.name).rename(state_dir)
+        shutil.copytree(
+            extract_dir / ADDRS_DATA_ARCNAME, addrs_data_dir, symlinks=True, dirs_exist_ok=True
+        )
+    finally:
+        shutil.rmtree(extract_dir, ignore_errors=True)
+
+    with open(state_dir / SNAPSHOT_META, encoding="utf-8") as in_json:
+        snapshot_meta = json.load(in_json)
+    (state_dir / SNAPSHOT_META).unlink()
+
+    # start the restored chain at the point in time where it was stopped
+    shift_sec = int(time.time() - snapshot_meta["snapshot_time"]) + 1
+    _shift_start_times(state_dir=state_dir, shift_sec=shift_sec)
+
+    # addresses data refer to key files in the original addrs data dir
+    addrs_data_file = state_dir / cluster_nodes.ADDRS_DATA
+    with open(addrs_data_file, "rb") as in_data:
+        addrs_data = pickle.load(in_data)
+    addrs_data = _rebase_paths(
+        addrs_data, old_dir=Path(snapshot_meta["addrs_data_dir"]), new_dir=addrs_data_dir
+    )
+    with open(addrs_data_file, "wb") as out_data:
+        pickle.dump(addrs_data, out_data)
+
+    helpers.run_command(str(state_dir / "supervisord_start"))
+    _start_extra_services(state_dir)
+
+    cluster_obj = cluster_nodes.get_cluster_type().get_cluster_obj()
+    _wait_for_nodes(cluster_obj)
+    # the caller discards the snapshot and does the full bootstrap when the check fails
+    _check_restored_tip(cluster_obj=cluster_obj, snapshot_meta=snapshot_meta)
+    LOGGER.info("Cluster restored from snapshot.")
+    return cluster_obj
@@ -0,0 +1,117 @@
+"""Boot standby cluster instance in background.
+
+Standby cluster instances (see `CLUSTERS_STANDBY_COUNT`) are started with the default cluster
+scripts, outside of pytest workers. When a cluster instance needs restart, a ready standby
+instance is swapped in instead, and the replaced instance is restarted here to become a new
+standby instance. Boot that failed, or whose process is gone, is retried by the pytest workers
+up to `cluster_management.STANDBY_BOOT_ATTEMPTS` times.
+
+This module is executed by `cluster_management` as a detached process:
+
+    python -m cardano_node_tests.utils.cluster_standby --instance-num 3 --pytest-tmp-dir /tmp/x
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+from typing import Optional
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import cluster_management
+from cardano_node_tests.utils import cluster_nodes
+from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import scheduling_state
+from cardano_node_tests.utils.scheduling_state import StandbyStates
+
+LOGGER = logging.getLogger(__name__)
+
+
+def get_args() -> argparse.Namespace:
+    """Get command line arguments."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", maxsplit=1)[0])
+    parser.add_argument(
+        "--instance-num",
+        required=True,
+        type=int,
+        help="Number of the cluster instance",
+    )
+    parser.add_argument(
+        "--pytest-tmp-dir",
+        required=True,
+        type=Path,
+        help="Root of the pytest temporary directory",
+    )
+    parser.add_argument(
+        "--cli-coverage-dir",
+        type=Path,
+        help="Path to directory for storing coverage info",
+    )
+    return parser.parse_args()
+
+
+def boot_instance(
+    instance_num: int, pytest_tmp_dir: Path, cli_coverage_dir: Optional[Path]
+) -> bool:
+    """Restart the cluster instance with the default cluster scripts."""
+    instance_dir = pytest_tmp_dir / f"{cluster_management.CLUSTER_DIR_TEMPLATE}{instance_num}"
+
+    cluster_nodes.set_cluster_env(instance_num)
+    state_dir = cluster_nodes.get_cluster_env().state_dir
+    if (
+        state_dir.exists()
+        and not (state_dir / cluster_management.CLUSTER_STARTED_BY_FRAMEWORK).exists()
+    ):
+        LOGGER.error(f"Cluster instance in '{state_dir}' was not started by the framework.")
+        return False
+
+    startup_files_dir = instance_dir / "startup_files" / clusterlib.get_rand_str(8)
+    startup_files_dir.mkdir(exist_ok=True, parents=True)
+    startup_files = cluster_nodes.get_cluster_type().cluster_scripts.prepare_scripts_files(
+        destdir=startup_files_dir, instance_num=instance_num
+    )
+
+    cluster_obj = cluster_management.restart_instance(
+        instance_num=instance_num,
+        startup_files=startup_files,
+        pytest_tmp_dir=pytest_tmp_dir,
+        addrs_data_dir=instance_dir / f"addrs_data_{clusterlib.get_rand_str(4)}",
+        cli_coverage_dir=cli_coverage_dir,
+        log_func=LOGGER.info,
+    )
+    return cluster_obj is not None
+
+
+def main() -> int:
+    logging.basicConfig(
+        format="%(asctime)s %(name)s:%(levelname)s:%(message)s",
+        level=logging.INFO,
+    )
+    args = get_args()
+
+    try:
+        booted = boot_instance(
+            instance_num=args.instance_num,
+            pytest_tmp_dir=args.pytest_tmp_dir,
+            cli_coverage_dir=args.cli_coverage_dir,
+        )
+    except Exception:
+        LOGGER.exception(f"Failed to boot standby cluster instance {args.instance_num}")
+        booted = False
+
+    sched_state = scheduling_state.get_scheduling_state(pytest_tmp_dir=args.pytest_tmp_dir)
+    with locking.FileLockIfXdist(
+        f"{args.pytest_tmp_dir}/{cluster_management.CLUSTER_LOCK}"
+    ), sched_state.transaction():
+        sched_state.set_standby_state(
+            instance_num=args.instance_num,
+            state=StandbyStates.READY if booted else StandbyStates.FAILED,
+            worker_id=cluster_management.STANDBY_WORKER_ID,
+        )
+
+    # standby instance is not used by any test yet, no need to wake up waiting workers
+    return 0 if booted else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
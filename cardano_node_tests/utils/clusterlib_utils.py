@@ -1,14 +1,16 @@
 """Utilities that extends the functionality of `cardano-clusterlib`."""
 # pylint: disable=abstract-class-instantiated
 import contextlib
+import io
 import itertools
 import json
 import logging
 import math
-import time
+import subprocess
 from pathlib import Path
 from typing import Any
 from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import NamedTuple
 from typing import Optional
@@ -18,8 +20,15 @@ from typing import Union
 import cbor2
 from cardano_clusterlib import clusterlib
 
+from cardano_node_tests.utils import active_slots
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import crypto_fast
+from cardano_node_tests.utils import faucet
 from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import json_stream
+from cardano_node_tests.utils import ledger_archive
 from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import slot_clock
 from cardano_node_tests.utils import temptools
 from cardano_node_tests.utils.types import FileType
 
@@ -182,7 +191,10 @@ def fund_from_faucet(
     destination_dir: FileType = ".",
     force: bool = False,
 ) -> Optional[clusterlib.TxRawOutput]:
-    """Send `amount` from faucet addr to all `dst_addrs`."""
+    """Send `amount` from faucet addr to all `dst_addrs`.
+
+    See `faucet.send_funds` for how the faucet is shared by multiple workers.
+    """
     # get payment AddressRecord out of PoolUser
     dst_addr_records: List[clusterlib.AddressRecord] = [
         (r.payment if hasattr(r, "payment") else r) for r in dst_addrs  # type: ignore
@@ -198,19 +210,15 @@ def fund_from_faucet(
     if not fund_dst:
         return None
 
-    src_address = faucet_data["payment"].address
-    with locking.FileLockIfXdist(f"{temptools.get_basetemp()}/{src_address}.lock"):
-        tx_name = tx_name or helpers.get_timestamped_rand_str()
-        tx_name = f"{tx_name}_funding"
-        fund_tx_files = clusterlib.TxFiles(signing_key_files=[faucet_data["payment"].skey_file])
-
-        tx_raw_output = cluster_obj.send_funds(
-            src_address=src_address,
-            destinations=fund_dst,
-            tx_name=tx_name,
-            tx_files=fund_tx_files,
-            destination_dir=destination_dir,
-        )
+    tx_name = tx_name or helpers.get_timestamped_rand_str()
+    tx_name = f"{tx_name}_funding"
+    tx_raw_output = faucet.send_funds(
+        cluster_obj=cluster_obj,
+        faucet_data=faucet_data,
+        destinations=fund_dst,
+        tx_name=tx_name,
+        destination_dir=destination_dir,
+    )
 
     return tx_raw_output
 
@@ -754,7 +762,7 @@ def new_tokens(
     with open(f"{temp_template}.script", "w", encoding="utf-8") as out_json:
         json.dump(script_content, out_json)
 
-    policyid = cluster_obj.get_policyid(script)
+    policyid = crypto_fast.get_policyid(cluster_obj=cluster_obj, script_file=script)
 
     tokens_to_mint = []
     for asset_name in asset_names:
@@ -788,61 +796,81 @@ def new_tokens(
     return tokens_to_mint
 
 
+def query_ledger_state(
+    cluster_obj: clusterlib.ClusterLib,
+    include: Iterable[str] = (),
+    exclude: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """Return selected parts of `query ledger-state` output.
+
+    The output is processed as it is produced by `cardano-cli`, so the whole ledger state is
+    never held in memory.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        include: Selectors of parts of the ledger state to return (optional, everything
+            by default), e.g. `stateBefore.esSnapshots.pstakeMark`.
+        exclude: Selectors of parts of the ledger state to skip (optional).
+
+    Returns:
+        Dict[str, Any]: The ledger state limited to the selected parts.
+    """
+    cmd = [
+        "cardano-cli",
+        "query",
+        "ledger-state",
+        *cluster_obj.magic_args,
+        f"--{cluster_obj.protocol}-mode",
+    ]
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+        assert proc.stdout and proc.stderr
+        try:
+            ledger_state = json_stream.extract_json(
+                io.TextIOWrapper(proc.stdout, encoding="utf-8"), include=include, exclude=exclude
+            )
+        except Exception as err:
+            # the CLI can be blocked writing to the stdout pipe that is no longer read
+            proc.kill()
+            proc.stdout.close()
+            proc.wait()
+            if not isinstance(err, ValueError):
+                raise
+            raise clusterlib.CLIError(
+                f"Failed to get ledger state `{' '.join(cmd)}`: {proc.stderr.read().decode()}"
+            ) from err
+        # the rest of the output is not needed
+        if proc.poll() is None:
+            proc.kill()
+
+    return ledger_state
+
+
 def filtered_ledger_state(
     cluster_obj: clusterlib.ClusterLib,
 ) -> str:
     """Get filtered output of `query ledger-state`."""
-    cardano_cmd = " ".join(
-        [
-            "cardano-cli",
-            "query",
-            "ledger-state",
-            *cluster_obj.magic_args,
-            f"--{cluster_obj.protocol}-mode",
-        ]
-    )
-    # get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{cardano_cmd} | jq -n --stream -c "
-        "'fromstream(inputs|select((length == 2 and .[0][1] == \"esLState\")|not))'"
-    )
-
-    return helpers.run_in_bash(cmd).decode("utf-8").strip()
+    return json.dumps(get_ledger_state(cluster_obj))
 
 
 def get_blocks_before(
     cluster_obj: clusterlib.ClusterLib,
 ) -> Dict[str, int]:
     """Get `blocksBefore` section of ledger state with bech32 encoded pool ids."""
-    cardano_cmd = " ".join(
-        [
-            "cardano-cli",
-            "query",
-            "ledger-state",
-            *cluster_obj.magic_args,
-            f"--{cluster_obj.protocol}-mode",
-        ]
-    )
-    # get rid of a huge amount of data we don't have any use for
-    cmd = (
-        f"{cardano_cmd} | jq -n --stream -c "
-        "'fromstream(1|truncate_stream(inputs|select(.[0][0] == \"blocksBefore\")))'"
+    blocks_before: Dict[str, int] = (
+        query_ledger_state(cluster_obj=cluster_obj, include=["blocksBefore"]).get("blocksBefore")
+        or {}
     )
-
-    out_str = helpers.run_in_bash(cmd).decode("utf-8").strip()
-    out_json: dict = json.loads(out_str)
-    return {helpers.encode_bech32(prefix="pool", data=key): val for key, val in out_json.items()}
+    return {
+        helpers.encode_bech32(prefix="pool", data=key): val for key, val in blocks_before.items()
+    }
 
 
 def get_ledger_state(
     cluster_obj: clusterlib.ClusterLib,
 ) -> dict:
     """Return the current ledger state info."""
-    f_ledger_state = filtered_ledger_state(cluster_obj)
-    if not f_ledger_state:
-        return {}
-    ledger_state: dict = json.loads(f_ledger_state)
-    return ledger_state
+    # get rid of a huge amount of data we don't have any use for
+    return query_ledger_state(cluster_obj=cluster_obj, exclude=["*.esLState"])
 
 
 def save_ledger_state(
@@ -853,17 +881,27 @@ def save_ledger_state(
 ) -> Path:
     """Save ledger state to file.
 
+    With `LEDGER_STATE_ARCHIVE` set, the ledger state is saved to the archive instead of a JSON
+    file (see `ledger_archive.save_ledger_state`).
+
     Args:
         cluster_obj: An instance of `clusterlib.ClusterLib`.
         state_name: A name of the ledger state (can be epoch number, etc.).
         ledger_state: A dict with ledger state to save (optional).
-        destination_dir: A path to directory for storing the state JSON file (optional).
+        destination_dir: A path to directory for storing the state JSON file, or the archive
+            manifest together with the archive (optional).
 
     Returns:
-        Path: A path to the generated state JSON file.
+        Path: A path to the generated state JSON file, or to the archive manifest when
+            `LEDGER_STATE_ARCHIVE` is set.
     """
-    json_file = Path(destination_dir) / f"{state_name}_ledger_state.json"
     ledger_state = ledger_state or get_ledger_state(cluster_obj)
+    if configuration.LEDGER_STATE_ARCHIVE:
+        return ledger_archive.save_ledger_state(
+            ledger_state=ledger_state, state_name=state_name, destination_dir=destination_dir
+        )
+
+    json_file = Path(destination_dir) / f"{state_name}_ledger_state.json"
     with open(json_file, "w", encoding="utf-8") as fp_out:
         json.dump(ledger_state, fp_out, indent=4)
     return json_file
@@ -895,13 +933,23 @@ def wait_for_epoch_interval(
     if start_abs > stop_abs:
         raise AssertionError(f"The 'start' ({start_abs}) needs to be <= 'stop' ({stop_abs}).")
 
-    start_epoch = cluster_obj.get_epoch()
+    clock = slot_clock.get_slot_clock(cluster_obj)
+    tip = cluster_obj.get_tip()
+    start_epoch = int(tip["epoch"])
 
-    # wait for new block so we start counting with an up-to-date slot number
-    cluster_obj.wait_for_new_block()
+    # time within epoch can be computed from the slot clock, without querying the tip
+    use_clock = clock.check_drift(tip=tip)
+    if not use_clock:
+        # wait for new block so we start counting with an up-to-date slot number
+        cluster_obj.wait_for_new_block()
 
+    slept = False
     for __ in range(40):
-        s_from_epoch_start = cluster_obj.time_from_epoch_start()
+        # slot number of last block is checked after waiting, when `check_slot` is set
+        by_clock = use_clock and not (check_slot and slept)
+        s_from_epoch_start = (
+            clock.time_from_epoch_start() if by_clock else cluster_obj.time_from_epoch_start()
+        )
 
         # return if we are in the required interval
         if start_abs <= s_from_epoch_start <= stop_abs:
@@ -919,13 +967,15 @@ def wait_for_epoch_interval(
                     "in past 3 epochs."
                 )
             cluster_obj.wait_for_new_epoch()
+            slept = False
             continue
 
         # sleep until `start_abs`
         to_sleep = start_abs - s_from_epoch_start
         if to_sleep > 0:
-            # `to_sleep` is float, wait for at least 1 second
-            time.sleep(to_sleep if to_sleep > 1 else 1)
+            # the slot clock is precise, otherwise `to_sleep` is float, wait for at least 1 second
+            active_slots.sleep(to_sleep if (by_clock or to_sleep > 1) else 1)
+        slept = True
 
         # we can finish if slot number of last minted block doesn't need
         # to match the time interval
@@ -1002,7 +1052,8 @@ def datum_hash_from_txout(cluster_obj: clusterlib.ClusterLib, txout: clusterlib.
     )
 
     if script_data_file or script_data_cbor_file or script_data_value:
-        datum_hash = cluster_obj.get_hash_script_data(
+        datum_hash = crypto_fast.get_hash_script_data(
+            cluster_obj=cluster_obj,
             script_data_file=script_data_file,
             script_data_cbor_file=script_data_cbor_file,
             script_data_value=script_data_value,
@@ -1100,7 +1151,7 @@ def create_reference_utxo(
         join_txouts=False,
     )
 
-    txid = cluster_obj.get_txid(tx_body_file=tx_raw_output.out_file)
+    txid = crypto_fast.get_txid(cluster_obj=cluster_obj, tx_body_file=tx_raw_output.out_file)
 
     reference_utxos = cluster_obj.get_utxo(txin=f"{txid}#0")
     assert reference_utxos, "No reference script UTxO"
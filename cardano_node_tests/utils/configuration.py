@@ -53,6 +53,26 @@ SCHEDULING_LOG: Union[str, Path] = os.environ.get("SCHEDULING_LOG") or ""
 if SCHEDULING_LOG:
     SCHEDULING_LOG = Path(SCHEDULING_LOG).expanduser().resolve()
 
+# resolve CLUSTER_SNAPSHOTS_DIR
+CLUSTER_SNAPSHOTS_DIR: Union[str, Path] = os.environ.get("CLUSTER_SNAPSHOTS_DIR") or ""
+if CLUSTER_SNAPSHOTS_DIR:
+    CLUSTER_SNAPSHOTS_DIR = Path(CLUSTER_SNAPSHOTS_DIR).expanduser().resolve()
+
+# resolve CLI_CACHE_DIR
+CLI_CACHE_DIR: Union[str, Path] = os.environ.get("CLI_CACHE_DIR") or ""
+if CLI_CACHE_DIR:
+    CLI_CACHE_DIR = Path(CLI_CACHE_DIR).expanduser().resolve()
+
+# resolve SCHEDULING_EVENTS_LOG
+SCHEDULING_EVENTS_LOG: Union[str, Path] = os.environ.get("SCHEDULING_EVENTS_LOG") or ""
+if SCHEDULING_EVENTS_LOG:
+    SCHEDULING_EVENTS_LOG = Path(SCHEDULING_EVENTS_LOG).expanduser().resolve()
+
+# backend for storing scheduling state of cluster instances
+SCHEDULING_STATE_BACKEND = os.environ.get("SCHEDULING_STATE_BACKEND") or "sqlite"
+if SCHEDULING_STATE_BACKEND not in ("sqlite", "files"):
+    raise RuntimeError(f"Invalid SCHEDULING_STATE_BACKEND: {SCHEDULING_STATE_BACKEND}")
+
 
 CLUSTER_ERA = os.environ.get("CLUSTER_ERA") or ""
 if CLUSTER_ERA not in ("", "alonzo", "babbage"):
@@ -64,13 +84,41 @@ if TX_ERA not in ("", "shelley", "allegra", "mary", "alonzo", "babbage"):
 
 CLUSTERS_COUNT = int(os.environ.get("CLUSTERS_COUNT") or 0)
 WORKERS_COUNT = int(os.environ.get("PYTEST_XDIST_WORKER_COUNT") or 1)
-CLUSTERS_COUNT = int(CLUSTERS_COUNT or (WORKERS_COUNT if WORKERS_COUNT <= 9 else 9))
+
+# max number of pytest workers running tests at the same time; the extra workers run tests
+# while other tests are suspended, waiting for an epoch boundary
+ACTIVE_WORKERS = int(os.environ.get("ACTIVE_WORKERS") or 0)
+if ACTIVE_WORKERS >= WORKERS_COUNT:
+    ACTIVE_WORKERS = 0
+
+_RUNNING_COUNT = ACTIVE_WORKERS or WORKERS_COUNT
+CLUSTERS_COUNT = int(CLUSTERS_COUNT or (_RUNNING_COUNT if _RUNNING_COUNT <= 9 else 9))
 
 DEV_CLUSTER_RUNNING = bool(os.environ.get("DEV_CLUSTER_RUNNING"))
 FORBID_RESTART = bool(os.environ.get("FORBID_RESTART"))
 
 BOOTSTRAP_DIR = os.environ.get("BOOTSTRAP_DIR") or ""
 
+# number of faucet addresses (shards) created on local cluster instance, for parallel funding
+FAUCET_SHARDS = int(os.environ.get("FAUCET_SHARDS") or 8)
+
+# time window (in seconds) for coalescing funding requests of multiple workers into single tx
+FUNDING_BATCH_WINDOW = float(os.environ.get("FUNDING_BATCH_WINDOW") or 0)
+
+# cache results of UTxO queries for as long as the chain tip is the same
+UTXO_CACHE = bool(os.environ.get("UTXO_CACHE"))
+# compare cached results of UTxO queries with results returned by the node
+UTXO_CACHE_CHECK = bool(os.environ.get("UTXO_CACHE_CHECK"))
+
+# save ledger state dumps to compressed, deduplicated archive instead of JSON files
+LEDGER_STATE_ARCHIVE = bool(os.environ.get("LEDGER_STATE_ARCHIVE"))
+
+# number of extra local cluster instances booted in background, to replace instances that need
+# restart
+CLUSTERS_STANDBY_COUNT = int(os.environ.get("CLUSTERS_STANDBY_COUNT") or 0)
+if not IS_XDIST or DEV_CLUSTER_RUNNING or FORBID_RESTART or BOOTSTRAP_DIR:
+    CLUSTERS_STANDBY_COUNT = 0
+
 NOPOOLS = bool(os.environ.get("NOPOOLS"))
 
 HAS_DBSYNC = bool(os.environ.get("DBSYNC_REPO"))
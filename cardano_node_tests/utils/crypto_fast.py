@@ -0,0 +1,380 @@
+"""In-process implementations of frequently used pure `cardano-cli` and `bech32` operations.
+
+Transaction IDs, script hashes and datum hashes are blake2b hashes of CBOR data, and bech32
+is a simple encoding. Computing them in-process avoids spawning a process for every call.
+
+When native computation is not possible (e.g. unknown file format), the CLI is used instead.
+With `CRYPTO_FAST_CHECK` set, every result is compared with result of the CLI.
+
+The module is imported by `helpers`, so it must not import `configuration` - that would make
+`CARDANO_NODE_SOCKET_PATH` required even for tools that don't need any cluster.
+"""
+import hashlib
+import json
+import logging
+import os
+import subprocess
+from pathlib import Path
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+import cbor2
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils.types import FileType
+
+LOGGER = logging.getLogger(__name__)
+
+# compare results of in-process implementations of CLI operations with results of the CLI
+CRYPTO_FAST_CHECK = bool(os.environ.get("CRYPTO_FAST_CHECK"))
+
+BECH32_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+
+NATIVE_SCRIPT_TAG = 0
+PLUTUS_SCRIPT_TAGS = {"PlutusScriptV1": 1, "PlutusScriptV2": 2}
+NATIVE_SCRIPT_TYPES = {"sig": 0, "all": 1, "any": 2, "atLeast": 3, "after": 4, "before": 5}
+
+# byte strings in Plutus data are split into chunks of this size
+PLUTUS_DATA_CHUNK_SIZE = 64
+
+
+def _check_result(name: str, native: str, cli: str) -> None:
+    assert native == cli, f"Native `{name}` result '{native}' doesn't match CLI result '{cli}'"
+
+
+def _bech32_polymod(values: List[int]) -> int:
+    chk = 1
+    for value in values:
+        top = chk >> 25
+        chk = (chk & 0x1FFFFFF) << 5 ^ value
+        for i, gen in enumerate(BECH32_GENERATOR):
+            chk ^= gen if ((top >> i) & 1) else 0
+    return chk
+
+
+def _bech32_hrp_expand(hrp: str) -> List[int]:
+    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
+
+
+def _convert_bits(data: bytes, from_bits: int, to_bits: int, pad: bool) -> List[int]:
+    acc = 0
+    bits = 0
+    ret = []
+    maxv = (1 << to_bits) - 1
+    for value in data:
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            ret.append((acc >> bits) & maxv)
+    if pad:
+        if bits:
+            ret.append((acc << (to_bits - bits)) & maxv)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & maxv):
+        raise ValueError("Invalid padding in bech32 data.")
+    return ret
+
+
+def _run_bech32(stdin: str, args: Tuple[str, ...] = ()) -> str:
+    return (
+        subprocess.run(["bech32", *args], input=stdin.encode(), capture_output=True, check=True)
+        .stdout.decode()
+        .strip()
+    )
+
+
+def encode_bech32(prefix: str, data: str) -> str:
+    """Convert hex encoded data to bech32 string."""
+    values = _convert_bits(bytes.fromhex(data), 8, 5, pad=True)
+    polymod = _bech32_polymod(_bech32_hrp_expand(prefix) + values + [0] * 6) ^ 1
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    encoded = f"{prefix}1{''.join(BECH32_CHARSET[d] for d in values + checksum)}"
+
+    if CRYPTO_FAST_CHECK:
+        _check_result(name="encode_bech32", native=encoded, cli=_run_bech32(data, (prefix,)))
+    return encoded
+
+
+def decode_bech32(bech32: str) -> str:
+    """Convert from bech32 string to hex encoded data."""
+    bech32_lower = bech32.strip().lower()
+    sep_pos = bech32_lower.rfind("1")
+    if sep_pos < 1 or sep_pos + 7 > len(bech32_lower):
+        raise ValueError(f"Invalid bech32 string: {bech32}")
+    hrp = bech32_lower[:sep_pos]
+    values = [BECH32_CHARSET.index(c) for c in bech32_lower[sep_pos + 1 :]]
+    if _bech32_polymod(_bech32_hrp_expand(hrp) + values) != 1:
+        raise ValueError(f"Invalid checksum of bech32 string: {bech32}")
+    decoded = bytes(_convert_bits(bytes(values[:-6]), 5, 8, pad=False)).hex()
+
+    if CRYPTO_FAST_CHECK:
+        _check_result(name="decode_bech32", native=decoded, cli=_run_bech32(bech32))
+    return decoded
+
+
+def _cbor_head(data: bytes, pos: int) -> Tuple[int, Optional[int], int]:
+    """Parse head of CBOR data item.
+
+    Returns:
+        Tuple[int, Optional[int], int]: Major type, argument (None for indefinite length)
+            and position after the head.
+    """
+    major = data[pos] >> 5
+    info = data[pos] & 0x1F
+    pos += 1
+    if info < 24:
+        return major, info, pos
+    if info == 31:
+        return major, None, pos
+    if info > 27:
+        raise ValueError(f"Invalid CBOR additional info {info}.")
+    size = 1 << (info - 24)
+    return major, int.from_bytes(data[pos : pos + size], "big"), pos + size
+
+
+def _cbor_item_end(data: bytes, pos: int) -> int:
+    """Return position after the CBOR data item that starts at `pos`."""
+    major, arg, pos = _cbor_head(data, pos)
+    if arg is None:
+        if major not in (2, 3, 4, 5):
+            raise ValueError(f"Invalid indefinite length CBOR major type {major}.")
+        while data[pos] != 0xFF:
+            pos = _cbor_item_end(data, pos)
+        return pos + 1
+    if major in (2, 3):
+        return pos + arg
+    if major == 4:
+        for __ in range(arg):
+            pos = _cbor_item_end(data, pos)
+    elif major == 5:
+        for __ in range(arg * 2):
+            pos = _cbor_item_end(data, pos)
+    elif major == 6:
+        pos = _cbor_item_end(data, pos)
+    return pos
+
+
+def _cbor_encode_head(major: int, arg: int) -> bytes:
+    if arg < 24:
+        return bytes([major << 5 | arg])
+    for info, size in ((24, 1), (25, 2), (26, 4), (27, 8)):
+        if arg < 1 << (8 * size):
+            return bytes([major << 5 | info]) + arg.to_bytes(size, "big")
+    raise ValueError(f"CBOR argument {arg} is too big.")
+
+
+def _cbor_encode_bytes(value: bytes) -> bytes:
+    if len(value) <= PLUTUS_DATA_CHUNK_SIZE:
+        return _cbor_encode_head(2, len(value)) + value
+    chunks = [
+        value[i : i + PLUTUS_DATA_CHUNK_SIZE] for i in range(0, len(value), PLUTUS_DATA_CHUNK_SIZE)
+    ]
+    return b"\x5f" + b"".join(_cbor_encode_head(2, len(c)) + c for c in chunks) + b"\xff"
+
+
+def _cbor_encode_int(value: int) -> bytes:
+    if 0 <= value < 1 << 64:
+        return _cbor_encode_head(0, value)
+    if -(1 << 64) <= value < 0:
+        return _cbor_encode_head(1, -1 - value)
+    # bignum
+    tag, num = (2, value) if value > 0 else (3, -1 - value)
+    return _cbor_encode_head(6, tag) + _cbor_encode_bytes(
+        num.to_bytes((num.bit_length() + 7) // 8, "big")
+    )
+
+
+def _cbor_encode_list(items: List[bytes]) -> bytes:
+    if not items:
+        return b"\x80"
+    return b"\x9f" + b"".join(items) + b"\xff"
+
+
+def _get_txbody_bytes(cbor_bytes: bytes) -> bytes:
+    """Return serialized transaction body, exactly as it was serialized by `cardano-cli`."""
+    major, __, pos = _cbor_head(cbor_bytes, 0)
+    # transaction body
+    if major == 5:
+        return cbor_bytes
+    # transaction, or transaction body together with scripts and auxiliary data
+    if major == 4:
+        return cbor_bytes[pos : _cbor_item_end(cbor_bytes, pos)]
+    raise ValueError(f"Unexpected CBOR major type {major} of transaction.")
+
+
+def _txid_native(tx_file: FileType) -> str:
+    with open(tx_file, encoding="utf-8") as in_json:
+        tx_envelope = json.load(in_json)
+    if "Byron" in tx_envelope["type"]:
+        raise ValueError("Byron transactions are not supported.")
+    txbody_bytes = _get_txbody_bytes(bytes.fromhex(tx_envelope["cborHex"]))
+    return hashlib.blake2b(txbody_bytes, digest_size=32).hexdigest()
+
+
+def get_txid(
+    cluster_obj: clusterlib.ClusterLib, tx_body_file: FileType = "", tx_file: FileType = ""
+) -> str:
+    """Return the transaction identifier."""
+    try:
+        txid = _txid_native(tx_body_file or tx_file)
+    except Exception as err:
+        LOGGER.debug(f"Falling back to CLI for `get_txid`: {err}")
+        return cluster_obj.get_txid(tx_body_file=tx_body_file, tx_file=tx_file)
+
+    if CRYPTO_FAST_CHECK:
+        _check_result(
+            name="get_txid",
+            native=txid,
+            cli=cluster_obj.get_txid(tx_body_file=tx_body_file, tx_file=tx_file),
+        )
+    return txid
+
+
+def _native_script_to_cbor(script: dict) -> Any:
+    """Convert JSON native (simple) script to CBOR structure."""
+    script_type = NATIVE_SCRIPT_TYPES[script["type"]]
+    if script["type"] == "sig":
+        return [script_type, bytes.fromhex(script["keyHash"])]
+    if script["type"] in ("all", "any"):
+        return [script_type, [_native_script_to_cbor(s) for s in script["scripts"]]]
+    if script["type"] == "atLeast":
+        return [
+            script_type,
+            int(script["required"]),
+            [_native_script_to_cbor(s) for s in script["scripts"]],
+        ]
+    return [script_type, int(script["slot"])]
+
+
+def _script_hash_native(script_file: FileType) -> str:
+    with open(script_file, encoding="utf-8") as in_json:
+        script = json.load(in_json)
+
+    if "cborHex" in script:
+        script_bytes = bytes.fromhex(script["cborHex"])
+        plutus_tag = PLUTUS_SCRIPT_TAGS.get(script["type"])
+        if plutus_tag is not None:
+            tagged = bytes([plutus_tag]) + cbor2.loads(script_bytes)
+        elif script["type"].startswith("SimpleScript"):
+            tagged = bytes([NATIVE_SCRIPT_TAG]) + script_bytes
+        else:
+            raise ValueError(f"Unsupported script type '{script['type']}'.")
+    else:
+        tagged = bytes([NATIVE_SCRIPT_TAG]) + cbor2.dumps(_native_script_to_cbor(script))
+
+    return hashlib.blake2b(tagged, digest_size=28).hexdigest()
+
+
+def get_policyid(cluster_obj: clusterlib.ClusterLib, script_file: FileType) -> str:
+    """Return hash of native or Plutus script (the policy ID, when used as minting script)."""
+    try:
+        policyid = _script_hash_native(script_file)
+    except Exception as err:
+        LOGGER.debug(f"Falling back to CLI for `get_policyid`: {err}")
+        return cluster_obj.get_policyid(script_file=script_file)
+
+    if CRYPTO_FAST_CHECK:
+        _check_result(
+            name="get_policyid",
+            native=policyid,
+            cli=cluster_obj.get_policyid(script_file=script_file),
+        )
+    return policyid
+
+
+def _script_data_detailed_to_cbor(data: dict) -> bytes:
+    """Encode script data in the "detailed schema" JSON format to CBOR."""
+    if "constructor" in data:
+        constr = int(data["constructor"])
+        fields = _cbor_encode_list([_script_data_detailed_to_cbor(f) for f in data["fields"]])
+        if 0 <= constr < 7:
+            return _cbor_encode_head(6, 121 + constr) + fields
+        if 7 <= constr < 128:
+            return _cbor_encode_head(6, 1280 + constr - 7) + fields
+        return (
+            _cbor_encode_head(6, 102) + _cbor_encode_head(4, 2) + _cbor_encode_int(constr) + fields
+        )
+    if "map" in data:
+        return _cbor_encode_head(5, len(data["map"])) + b"".join(
+            _script_data_detailed_to_cbor(r["k"]) + _script_data_detailed_to_cbor(r["v"])
+            for r in data["map"]
+        )
+    if "list" in data:
+        return _cbor_encode_list([_script_data_detailed_to_cbor(i) for i in data["list"]])
+    if "int" in data:
+        return _cbor_encode_int(int(data["int"]))
+    if "bytes" in data:
+        return _cbor_encode_bytes(bytes.fromhex(data["bytes"]))
+    raise ValueError(f"Unsupported script data: {data}")
+
+
+def _script_data_no_schema_to_cbor(data: Any) -> bytes:
+    """Encode script data in the "no schema" JSON format to CBOR."""
+    if isinstance(data, bool) or data is None or isinstance(data, float):
+        raise ValueError(f"Unsupported script data: {data}")
+    if isinstance(data, int):
+        return _cbor_encode_int(data)
+    if isinstance(data, str):
+        if data.startswith("0x"):
+            return _cbor_encode_bytes(bytes.fromhex(data[2:]))
+        return _cbor_encode_bytes(data.encode("utf-8"))
+    if isinstance(data, list):
+        return _cbor_encode_list([_script_data_no_schema_to_cbor(i) for i in data])
+    if isinstance(data, dict):
+        return _cbor_encode_head(5, len(data)) + b"".join(
+            _script_data_no_schema_to_cbor(k) + _script_data_no_schema_to_cbor(v)
+            for k, v in data.items()
+        )
+    raise ValueError(f"Unsupported script data: {data}")
+
+
+def _datum_hash_native(
+    script_data_file: Optional[FileType],
+    script_data_cbor_file: Optional[FileType],
+    script_data_value: str,
+) -> str:
+    if script_data_file:
+        with open(script_data_file, encoding="utf-8") as in_json:
+            data_cbor = _script_data_detailed_to_cbor(json.load(in_json))
+    elif script_data_cbor_file:
+        data_cbor = Path(script_data_cbor_file).read_bytes()
+    else:
+        data_cbor = _script_data_no_schema_to_cbor(json.loads(script_data_value))
+    return hashlib.blake2b(data_cbor, digest_size=32).hexdigest()
+
+
+def get_hash_script_data(
+    cluster_obj: clusterlib.ClusterLib,
+    script_data_file: Optional[FileType] = None,
+    script_data_cbor_file: Optional[FileType] = None,
+    script_data_value: str = "",
+) -> str:
+    """Return the hash of script data (datum hash)."""
+    try:
+        datum_hash = _datum_hash_native(
+            script_data_file=script_data_file,
+            script_data_cbor_file=script_data_cbor_file,
+            script_data_value=script_data_value,
+        )
+    except Exception as err:
+        LOGGER.debug(f"Falling back to CLI for `get_hash_script_data`: {err}")
+        return cluster_obj.get_hash_script_data(
+            script_data_file=script_data_file,
+            script_data_cbor_file=script_data_cbor_file,
+            script_data_value=script_data_value,
+        )
+
+    if CRYPTO_FAST_CHECK:
+        _check_result(
+            name="get_hash_script_data",
+            native=datum_hash,
+            cli=cluster_obj.get_hash_script_data(
+                script_data_file=script_data_file,
+                script_data_cbor_file=script_data_cbor_file,
+                script_data_value=script_data_value,
+            ),
+        )
+    return datum_hash
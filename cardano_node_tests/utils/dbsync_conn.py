@@ -1,64 +1,186 @@
-"""Functionality for interacting with db-sync database in postgres."""
+"""Functionality for interacting with db-sync database in postgres.
+
+Connections to db-sync database of each cluster instance are kept in a bounded pool, so
+the database can be queried safely from multiple threads. The sessions are read-only and in
+autocommit mode, so no transaction is kept open between queries.
+"""
+import contextlib
+import hashlib
+import itertools
 import logging
+import re
+import threading
 from typing import Dict
+from typing import Iterator
+from typing import List
 from typing import Optional
+from typing import Set
 
 import psycopg2
+import psycopg2.extensions
 
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import configuration
-from cardano_node_tests.utils import helpers
 
 LOGGER = logging.getLogger(__name__)
 
+# max number of connections to db-sync database of a single cluster instance
+POOL_MAXCONN = 4
+# how long to wait for a free connection
+POOL_TIMEOUT_SEC = 120
+
+
+def get_dsn(instance_num: int) -> str:
+    """Return DSN of db-sync database of the cluster instance.
+
+    Connection parameters that are not part of the DSN are taken from PG* env variables.
+    """
+    dsn: str = psycopg2.extensions.make_dsn(dbname=f"{configuration.DBSYNC_DB}{instance_num}")
+    return dsn
+
+
+class PooledConn:
+    """Connection to db-sync database, together with statements prepared on the connection."""
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self.conn = self._connect()
+        self.prepared: Set[str] = set()
+
+    def _connect(self) -> psycopg2.extensions.connection:
+        conn = psycopg2.connect(self.dsn)
+        conn.set_session(readonly=True, autocommit=True)
+        return conn
+
+    def is_alive(self) -> bool:
+        """Check that the connection is usable, without running a query."""
+        if self.conn.closed:
+            return False
+        if self.conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        try:
+            # consume pending input, fails if the server has closed the connection
+            self.conn.poll()
+        except psycopg2.Error:
+            return False
+        return not self.conn.closed
+
+    def reconnect(self) -> None:
+        """Replace the connection with a new one."""
+        self.close()
+        self.conn = self._connect()
+        self.prepared.clear()
+
+    def end_transaction(self) -> None:
+        """End transaction started for server-side cursor, restore autocommit mode."""
+        try:
+            self.conn.rollback()
+            self.conn.autocommit = True
+        except psycopg2.Error as err:
+            LOGGER.warning(f"Unable to end transaction on db-sync connection: {err}")
+            self.close()
+
+    def prepare(self, query: str) -> str:
+        """Prepare the query on the server, return name of the prepared statement."""
+        name = f"dbsync_{hashlib.sha1(query.encode('utf-8')).hexdigest()[:16]}"
+        if name in self.prepared:
+            return name
+
+        param_num = itertools.count(1)
+        stmt = re.sub(r"%s", lambda __: f"${next(param_num)}", query)
+        with self.conn.cursor() as cur:
+            cur.execute(f"PREPARE {name} AS {stmt}")
+        self.prepared.add(name)
+        return name
+
+    def close(self) -> None:
+        if self.conn.closed:
+            return
+        try:
+            self.conn.close()
+        except psycopg2.Error as err:
+            LOGGER.warning(f"Unable to close connection to db-sync database: {err}")
+
+
+class DBSyncPool:
+    """Bounded pool of connections to db-sync database of a cluster instance."""
+
+    def __init__(self, dsn: str, maxconn: int = POOL_MAXCONN) -> None:
+        self.dsn = dsn
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._idle: List[PooledConn] = []
+        self._conns: List[PooledConn] = []
+
+    def _get_idle(self) -> Optional[PooledConn]:
+        with self._lock:
+            while self._idle:
+                pconn = self._idle.pop()
+                if pconn.is_alive():
+                    return pconn
+                pconn.close()
+                self._conns.remove(pconn)
+        return None
+
+    def _new(self) -> PooledConn:
+        pconn = PooledConn(dsn=self.dsn)
+        with self._lock:
+            self._conns.append(pconn)
+        return pconn
+
+    def _put(self, pconn: PooledConn) -> None:
+        with self._lock:
+            if pconn.is_alive():
+                self._idle.append(pconn)
+            else:
+                pconn.close()
+                self._conns.remove(pconn)
+
+    @contextlib.contextmanager
+    def connection(self) -> Iterator[PooledConn]:
+        """Borrow a connection from the pool, wait for a free one if the pool is exhausted."""
+        if not self._slots.acquire(timeout=POOL_TIMEOUT_SEC):
+            raise RuntimeError(f"No free connection to db-sync database '{self.dsn}'.")
+        pconn = None
+        try:
+            pconn = self._get_idle() or self._new()
+            yield pconn
+        finally:
+            if pconn is not None:
+                self._put(pconn)
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            for pconn in self._conns:
+                pconn.close()
+            self._conns.clear()
+            self._idle.clear()
 
-class DBSyncCache:
-    """Cache connection to db-sync database for each cluster instance."""
-
-    conns: Dict[int, Optional[psycopg2.extensions.connection]] = {0: None}
-
-
-def _conn(instance_num: int) -> psycopg2.extensions.connection:
-    # Call `psycopg2.connect` with an empty string so it uses PG* env variables.
-    # Temporarily set PGDATABASE env var to the database corresponding to `instance_num`.
-    with helpers.environ({"PGDATABASE": f"{configuration.DBSYNC_DB}{instance_num}"}):
-        conn = psycopg2.connect("")
-    DBSyncCache.conns[instance_num] = conn
-    return conn
-
-
-def _close(instance_num: int, conn: Optional[psycopg2.extensions.connection]) -> None:
-    if conn is None or conn.closed == 1:
-        return
 
-    LOGGER.info(f"Closing connection to db-sync database {configuration.DBSYNC_DB}{instance_num}.")
-    try:
-        conn.close()
-    except psycopg2.Error as err:
-        LOGGER.warning(
-            "Unable to close connection to db-sync database "
-            f"{configuration.DBSYNC_DB}{instance_num}: {err}"
-        )
-
-
-def conn() -> psycopg2.extensions.connection:
-    instance_num = cluster_nodes.get_instance_num()
-    conn = DBSyncCache.conns.get(instance_num)
-
-    if conn is None or conn.closed == 1:
-        return _conn(instance_num=instance_num)
+class DBSyncCache:
+    """Cache connection pool to db-sync database for each cluster instance."""
 
-    return conn
+    pools: Dict[int, DBSyncPool] = {}
+    lock = threading.Lock()
 
 
-def reconn() -> psycopg2.extensions.connection:
+def get_pool() -> DBSyncPool:
+    """Return connection pool to db-sync database of the current cluster instance."""
     instance_num = cluster_nodes.get_instance_num()
-    conn = DBSyncCache.conns.get(instance_num)
-    _close(instance_num=instance_num, conn=conn)
-    conn = _conn(instance_num=instance_num)
-    return conn
+    with DBSyncCache.lock:
+        pool = DBSyncCache.pools.get(instance_num)
+        if pool is None:
+            pool = DBSyncPool(dsn=get_dsn(instance_num))
+            DBSyncCache.pools[instance_num] = pool
+    return pool
 
 
 def close_all() -> None:
-    for instance_num, conn in DBSyncCache.conns.items():
-        _close(instance_num=instance_num, conn=conn)
+    with DBSyncCache.lock:
+        for instance_num, pool in DBSyncCache.pools.items():
+            LOGGER.info(
+                f"Closing connections to db-sync database {configuration.DBSYNC_DB}{instance_num}."
+            )
+            pool.close()
+        DBSyncCache.pools.clear()
@@ -1,7 +1,9 @@
 """SQL queries to db-sync database."""
 import contextlib
 import decimal
+import itertools
 from typing import Any
+from typing import Dict
 from typing import Generator
 from typing import Iterator
 from typing import List
@@ -53,15 +55,6 @@ class TxDBRow(NamedTuple):
     size: int
     invalid_before: Optional[decimal.Decimal]
     invalid_hereafter: Optional[decimal.Decimal]
-    tx_out_id: int
-    tx_out_tx_id: int
-    utxo_ix: int
-    tx_out_addr: str
-    tx_out_addr_has_script: bool
-    tx_out_value: decimal.Decimal
-    tx_out_data_hash: Optional[memoryview]
-    tx_out_inline_datum_hash: Optional[memoryview]
-    tx_out_reference_script_hash: Optional[memoryview]
     metadata_count: int
     reserve_count: int
     treasury_count: int
@@ -75,14 +68,10 @@ class TxDBRow(NamedTuple):
     collateral_out_count: int
     script_count: int
     redeemer_count: int
-    ma_tx_out_id: Optional[int]
-    ma_tx_out_policy: Optional[memoryview]
-    ma_tx_out_name: Optional[memoryview]
-    ma_tx_out_quantity: Optional[decimal.Decimal]
-    ma_tx_mint_id: Optional[int]
-    ma_tx_mint_policy: Optional[memoryview]
-    ma_tx_mint_name: Optional[memoryview]
-    ma_tx_mint_quantity: Optional[decimal.Decimal]
+    # JSON records of tx outputs, multi-asset outputs and multi-asset minting
+    txouts: List[Dict[str, Any]]
+    ma_txouts: List[Dict[str, Any]]
+    mints: List[Dict[str, Any]]
 
 
 class MetadataDBRow(NamedTuple):
@@ -233,27 +222,108 @@ class SchemaVersionStages(NamedTuple):
     three: int
 
 
+# number of rows fetched from db-sync in a single round-trip
+ITERSIZE = 2000
+
+_cursor_num = itertools.count()
+
+
+def _execute(
+    pconn: dbsync_conn.PooledConn,
+    query: str,
+    vars: Sequence,
+    server_side: bool,
+    itersize: int,
+    prepare: bool,
+) -> psycopg2.extensions.cursor:
+    # pylint: disable=redefined-builtin,too-many-arguments
+    conn = pconn.conn
+    if server_side:
+        # named cursor is a server-side cursor, rows are transferred to client in batches;
+        # it can be used only inside of a transaction
+        conn.autocommit = False
+        cur = conn.cursor(name=f"dbsync_cursor_{next(_cursor_num)}")
+        cur.itersize = itersize
+        cur.execute(query, vars)
+        return cur
+
+    cur = conn.cursor()
+    if prepare:
+        stmt_name = pconn.prepare(query)
+        params = f" ({', '.join('%s' for __ in vars)})" if vars else ""
+        cur.execute(f"EXECUTE {stmt_name}{params};", vars)
+    else:
+        cur.execute(query, vars)
+    return cur
+
+
 @contextlib.contextmanager
-def execute(query: str, vars: Sequence = ()) -> Iterator[psycopg2.extensions.cursor]:
+def execute(
+    query: str,
+    vars: Sequence = (),
+    server_side: bool = False,
+    itersize: int = ITERSIZE,
+    prepare: bool = False,
+) -> Iterator[psycopg2.extensions.cursor]:
+    """Execute the query on a pooled connection and yield the cursor.
+
+    Args:
+        query: An SQL query.
+        vars: Query parameters (optional).
+        server_side: Whether to use server-side cursor, so the result set is not materialized
+            on the client all at once (optional, False by default).
+        itersize: A number of rows fetched in a single round-trip by server-side cursor
+            (optional).
+        prepare: Whether to prepare the query on the server, so repeated executions skip
+            parsing and planning (optional, False by default). Not used with server-side cursor.
+    """
     # pylint: disable=redefined-builtin
-    cur = None
-    try:
-        cur = dbsync_conn.conn().cursor()
-
+    prepare = prepare and not server_side
+    with dbsync_conn.get_pool().connection() as pconn:
         try:
-            cur.execute(query, vars)
-            conn_alive = True
+            cur = _execute(
+                pconn=pconn,
+                query=query,
+                vars=vars,
+                server_side=server_side,
+                itersize=itersize,
+                prepare=prepare,
+            )
         except psycopg2.Error:
-            conn_alive = False
+            # the connection might have been broken, retry with a new connection
+            pconn.reconnect()
+            cur = _execute(
+                pconn=pconn,
+                query=query,
+                vars=vars,
+                server_side=server_side,
+                itersize=itersize,
+                prepare=prepare,
+            )
 
-        if not conn_alive:
-            cur = dbsync_conn.reconn().cursor()
-            cur.execute(query, vars)
-
-        yield cur
-    finally:
-        if cur is not None:
+        try:
+            yield cur
+        finally:
             cur.close()
+            if server_side:
+                pconn.end_transaction()
+
+
+def iter_rows(cur: psycopg2.extensions.cursor, batch_size: int = ITERSIZE) -> Iterator[tuple]:
+    """Iterate over rows of the result set, fetch rows in batches of `batch_size`."""
+    while rows := cur.fetchmany(batch_size):
+        yield from rows
+
+
+def fetch_columns(
+    cur: psycopg2.extensions.cursor, fields: Sequence[str], batch_size: int = ITERSIZE
+) -> Dict[str, List[Any]]:
+    """Fetch the result set as columns, i.e. list of values for each of the `fields`."""
+    columns: List[List[Any]] = [[] for __ in fields]
+    while rows := cur.fetchmany(batch_size):
+        for column, values in zip(columns, zip(*rows)):
+            column.extend(values)
+    return dict(zip(fields, columns))
 
 
 class SchemaVersion:
@@ -277,14 +347,30 @@ class SchemaVersion:
         return cls._stages
 
 
-def query_tx(txhash: str) -> Generator[TxDBRow, None, None]:
-    """Query a transaction in db-sync."""
+def _txhashes_vars(txhashes: Sequence[str]) -> Tuple[List[bytes]]:
+    """Return query variables for matching transactions with `tx.hash = ANY(%s)`."""
+    return ([bytes.fromhex(h) for h in txhashes],)
+
+
+def query_txs(txhashes: Sequence[str]) -> Generator[TxDBRow, None, None]:
+    """Query multiple transactions in db-sync.
+
+    There is a single row per transaction. Counts of related records are computed just once per
+    transaction, and outputs, multi-asset outputs and minting are aggregated to JSON arrays,
+    so the number of returned rows doesn't grow with the number of (multi-asset) outputs.
+    """
     query = (
         "SELECT"
         " tx.id, tx.hash, tx.block_id, tx.block_index, tx.out_sum, tx.fee, tx.deposit, tx.size,"
         " tx.invalid_before, tx.invalid_hereafter,"
-        " tx_out.id, tx_out.tx_id, tx_out.index, tx_out.address, tx_out.address_has_script,"
-        " tx_out.value, tx_out.data_hash, datum.hash, script.hash,"
+        " counts.metadata_count, counts.reserve_count, counts.treasury_count,"
+        " counts.pot_transfer_count, counts.reg_count, counts.dereg_count, counts.deleg_count,"
+        " counts.withdrawal_count, counts.collateral_count, counts.reference_input_count,"
+        " counts.collateral_out_count, counts.script_count, counts.redeemer_count,"
+        " COALESCE(outs.txouts, '[]'), COALESCE(ma_outs.ma_txouts, '[]'),"
+        " COALESCE(mints.mints, '[]') "
+        "FROM tx "
+        "CROSS JOIN LATERAL (SELECT"
         " (SELECT COUNT(id) FROM tx_metadata WHERE tx_id=tx.id) AS metadata_count,"
         " (SELECT COUNT(id) FROM reserve WHERE tx_id=tx.id) AS reserve_count,"
         " (SELECT COUNT(id) FROM treasury WHERE tx_id=tx.id) AS treasury_count,"
@@ -297,30 +383,60 @@ def query_tx(txhash: str) -> Generator[TxDBRow, None, None]:
         " (SELECT COUNT(id) FROM reference_tx_in WHERE tx_in_id=tx.id) AS reference_input_count,"
         " (SELECT COUNT(id) FROM collateral_tx_out WHERE tx_id=tx.id) AS collateral_out_count,"
         " (SELECT COUNT(id) FROM script WHERE tx_id=tx.id) AS script_count,"
-        " (SELECT COUNT(id) FROM redeemer WHERE tx_id=tx.id) AS redeemer_count,"
-        " ma_tx_out.id, join_ma_out.policy, join_ma_out.name, ma_tx_out.quantity,"
-        " ma_tx_mint.id, join_ma_mint.policy, join_ma_mint.name, ma_tx_mint.quantity "
-        "FROM tx "
-        "LEFT JOIN tx_out ON tx.id = tx_out.tx_id "
-        "LEFT JOIN ma_tx_out ON tx_out.id = ma_tx_out.tx_out_id "
-        "LEFT JOIN ma_tx_mint ON tx.id = ma_tx_mint.tx_id "
-        "LEFT JOIN multi_asset join_ma_out ON ma_tx_out.ident = join_ma_out.id "
-        "LEFT JOIN multi_asset join_ma_mint ON ma_tx_mint.ident = join_ma_mint.id "
-        "LEFT JOIN datum ON tx_out.inline_datum_id = datum.id "
-        "LEFT JOIN script ON tx_out.reference_script_id = script.id "
-        "WHERE tx.hash = %s;"
+        " (SELECT COUNT(id) FROM redeemer WHERE tx_id=tx.id) AS redeemer_count"
+        ") counts "
+        "LEFT JOIN LATERAL (SELECT json_agg(json_build_object("
+        " 'id', tx_out.id, 'index', tx_out.index, 'address', tx_out.address,"
+        " 'value', tx_out.value, 'data_hash', encode(tx_out.data_hash, 'hex'),"
+        " 'inline_datum_hash', encode(datum.hash, 'hex'),"
+        " 'reference_script_hash', encode(script.hash, 'hex')"
+        ") ORDER BY tx_out.index) AS txouts "
+        " FROM tx_out"
+        " LEFT JOIN datum ON tx_out.inline_datum_id = datum.id"
+        " LEFT JOIN script ON tx_out.reference_script_id = script.id"
+        " WHERE tx_out.tx_id = tx.id"
+        ") outs ON TRUE "
+        "LEFT JOIN LATERAL (SELECT json_agg(json_build_object("
+        " 'id', ma_tx_out.id, 'index', tx_out.index, 'address', tx_out.address,"
+        " 'data_hash', encode(tx_out.data_hash, 'hex'),"
+        " 'policy', encode(multi_asset.policy, 'hex'), 'name', encode(multi_asset.name, 'hex'),"
+        " 'quantity', ma_tx_out.quantity"
+        ") ORDER BY ma_tx_out.id) AS ma_txouts "
+        " FROM tx_out"
+        " INNER JOIN ma_tx_out ON tx_out.id = ma_tx_out.tx_out_id"
+        " INNER JOIN multi_asset ON ma_tx_out.ident = multi_asset.id"
+        " WHERE tx_out.tx_id = tx.id"
+        ") ma_outs ON TRUE "
+        "LEFT JOIN LATERAL (SELECT json_agg(json_build_object("
+        " 'id', ma_tx_mint.id,"
+        " 'policy', encode(multi_asset.policy, 'hex'), 'name', encode(multi_asset.name, 'hex'),"
+        " 'quantity', ma_tx_mint.quantity"
+        ") ORDER BY ma_tx_mint.id) AS mints "
+        " FROM ma_tx_mint"
+        " INNER JOIN multi_asset ON ma_tx_mint.ident = multi_asset.id"
+        " WHERE ma_tx_mint.tx_id = tx.id"
+        ") mints ON TRUE "
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield TxDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(TxDBRow._make, iter_rows(cur))
 
 
-def query_tx_ins(txhash: str) -> Generator[TxInDBRow, None, None]:
-    """Query transaction txins in db-sync."""
+def query_tx(txhash: str) -> Generator[TxDBRow, None, None]:
+    """Query a transaction in db-sync."""
+    yield from query_txs(txhashes=[txhash])
+
+
+def query_txs_ins(txhashes: Sequence[str]) -> Generator[Tuple[int, TxInDBRow], None, None]:
+    """Query txins of multiple transactions in db-sync.
+
+    Yields:
+        Tuple[int, TxInDBRow]: ID of the spending transaction and the txin record.
+    """
     query = (
         "SELECT"
-        " tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
+        " tx.id, tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
         " (SELECT hash FROM tx WHERE id = tx_out.tx_id) AS tx_hash,"
         " ma_tx_out.id, join_ma_out.policy, join_ma_out.name, ma_tx_out.quantity "
         "FROM tx_in "
@@ -329,134 +445,192 @@ def query_tx_ins(txhash: str) -> Generator[TxInDBRow, None, None]:
         "LEFT JOIN tx ON tx.id = tx_in.tx_in_id "
         "LEFT JOIN ma_tx_out ON tx_out.id = ma_tx_out.tx_out_id "
         "LEFT JOIN multi_asset join_ma_out ON ma_tx_out.ident = join_ma_out.id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield TxInDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        for result in iter_rows(cur):
+            yield result[0], TxInDBRow._make(result[1:])
 
 
-def query_collateral_tx_ins(txhash: str) -> Generator[TxInNoMADBRow, None, None]:
-    """Query transaction collateral txins in db-sync."""
+def query_tx_ins(txhash: str) -> Generator[TxInDBRow, None, None]:
+    """Query transaction txins in db-sync."""
+    for __, row in query_txs_ins(txhashes=[txhash]):
+        yield row
+
+
+def query_txs_collateral_tx_ins(
+    txhashes: Sequence[str],
+) -> Generator[Tuple[int, TxInNoMADBRow], None, None]:
+    """Query collateral txins of multiple transactions in db-sync.
+
+    Yields:
+        Tuple[int, TxInNoMADBRow]: ID of the spending transaction and the txin record.
+    """
     query = (
         "SELECT"
-        " tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
+        " tx.id, tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
         " (SELECT hash FROM tx WHERE id = tx_out.tx_id) AS tx_hash "
         "FROM collateral_tx_in "
         "LEFT JOIN tx_out "
         "ON (tx_out.tx_id = collateral_tx_in.tx_out_id AND"
         "    tx_out.index = collateral_tx_in.tx_out_index) "
         "LEFT JOIN tx ON tx.id = collateral_tx_in.tx_in_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield TxInNoMADBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        for result in iter_rows(cur):
+            yield result[0], TxInNoMADBRow._make(result[1:])
 
 
-def query_reference_tx_ins(txhash: str) -> Generator[TxInNoMADBRow, None, None]:
-    """Query transaction reference txins in db-sync."""
+def query_collateral_tx_ins(txhash: str) -> Generator[TxInNoMADBRow, None, None]:
+    """Query transaction collateral txins in db-sync."""
+    for __, row in query_txs_collateral_tx_ins(txhashes=[txhash]):
+        yield row
+
+
+def query_txs_reference_tx_ins(
+    txhashes: Sequence[str],
+) -> Generator[Tuple[int, TxInNoMADBRow], None, None]:
+    """Query reference txins of multiple transactions in db-sync.
+
+    Yields:
+        Tuple[int, TxInNoMADBRow]: ID of the spending transaction and the txin record.
+    """
     query = (
         "SELECT "
-        " tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
+        " tx.id, tx_out.id, tx_out.index, tx_out.address, tx_out.value,"
         " (SELECT hash FROM tx WHERE id = tx_out.tx_id) AS tx_hash "
         "FROM reference_tx_in "
         "LEFT JOIN tx_out "
         "ON (tx_out.tx_id = reference_tx_in.tx_out_id AND"
         "    tx_out.index = reference_tx_in.tx_out_index) "
         "LEFT JOIN tx ON tx.id = reference_tx_in.tx_in_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield TxInNoMADBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        for result in iter_rows(cur):
+            yield result[0], TxInNoMADBRow._make(result[1:])
 
 
-def query_collateral_tx_outs(txhash: str) -> Generator[CollateralTxOutDBRow, None, None]:
-    """Query transaction collateral txouts in db-sync."""
+def query_reference_tx_ins(txhash: str) -> Generator[TxInNoMADBRow, None, None]:
+    """Query transaction reference txins in db-sync."""
+    for __, row in query_txs_reference_tx_ins(txhashes=[txhash]):
+        yield row
+
+
+def query_txs_collateral_tx_outs(
+    txhashes: Sequence[str],
+) -> Generator[Tuple[int, CollateralTxOutDBRow], None, None]:
+    """Query collateral txouts of multiple transactions in db-sync.
+
+    Yields:
+        Tuple[int, CollateralTxOutDBRow]: ID of the transaction and the txout record.
+    """
     query = (
         "SELECT "
-        "collateral_tx_out.id, collateral_tx_out.index, collateral_tx_out.address, "
+        "tx.id, collateral_tx_out.id, collateral_tx_out.index, collateral_tx_out.address, "
         "collateral_tx_out.value, "
         "(SELECT hash FROM tx WHERE id = collateral_tx_out.tx_id) AS tx_hash "
         "FROM collateral_tx_out "
         "LEFT JOIN tx ON tx.id = collateral_tx_out.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield CollateralTxOutDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        for result in iter_rows(cur):
+            yield result[0], CollateralTxOutDBRow._make(result[1:])
 
 
-def query_plutus_scripts(txhash: str) -> Generator[ScriptDBRow, None, None]:
-    """Query transaction plutus scripts in db-sync."""
+def query_collateral_tx_outs(txhash: str) -> Generator[CollateralTxOutDBRow, None, None]:
+    """Query transaction collateral txouts in db-sync."""
+    for __, row in query_txs_collateral_tx_outs(txhashes=[txhash]):
+        yield row
+
+
+def query_txs_plutus_scripts(txhashes: Sequence[str]) -> Generator[ScriptDBRow, None, None]:
+    """Query plutus scripts of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " script.id, script.tx_id, script.hash, script.type, script.serialised_size "
         "FROM script "
         "LEFT JOIN tx ON tx.id = script.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield ScriptDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(ScriptDBRow._make, iter_rows(cur))
 
 
-def query_redeemers(txhash: str) -> Generator[RedeemerDBRow, None, None]:
-    """Query transaction redeemers in db-sync."""
+def query_plutus_scripts(txhash: str) -> Generator[ScriptDBRow, None, None]:
+    """Query transaction plutus scripts in db-sync."""
+    yield from query_txs_plutus_scripts(txhashes=[txhash])
+
+
+def query_txs_redeemers(txhashes: Sequence[str]) -> Generator[RedeemerDBRow, None, None]:
+    """Query redeemers of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " redeemer.id, redeemer.tx_id, redeemer.unit_mem, redeemer.unit_steps, redeemer.fee,"
         " redeemer.purpose, redeemer.script_hash "
         "FROM redeemer "
         "LEFT JOIN tx ON tx.id = redeemer.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield RedeemerDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(RedeemerDBRow._make, iter_rows(cur))
 
 
-def query_tx_metadata(txhash: str) -> Generator[MetadataDBRow, None, None]:
-    """Query transaction metadata in db-sync."""
+def query_redeemers(txhash: str) -> Generator[RedeemerDBRow, None, None]:
+    """Query transaction redeemers in db-sync."""
+    yield from query_txs_redeemers(txhashes=[txhash])
+
+
+def query_txs_metadata(txhashes: Sequence[str]) -> Generator[MetadataDBRow, None, None]:
+    """Query metadata of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " tx_metadata.id, tx_metadata.key, tx_metadata.json, tx_metadata.bytes,"
         " tx_metadata.tx_id "
         "FROM tx_metadata "
         "INNER JOIN tx ON tx.id = tx_metadata.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield MetadataDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(MetadataDBRow._make, iter_rows(cur))
 
 
-def query_tx_reserve(txhash: str) -> Generator[ADAStashDBRow, None, None]:
-    """Query transaction reserve record in db-sync."""
+def query_tx_metadata(txhash: str) -> Generator[MetadataDBRow, None, None]:
+    """Query transaction metadata in db-sync."""
+    yield from query_txs_metadata(txhashes=[txhash])
+
+
+def query_txs_reserve(txhashes: Sequence[str]) -> Generator[ADAStashDBRow, None, None]:
+    """Query reserve records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " reserve.id, stake_address.view, reserve.cert_index, reserve.amount, reserve.tx_id "
         "FROM reserve "
         "INNER JOIN stake_address ON reserve.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = reserve.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield ADAStashDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(ADAStashDBRow._make, iter_rows(cur))
 
 
-def query_tx_treasury(txhash: str) -> Generator[ADAStashDBRow, None, None]:
-    """Query transaction treasury record in db-sync."""
+def query_tx_reserve(txhash: str) -> Generator[ADAStashDBRow, None, None]:
+    """Query transaction reserve record in db-sync."""
+    yield from query_txs_reserve(txhashes=[txhash])
+
+
+def query_txs_treasury(txhashes: Sequence[str]) -> Generator[ADAStashDBRow, None, None]:
+    """Query treasury records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " treasury.id, stake_address.view, treasury.cert_index,"
@@ -464,64 +638,80 @@ def query_tx_treasury(txhash: str) -> Generator[ADAStashDBRow, None, None]:
         "FROM treasury "
         "INNER JOIN stake_address ON treasury.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = treasury.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield ADAStashDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(ADAStashDBRow._make, iter_rows(cur))
 
 
-def query_tx_pot_transfers(txhash: str) -> Generator[PotTransferDBRow, None, None]:
-    """Query transaction MIR certificate records in db-sync."""
+def query_tx_treasury(txhash: str) -> Generator[ADAStashDBRow, None, None]:
+    """Query transaction treasury record in db-sync."""
+    yield from query_txs_treasury(txhashes=[txhash])
+
+
+def query_txs_pot_transfers(txhashes: Sequence[str]) -> Generator[PotTransferDBRow, None, None]:
+    """Query MIR certificate records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " pot_transfer.id, pot_transfer.cert_index, pot_transfer.treasury,"
         " pot_transfer.reserves, pot_transfer.tx_id "
         "FROM pot_transfer "
         "INNER JOIN tx ON tx.id = pot_transfer.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield PotTransferDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(PotTransferDBRow._make, iter_rows(cur))
 
 
-def query_tx_stake_reg(txhash: str) -> Generator[StakeAddrDBRow, None, None]:
-    """Query stake registration record in db-sync."""
+def query_tx_pot_transfers(txhash: str) -> Generator[PotTransferDBRow, None, None]:
+    """Query transaction MIR certificate records in db-sync."""
+    yield from query_txs_pot_transfers(txhashes=[txhash])
+
+
+def query_txs_stake_reg(txhashes: Sequence[str]) -> Generator[StakeAddrDBRow, None, None]:
+    """Query stake registration records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " stake_registration.addr_id, stake_address.view, stake_registration.tx_id "
         "FROM stake_registration "
         "INNER JOIN stake_address ON stake_registration.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = stake_registration.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield StakeAddrDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(StakeAddrDBRow._make, iter_rows(cur))
 
 
-def query_tx_stake_dereg(txhash: str) -> Generator[StakeAddrDBRow, None, None]:
-    """Query stake deregistration record in db-sync."""
+def query_tx_stake_reg(txhash: str) -> Generator[StakeAddrDBRow, None, None]:
+    """Query stake registration record in db-sync."""
+    yield from query_txs_stake_reg(txhashes=[txhash])
+
+
+def query_txs_stake_dereg(txhashes: Sequence[str]) -> Generator[StakeAddrDBRow, None, None]:
+    """Query stake deregistration records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " stake_deregistration.addr_id, stake_address.view, stake_deregistration.tx_id "
         "FROM stake_deregistration "
         "INNER JOIN stake_address ON stake_deregistration.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = stake_deregistration.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield StakeAddrDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(StakeAddrDBRow._make, iter_rows(cur))
 
 
-def query_tx_stake_deleg(txhash: str) -> Generator[StakeDelegDBRow, None, None]:
-    """Query stake registration record in db-sync."""
+def query_tx_stake_dereg(txhash: str) -> Generator[StakeAddrDBRow, None, None]:
+    """Query stake deregistration record in db-sync."""
+    yield from query_txs_stake_dereg(txhashes=[txhash])
+
+
+def query_txs_stake_deleg(txhashes: Sequence[str]) -> Generator[StakeDelegDBRow, None, None]:
+    """Query stake delegation records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " tx.id, delegation.active_epoch_no, pool_hash.view AS pool_view,"
@@ -530,35 +720,40 @@ def query_tx_stake_deleg(txhash: str) -> Generator[StakeDelegDBRow, None, None]:
         "INNER JOIN stake_address ON delegation.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = delegation.tx_id "
         "INNER JOIN pool_hash ON pool_hash.id = delegation.pool_hash_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield StakeDelegDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(StakeDelegDBRow._make, iter_rows(cur))
 
 
-def query_tx_withdrawal(txhash: str) -> Generator[WithdrawalDBRow, None, None]:
-    """Query reward withdrawal record in db-sync."""
+def query_tx_stake_deleg(txhash: str) -> Generator[StakeDelegDBRow, None, None]:
+    """Query stake registration record in db-sync."""
+    yield from query_txs_stake_deleg(txhashes=[txhash])
+
+
+def query_txs_withdrawal(txhashes: Sequence[str]) -> Generator[WithdrawalDBRow, None, None]:
+    """Query reward withdrawal records of multiple transactions in db-sync."""
     query = (
         "SELECT"
         " tx.id, stake_address.view, amount "
         "FROM withdrawal "
         "INNER JOIN stake_address ON withdrawal.addr_id = stake_address.id "
         "INNER JOIN tx ON tx.id = withdrawal.tx_id "
-        "WHERE tx.hash = %s;"
+        "WHERE tx.hash = ANY(%s);"
     )
 
-    with execute(query=query, vars=(rf"\x{txhash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield WithdrawalDBRow(*result)
+    with execute(query=query, vars=_txhashes_vars(txhashes), prepare=True) as cur:
+        yield from map(WithdrawalDBRow._make, iter_rows(cur))
 
 
-def query_ada_pots(
-    epoch_from: int = 0, epoch_to: int = 99999999
-) -> Generator[ADAPotsDBRow, None, None]:
-    """Query ADA pots record in db-sync."""
-    query = (
+def query_tx_withdrawal(txhash: str) -> Generator[WithdrawalDBRow, None, None]:
+    """Query reward withdrawal record in db-sync."""
+    yield from query_txs_withdrawal(txhashes=[txhash])
+
+
+def _get_ada_pots_query() -> str:
+    return (
         "SELECT"
         " id, slot_no, epoch_no, treasury, reserves, rewards, utxo, deposits, fees, block_id "
         "FROM ada_pots "
@@ -566,9 +761,19 @@ def query_ada_pots(
         "ORDER BY id;"
     )
 
-    with execute(query=query, vars=(epoch_from, epoch_to)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield ADAPotsDBRow(*result)
+
+def query_ada_pots(
+    epoch_from: int = 0, epoch_to: int = 99999999
+) -> Generator[ADAPotsDBRow, None, None]:
+    """Query ADA pots record in db-sync."""
+    with execute(query=_get_ada_pots_query(), vars=(epoch_from, epoch_to), server_side=True) as cur:
+        yield from map(ADAPotsDBRow._make, iter_rows(cur))
+
+
+def query_ada_pots_columns(epoch_from: int = 0, epoch_to: int = 99999999) -> Dict[str, List[Any]]:
+    """Query ADA pots records in db-sync, return list of values for each `ADAPotsDBRow` field."""
+    with execute(query=_get_ada_pots_query(), vars=(epoch_from, epoch_to), server_side=True) as cur:
+        return fetch_columns(cur=cur, fields=ADAPotsDBRow._fields)
 
 
 def query_address_reward(
@@ -586,9 +791,8 @@ def query_address_reward(
         "ORDER BY reward.id;"
     )
 
-    with execute(query=query, vars=(address, epoch_from, epoch_to)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield RewardDBRow(*result)
+    with execute(query=query, vars=(address, epoch_from, epoch_to), server_side=True) as cur:
+        yield from map(RewardDBRow._make, iter_rows(cur))
 
 
 def query_utxo(address: str) -> Generator[UTxODBRow, None, None]:
@@ -604,9 +808,8 @@ def query_utxo(address: str) -> Generator[UTxODBRow, None, None]:
         "ORDER BY utxo_view.id;"
     )
 
-    with execute(query=query, vars=(address,)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield UTxODBRow(*result)
+    with execute(query=query, vars=(address,), server_side=True) as cur:
+        yield from map(UTxODBRow._make, iter_rows(cur))
 
 
 def query_pool_data(pool_id_bech32: str) -> Generator[PoolDataDBRow, None, None]:
@@ -637,14 +840,12 @@ def query_pool_data(pool_id_bech32: str) -> Generator[PoolDataDBRow, None, None]
     )
 
     with execute(query=query, vars=(pool_id_bech32,)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield PoolDataDBRow(*result)
+        yield from map(PoolDataDBRow._make, iter_rows(cur))
 
 
-def query_blocks(
+def _get_blocks_query(
     pool_id_bech32: str = "", epoch_from: int = 0, epoch_to: int = 99999999
-) -> Generator[BlockDBRow, None, None]:
-    """Query block records in db-sync."""
+) -> Tuple[str, tuple]:
     if pool_id_bech32:
         pool_query = "(pool_hash.view = %s) AND"
         query_vars: tuple = (pool_id_bech32, epoch_from, epoch_to)
@@ -664,9 +865,40 @@ def query_blocks(
         "ORDER BY block.id;"
     )
 
-    with execute(query=query, vars=query_vars) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield BlockDBRow(*result)
+    return query, query_vars
+
+
+def query_blocks(
+    pool_id_bech32: str = "", epoch_from: int = 0, epoch_to: int = 99999999
+) -> Generator[BlockDBRow, None, None]:
+    """Query block records in db-sync."""
+    query, query_vars = _get_blocks_query(
+        pool_id_bech32=pool_id_bech32, epoch_from=epoch_from, epoch_to=epoch_to
+    )
+
+    with execute(query=query, vars=query_vars, server_side=True) as cur:
+        yield from map(BlockDBRow._make, iter_rows(cur))
+
+
+def query_blocks_columns(
+    pool_id_bech32: str = "", epoch_from: int = 0, epoch_to: int = 99999999
+) -> Dict[str, List[Any]]:
+    """Query block records in db-sync, return list of values for each `BlockDBRow` field."""
+    query, query_vars = _get_blocks_query(
+        pool_id_bech32=pool_id_bech32, epoch_from=epoch_from, epoch_to=epoch_to
+    )
+
+    with execute(query=query, vars=query_vars, server_side=True) as cur:
+        return fetch_columns(cur=cur, fields=BlockDBRow._fields)
+
+
+def query_last_block_slot_no() -> int:
+    """Query slot number of the last block indexed by db-sync, -1 if there's no such block."""
+    query = "SELECT slot_no FROM block WHERE slot_no IS NOT NULL ORDER BY id DESC LIMIT 1;"
+
+    with execute(query=query, prepare=True) as cur:
+        result = cur.fetchone()
+        return int(result[0]) if result else -1
 
 
 def query_table_names() -> List[str]:
@@ -689,5 +921,4 @@ def query_datum(datum_hash: str) -> Generator[DatumDBRow, None, None]:
     query = "SELECT id, hash, tx_id, value, bytes FROM datum WHERE hash = %s;"
 
     with execute(query=query, vars=(rf"\x{datum_hash}",)) as cur:
-        while (result := cur.fetchone()) is not None:
-            yield DatumDBRow(*result)
+        yield from map(DatumDBRow._make, iter_rows(cur))
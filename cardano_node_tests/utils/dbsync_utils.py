@@ -1,4 +1,5 @@
 """Functionality for interacting with db-sync."""
+import collections
 import functools
 import itertools
 import logging
@@ -8,16 +9,25 @@ from typing import Dict
 from typing import List
 from typing import NamedTuple
 from typing import Optional
+from typing import Sequence
 from typing import Union
 
 from cardano_clusterlib import clusterlib
 
 from cardano_node_tests.utils import clusterlib_utils
 from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import crypto_fast
 from cardano_node_tests.utils import dbsync_queries
 
 LOGGER = logging.getLogger(__name__)
 
+# max number of transactions whose data are fetched from db-sync together
+TX_BATCH_SIZE = 500
+
+# how long to wait for db-sync to index a block
+INDEX_TIMEOUT_SEC = 300
+INDEX_POLL_INTERVAL_SEC = 0.5
+
 
 class MetadataRecord(NamedTuple):
     key: int
@@ -163,7 +173,7 @@ class TxPrelimRecord(NamedTuple):
     utxo_out: List[UTxORecord]
     ma_utxo_out: List[UTxORecord]
     mint_utxo_out: List[UTxORecord]
-    last_row: dbsync_queries.TxDBRow
+    tx_row: dbsync_queries.TxDBRow
 
 
 def utxodata2txout(utxodata: Union[UTxORecord, clusterlib.UTXOData]) -> clusterlib.TxOut:
@@ -314,96 +324,126 @@ def get_pool_data(pool_id_bech32: str) -> Optional[PoolDataRecord]:
     return pool_data
 
 
-def get_prelim_tx_record(txhash: str) -> TxPrelimRecord:
-    """Get first batch of transaction data from db-sync."""
-    utxo_out: List[UTxORecord] = []
-    seen_tx_out_ids = set()
-    ma_utxo_out: List[UTxORecord] = []
-    seen_ma_tx_out_ids = set()
-    mint_utxo_out: List[UTxORecord] = []
-    seen_ma_tx_mint_ids = set()
-    tx_id = -1
-
-    for query_row in dbsync_queries.query_tx(txhash=txhash):
-        if tx_id == -1:
-            tx_id = query_row.tx_id
-        if tx_id != query_row.tx_id:
-            raise AssertionError("Transaction ID differs from the expected ID.")
-
-        # Lovelace outputs
-        if query_row.tx_out_id and query_row.tx_out_id not in seen_tx_out_ids:
-            seen_tx_out_ids.add(query_row.tx_out_id)
-            out_rec = UTxORecord(
-                utxo_hash=str(txhash),
-                utxo_ix=int(query_row.utxo_ix),
-                amount=int(query_row.tx_out_value),
-                address=str(query_row.tx_out_addr),
-                datum_hash=query_row.tx_out_data_hash.hex() if query_row.tx_out_data_hash else "",
-                inline_datum_hash=query_row.tx_out_inline_datum_hash.hex()
-                if query_row.tx_out_inline_datum_hash
-                else "",
-                reference_script_hash=query_row.tx_out_reference_script_hash.hex()
-                if query_row.tx_out_reference_script_hash
-                else "",
+def wait_for_indexed_slot(slot_no: int, timeout: float = INDEX_TIMEOUT_SEC) -> int:
+    """Wait until db-sync indexes a block in slot `slot_no` or in a later slot.
+
+    Returns:
+        int: Slot number of the last block indexed by db-sync.
+    """
+    end_time = time.monotonic() + timeout
+    while True:
+        indexed_slot_no = dbsync_queries.query_last_block_slot_no()
+        if indexed_slot_no >= slot_no:
+            return indexed_slot_no
+        if time.monotonic() > end_time:
+            raise AssertionError(
+                f"db-sync failed to index slot {slot_no} in {timeout}s, "
+                f"last indexed slot is {indexed_slot_no}."
             )
-            utxo_out.append(out_rec)
+        time.sleep(INDEX_POLL_INTERVAL_SEC)
 
-        # MA outputs
-        if query_row.ma_tx_out_id and query_row.ma_tx_out_id not in seen_ma_tx_out_ids:
-            seen_ma_tx_out_ids.add(query_row.ma_tx_out_id)
-            asset_name = query_row.ma_tx_out_name.hex() if query_row.ma_tx_out_name else None
-            policyid = query_row.ma_tx_out_policy.hex() if query_row.ma_tx_out_policy else ""
-            coin = f"{policyid}.{asset_name}" if asset_name else policyid
-            ma_rec = UTxORecord(
-                utxo_hash=str(txhash),
-                utxo_ix=int(query_row.utxo_ix),
-                amount=int(query_row.ma_tx_out_quantity or 0),
-                address=str(query_row.tx_out_addr),
+
+def wait_for_tip(cluster_obj: clusterlib.ClusterLib, timeout: float = INDEX_TIMEOUT_SEC) -> int:
+    """Wait until db-sync indexes the block at the current tip of the node."""
+    return wait_for_indexed_slot(slot_no=cluster_obj.get_slot_no(), timeout=timeout)
+
+
+def wait_for_new_block(timeout: float = INDEX_TIMEOUT_SEC) -> int:
+    """Wait until db-sync indexes a block newer than the last indexed block."""
+    return wait_for_indexed_slot(
+        slot_no=dbsync_queries.query_last_block_slot_no() + 1, timeout=timeout
+    )
+
+
+def _get_prelim_tx_record_from_row(tx_row: dbsync_queries.TxDBRow) -> TxPrelimRecord:
+    """Compile first batch of transaction data from a row returned by the TX SQL query."""
+    txhash = tx_row.tx_hash.hex()
+
+    # Lovelace outputs
+    utxo_out = [
+        UTxORecord(
+            utxo_hash=txhash,
+            utxo_ix=int(r["index"]),
+            amount=int(r["value"]),
+            address=str(r["address"]),
+            datum_hash=r["data_hash"] or "",
+            inline_datum_hash=r["inline_datum_hash"] or "",
+            reference_script_hash=r["reference_script_hash"] or "",
+        )
+        for r in tx_row.txouts
+    ]
+
+    # MA outputs
+    ma_utxo_out = []
+    for r in tx_row.ma_txouts:
+        policyid = r["policy"] or ""
+        coin = f"{policyid}.{r['name']}" if r["name"] else policyid
+        ma_utxo_out.append(
+            UTxORecord(
+                utxo_hash=txhash,
+                utxo_ix=int(r["index"]),
+                amount=int(r["quantity"] or 0),
+                address=str(r["address"]),
                 coin=coin,
-                datum_hash=query_row.tx_out_data_hash.hex() if query_row.tx_out_data_hash else "",
+                datum_hash=r["data_hash"] or "",
             )
-            ma_utxo_out.append(ma_rec)
+        )
 
-        # MA minting
-        if query_row.ma_tx_mint_id and query_row.ma_tx_mint_id not in seen_ma_tx_mint_ids:
-            seen_ma_tx_mint_ids.add(query_row.ma_tx_mint_id)
-            asset_name = query_row.ma_tx_mint_name.hex() if query_row.ma_tx_mint_name else None
-            policyid = query_row.ma_tx_mint_policy.hex() if query_row.ma_tx_mint_policy else ""
-            coin = f"{policyid}.{asset_name}" if asset_name else policyid
-            mint_rec = UTxORecord(
-                utxo_hash=str(txhash),
-                utxo_ix=int(query_row.utxo_ix),
-                amount=int(query_row.ma_tx_mint_quantity or 0),
+    # MA minting
+    mint_utxo_out = []
+    for r in tx_row.mints:
+        policyid = r["policy"] or ""
+        coin = f"{policyid}.{r['name']}" if r["name"] else policyid
+        mint_utxo_out.append(
+            UTxORecord(
+                utxo_hash=txhash,
+                utxo_ix=0,  # minting is not bound to any output
+                amount=int(r["quantity"] or 0),
                 address="",  # this is available only for MA outputs
                 coin=coin,
             )
-            mint_utxo_out.append(mint_rec)
-
-    if tx_id == -1:
-        raise RuntimeError("No results were returned by the TX SQL query.")
+        )
 
-    # pylint: disable=undefined-loop-variable
     txdata = TxPrelimRecord(
         utxo_out=utxo_out,
         ma_utxo_out=ma_utxo_out,
         mint_utxo_out=mint_utxo_out,
-        last_row=query_row,
+        tx_row=tx_row,
     )
 
     return txdata
 
 
-def get_txins(txhash: str) -> List[clusterlib.UTXOData]:
-    """Get txins of a transaction from db-sync."""
-    txins: List[clusterlib.UTXOData] = []
+def get_prelim_tx_records(txhashes: Sequence[str]) -> Dict[str, TxPrelimRecord]:
+    """Get first batch of data of multiple transactions from db-sync.
+
+    Transactions that were not found in db-sync are not present in the result.
+    """
+    return {
+        tx_row.tx_hash.hex(): _get_prelim_tx_record_from_row(tx_row=tx_row)
+        for tx_row in dbsync_queries.query_txs(txhashes=txhashes)
+    }
+
+
+def get_prelim_tx_record(txhash: str) -> TxPrelimRecord:
+    """Get first batch of transaction data from db-sync."""
+    txdata = get_prelim_tx_records(txhashes=[txhash]).get(txhash)
+    if txdata is None:
+        raise RuntimeError("No results were returned by the TX SQL query.")
+    return txdata
+
+
+def _get_txins_by_tx_id(txhashes: Sequence[str]) -> Dict[int, List[clusterlib.UTXOData]]:
+    """Get txins of multiple transactions from db-sync, indexed by ID of the transaction."""
+    txins: Dict[int, List[clusterlib.UTXOData]] = collections.defaultdict(list)
     seen_txins_out_ids = set()
     seen_txins_ma_ids = set()
 
-    for txins_row in dbsync_queries.query_tx_ins(txhash=txhash):
+    for tx_id, txins_row in dbsync_queries.query_txs_ins(txhashes=txhashes):
         # Lovelace inputs
-        if txins_row.tx_out_id and txins_row.tx_out_id not in seen_txins_out_ids:
-            seen_txins_out_ids.add(txins_row.tx_out_id)
-            txins.append(
+        if txins_row.tx_out_id and (tx_id, txins_row.tx_out_id) not in seen_txins_out_ids:
+            seen_txins_out_ids.add((tx_id, txins_row.tx_out_id))
+            txins[tx_id].append(
                 clusterlib.UTXOData(
                     utxo_hash=txins_row.tx_hash.hex(),
                     utxo_ix=int(txins_row.utxo_ix),
@@ -413,12 +453,12 @@ def get_txins(txhash: str) -> List[clusterlib.UTXOData]:
             )
 
         # MA inputs
-        if txins_row.ma_tx_out_id and txins_row.ma_tx_out_id not in seen_txins_ma_ids:
-            seen_txins_ma_ids.add(txins_row.ma_tx_out_id)
+        if txins_row.ma_tx_out_id and (tx_id, txins_row.ma_tx_out_id) not in seen_txins_ma_ids:
+            seen_txins_ma_ids.add((tx_id, txins_row.ma_tx_out_id))
             asset_name = txins_row.ma_tx_out_name.hex() if txins_row.ma_tx_out_name else None
             policyid = txins_row.ma_tx_out_policy.hex() if txins_row.ma_tx_out_policy else ""
             coin = f"{policyid}.{asset_name}" if asset_name else policyid
-            txins.append(
+            txins[tx_id].append(
                 clusterlib.UTXOData(
                     utxo_hash=txins_row.tx_hash.hex(),
                     utxo_ix=int(txins_row.utxo_ix),
@@ -431,190 +471,271 @@ def get_txins(txhash: str) -> List[clusterlib.UTXOData]:
     return txins
 
 
-def get_tx_record(txhash: str) -> TxRecord:  # noqa: C901
-    """Get transaction data from db-sync.
+def get_txins(txhash: str) -> List[clusterlib.UTXOData]:
+    """Get txins of a transaction from db-sync."""
+    txins_by_tx_id = _get_txins_by_tx_id(txhashes=[txhash])
+    return list(itertools.chain.from_iterable(txins_by_tx_id.values()))
 
-    Compile data from multiple SQL queries to get as much information about the TX as possible.
+
+def _get_tx_records_batch(txhashes: Sequence[str]) -> Dict[str, TxRecord]:  # noqa: C901
+    """Get data of a batch of transactions from db-sync.
+
+    The data are compiled from a fixed number of SQL queries, no matter how many transactions
+    are in the batch.
     """
-    # pylint: disable=too-many-branches
-    txdata = get_prelim_tx_record(txhash)
-    txins = get_txins(txhash)
-
-    metadata = []
-    if txdata.last_row.metadata_count:
-        metadata = [
-            MetadataRecord(key=int(r.key), json=r.json, bytes=r.bytes)
-            for r in dbsync_queries.query_tx_metadata(txhash=txhash)
-        ]
-
-    reserve = []
-    if txdata.last_row.reserve_count:
-        reserve = [
-            ADAStashRecord(
-                address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
+    # pylint: disable=too-many-branches,too-many-locals
+    prelim_records = get_prelim_tx_records(txhashes=txhashes)
+    if not prelim_records:
+        return {}
+
+    def _with_records(count_field: str) -> List[str]:
+        """Return hashes of transactions that have records counted in the `count_field`."""
+        return [h for h, r in prelim_records.items() if getattr(r.tx_row, count_field)]
+
+    txins = _get_txins_by_tx_id(txhashes=list(prelim_records))
+
+    metadata: Dict[int, List[MetadataRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("metadata_count"):
+        for metadata_row in dbsync_queries.query_txs_metadata(txhashes=hashes):
+            metadata[metadata_row.tx_id].append(
+                MetadataRecord(
+                    key=int(metadata_row.key), json=metadata_row.json, bytes=metadata_row.bytes
+                )
             )
-            for r in dbsync_queries.query_tx_reserve(txhash=txhash)
-        ]
-
-    treasury = []
-    if txdata.last_row.treasury_count:
-        treasury = [
-            ADAStashRecord(
-                address=str(r.addr_view), cert_index=int(r.cert_index), amount=int(r.amount)
+
+    reserve: Dict[int, List[ADAStashRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("reserve_count"):
+        for reserve_row in dbsync_queries.query_txs_reserve(txhashes=hashes):
+            reserve[reserve_row.tx_id].append(
+                ADAStashRecord(
+                    address=str(reserve_row.addr_view),
+                    cert_index=int(reserve_row.cert_index),
+                    amount=int(reserve_row.amount),
+                )
             )
-            for r in dbsync_queries.query_tx_treasury(txhash=txhash)
-        ]
-
-    pot_transfers = []
-    if txdata.last_row.pot_transfer_count:
-        pot_transfers = [
-            PotTransferRecord(treasury=int(r.treasury), reserves=int(r.reserves))
-            for r in dbsync_queries.query_tx_pot_transfers(txhash=txhash)
-        ]
-
-    stake_registration = []
-    if txdata.last_row.stake_reg_count:
-        stake_registration = [r.view for r in dbsync_queries.query_tx_stake_reg(txhash=txhash)]
-
-    stake_deregistration = []
-    if txdata.last_row.stake_dereg_count:
-        stake_deregistration = [r.view for r in dbsync_queries.query_tx_stake_dereg(txhash=txhash)]
-
-    stake_delegation = []
-    if txdata.last_row.stake_deleg_count:
-        stake_delegation = [
-            DelegationRecord(
-                address=r.address, pool_id=r.pool_id, active_epoch_no=r.active_epoch_no
+
+    treasury: Dict[int, List[ADAStashRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("treasury_count"):
+        for treasury_row in dbsync_queries.query_txs_treasury(txhashes=hashes):
+            treasury[treasury_row.tx_id].append(
+                ADAStashRecord(
+                    address=str(treasury_row.addr_view),
+                    cert_index=int(treasury_row.cert_index),
+                    amount=int(treasury_row.amount),
+                )
             )
-            for r in dbsync_queries.query_tx_stake_deleg(txhash=txhash)
-            if (r.address and r.pool_id and r.active_epoch_no)
-        ]
-
-    withdrawals = []
-    if txdata.last_row.withdrawal_count:
-        withdrawals = [
-            clusterlib.TxOut(address=r.address, amount=int(r.amount))
-            for r in dbsync_queries.query_tx_withdrawal(txhash=txhash)
-        ]
-
-    collaterals = []
-    if txdata.last_row.collateral_count:
-        collaterals = [
-            clusterlib.UTXOData(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
+
+    pot_transfers: Dict[int, List[PotTransferRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("pot_transfer_count"):
+        for pot_transfers_row in dbsync_queries.query_txs_pot_transfers(txhashes=hashes):
+            pot_transfers[pot_transfers_row.tx_id].append(
+                PotTransferRecord(
+                    treasury=int(pot_transfers_row.treasury),
+                    reserves=int(pot_transfers_row.reserves),
+                )
             )
-            for r in dbsync_queries.query_collateral_tx_ins(txhash=txhash)
-        ]
-
-    collateral_outputs = []
-    if txdata.last_row.collateral_out_count:
-        collateral_outputs = [
-            clusterlib.UTXOData(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
+
+    stake_registration: Dict[int, List[str]] = collections.defaultdict(list)
+    if hashes := _with_records("stake_reg_count"):
+        for stake_reg_row in dbsync_queries.query_txs_stake_reg(txhashes=hashes):
+            stake_registration[stake_reg_row.tx_id].append(stake_reg_row.view)
+
+    stake_deregistration: Dict[int, List[str]] = collections.defaultdict(list)
+    if hashes := _with_records("stake_dereg_count"):
+        for stake_dereg_row in dbsync_queries.query_txs_stake_dereg(txhashes=hashes):
+            stake_deregistration[stake_dereg_row.tx_id].append(stake_dereg_row.view)
+
+    stake_delegation: Dict[int, List[DelegationRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("stake_deleg_count"):
+        for stake_deleg_row in dbsync_queries.query_txs_stake_deleg(txhashes=hashes):
+            if not (
+                stake_deleg_row.address
+                and stake_deleg_row.pool_id
+                and stake_deleg_row.active_epoch_no
+            ):
+                continue
+            stake_delegation[stake_deleg_row.tx_id].append(
+                DelegationRecord(
+                    address=stake_deleg_row.address,
+                    pool_id=stake_deleg_row.pool_id,
+                    active_epoch_no=stake_deleg_row.active_epoch_no,
+                )
             )
-            for r in dbsync_queries.query_collateral_tx_outs(txhash=txhash)
-        ]
-
-    reference_inputs = []
-    if txdata.last_row.reference_input_count:
-        reference_inputs = [
-            clusterlib.UTXOData(
-                utxo_hash=r.tx_hash.hex(),
-                utxo_ix=int(r.utxo_ix),
-                amount=int(r.value),
-                address=str(r.address),
+
+    withdrawals: Dict[int, List[clusterlib.TxOut]] = collections.defaultdict(list)
+    if hashes := _with_records("withdrawal_count"):
+        for withdrawal_row in dbsync_queries.query_txs_withdrawal(txhashes=hashes):
+            withdrawals[withdrawal_row.tx_id].append(
+                clusterlib.TxOut(address=withdrawal_row.address, amount=int(withdrawal_row.amount))
             )
-            for r in dbsync_queries.query_reference_tx_ins(txhash=txhash)
-        ]
-
-    scripts = []
-    if txdata.last_row.script_count:
-        scripts = [
-            ScriptRecord(
-                hash=r.hash.hex(),
-                type=str(r.type),
-                serialised_size=int(r.serialised_size) if r.serialised_size else 0,
+
+    collaterals: Dict[int, List[clusterlib.UTXOData]] = collections.defaultdict(list)
+    if hashes := _with_records("collateral_count"):
+        for tx_id, collateral_tx_ins_row in dbsync_queries.query_txs_collateral_tx_ins(
+            txhashes=hashes
+        ):
+            collaterals[tx_id].append(
+                clusterlib.UTXOData(
+                    utxo_hash=collateral_tx_ins_row.tx_hash.hex(),
+                    utxo_ix=int(collateral_tx_ins_row.utxo_ix),
+                    amount=int(collateral_tx_ins_row.value),
+                    address=str(collateral_tx_ins_row.address),
+                )
             )
-            for r in dbsync_queries.query_plutus_scripts(txhash=txhash)
-        ]
-
-    redeemers = []
-    if txdata.last_row.redeemer_count:
-        redeemers = [
-            RedeemerRecord(
-                unit_mem=int(r.unit_mem),
-                unit_steps=int(r.unit_steps),
-                fee=int(r.fee),
-                purpose=str(r.purpose),
-                script_hash=r.script_hash.hex(),
+
+    collateral_outputs: Dict[int, List[clusterlib.UTXOData]] = collections.defaultdict(list)
+    if hashes := _with_records("collateral_out_count"):
+        for tx_id, collateral_tx_outs_row in dbsync_queries.query_txs_collateral_tx_outs(
+            txhashes=hashes
+        ):
+            collateral_outputs[tx_id].append(
+                clusterlib.UTXOData(
+                    utxo_hash=collateral_tx_outs_row.tx_hash.hex(),
+                    utxo_ix=int(collateral_tx_outs_row.utxo_ix),
+                    amount=int(collateral_tx_outs_row.value),
+                    address=str(collateral_tx_outs_row.address),
+                )
             )
-            for r in dbsync_queries.query_redeemers(txhash=txhash)
-        ]
-
-    record = TxRecord(
-        tx_id=int(txdata.last_row.tx_id),
-        tx_hash=txdata.last_row.tx_hash.hex(),
-        block_id=int(txdata.last_row.block_id),
-        block_index=int(txdata.last_row.block_index),
-        out_sum=int(txdata.last_row.out_sum),
-        fee=int(txdata.last_row.fee),
-        deposit=int(txdata.last_row.deposit),
-        size=int(txdata.last_row.size),
-        invalid_before=int(txdata.last_row.invalid_before)
-        if txdata.last_row.invalid_before
-        else None,
-        invalid_hereafter=int(txdata.last_row.invalid_hereafter)
-        if txdata.last_row.invalid_hereafter
-        else None,
-        txins=txins,
-        txouts=[*txdata.utxo_out, *txdata.ma_utxo_out],
-        mint=txdata.mint_utxo_out,
-        collaterals=collaterals,
-        collateral_outputs=collateral_outputs,
-        reference_inputs=reference_inputs,
-        scripts=scripts,
-        redeemers=redeemers,
-        metadata=metadata,
-        reserve=reserve,
-        treasury=treasury,
-        pot_transfers=pot_transfers,
-        stake_registration=stake_registration,
-        stake_deregistration=stake_deregistration,
-        stake_delegation=stake_delegation,
-        withdrawals=withdrawals,
-    )
 
+    reference_inputs: Dict[int, List[clusterlib.UTXOData]] = collections.defaultdict(list)
+    if hashes := _with_records("reference_input_count"):
+        for tx_id, reference_tx_ins_row in dbsync_queries.query_txs_reference_tx_ins(
+            txhashes=hashes
+        ):
+            reference_inputs[tx_id].append(
+                clusterlib.UTXOData(
+                    utxo_hash=reference_tx_ins_row.tx_hash.hex(),
+                    utxo_ix=int(reference_tx_ins_row.utxo_ix),
+                    amount=int(reference_tx_ins_row.value),
+                    address=str(reference_tx_ins_row.address),
+                )
+            )
+
+    scripts: Dict[int, List[ScriptRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("script_count"):
+        for plutus_scripts_row in dbsync_queries.query_txs_plutus_scripts(txhashes=hashes):
+            scripts[plutus_scripts_row.tx_id].append(
+                ScriptRecord(
+                    hash=plutus_scripts_row.hash.hex(),
+                    type=str(plutus_scripts_row.type),
+                    serialised_size=int(plutus_scripts_row.serialised_size)
+                    if plutus_scripts_row.serialised_size
+                    else 0,
+                )
+            )
+
+    redeemers: Dict[int, List[RedeemerRecord]] = collections.defaultdict(list)
+    if hashes := _with_records("redeemer_count"):
+        for redeemers_row in dbsync_queries.query_txs_redeemers(txhashes=hashes):
+            redeemers[redeemers_row.tx_id].append(
+                RedeemerRecord(
+                    unit_mem=int(redeemers_row.unit_mem),
+                    unit_steps=int(redeemers_row.unit_steps),
+                    fee=int(redeemers_row.fee),
+                    purpose=str(redeemers_row.purpose),
+                    script_hash=redeemers_row.script_hash.hex(),
+                )
+            )
+
+    records = {}
+    for txhash, txdata in prelim_records.items():
+        tx_row = txdata.tx_row
+        tx_id = int(tx_row.tx_id)
+        records[txhash] = TxRecord(
+            tx_id=tx_id,
+            tx_hash=tx_row.tx_hash.hex(),
+            block_id=int(tx_row.block_id),
+            block_index=int(tx_row.block_index),
+            out_sum=int(tx_row.out_sum),
+            fee=int(tx_row.fee),
+            deposit=int(tx_row.deposit),
+            size=int(tx_row.size),
+            invalid_before=int(tx_row.invalid_before) if tx_row.invalid_before else None,
+            invalid_hereafter=int(tx_row.invalid_hereafter) if tx_row.invalid_hereafter else None,
+            txins=txins.get(tx_id, []),
+            txouts=[*txdata.utxo_out, *txdata.ma_utxo_out],
+            mint=txdata.mint_utxo_out,
+            collaterals=collaterals.get(tx_id, []),
+            collateral_outputs=collateral_outputs.get(tx_id, []),
+            reference_inputs=reference_inputs.get(tx_id, []),
+            scripts=scripts.get(tx_id, []),
+            redeemers=redeemers.get(tx_id, []),
+            metadata=metadata.get(tx_id, []),
+            reserve=reserve.get(tx_id, []),
+            treasury=treasury.get(tx_id, []),
+            pot_transfers=pot_transfers.get(tx_id, []),
+            stake_registration=stake_registration.get(tx_id, []),
+            stake_deregistration=stake_deregistration.get(tx_id, []),
+            stake_delegation=stake_delegation.get(tx_id, []),
+            withdrawals=withdrawals.get(tx_id, []),
+        )
+
+    return records
+
+
+def get_tx_records(txhashes: Sequence[str]) -> Dict[str, TxRecord]:
+    """Get data of multiple transactions from db-sync.
+
+    Transactions are processed in batches of `TX_BATCH_SIZE`, each batch needs just a few SQL
+    queries.
+
+    Returns:
+        Dict[str, TxRecord]: Transaction records indexed by transaction hash. Transactions
+            that were not found in db-sync are not present.
+    """
+    records: Dict[str, TxRecord] = {}
+    for i in range(0, len(txhashes), TX_BATCH_SIZE):
+        records.update(_get_tx_records_batch(txhashes=txhashes[i : i + TX_BATCH_SIZE]))
+    return records
+
+
+def get_tx_record(txhash: str) -> TxRecord:
+    """Get transaction data from db-sync.
+
+    Compile data from multiple SQL queries to get as much information about the TX as possible.
+    """
+    record = get_tx_records(txhashes=[txhash]).get(txhash)
+    if record is None:
+        raise RuntimeError("No results were returned by the TX SQL query.")
     return record
 
 
-def get_tx_record_retry(txhash: str, retry_num: int = 3) -> TxRecord:
-    """Retry `get_tx_record` when data is anticipated and are not available yet.
+def get_tx_records_retry(txhashes: Sequence[str], retry_num: int = 3) -> Dict[str, TxRecord]:
+    """Retry `get_tx_records` when data is anticipated and are not available yet.
 
-    Under load it might be necessary to wait a bit and retry the query.
+    Only transactions that are still missing are queried again, after db-sync indexes
+    a new block.
     """
     retry_num = retry_num if retry_num >= 0 else 0
-    response = None
+    records: Dict[str, TxRecord] = {}
+    missing = list(txhashes)
 
     # first try + number of retries
     for r in range(1 + retry_num):
         if r > 0:
-            LOGGER.warning(f"Repeating TX SQL query for '{txhash}' for the {r} time.")
-            time.sleep(2 + r * r)
-        try:
-            response = get_tx_record(txhash=txhash)
+            LOGGER.warning(
+                f"Repeating TX SQL query for {len(missing)} transaction(s) for the {r} time."
+            )
+            wait_for_new_block()
+        records.update(get_tx_records(txhashes=missing))
+        missing = [h for h in missing if h not in records]
+        if not missing:
             break
-        except RuntimeError:
-            if r == retry_num:
-                raise
+    else:
+        raise RuntimeError(
+            f"No results were returned by the TX SQL query for: {', '.join(missing)}"
+        )
 
-    assert response is not None
-    return response
+    return records
+
+
+def get_tx_record_retry(txhash: str, retry_num: int = 3) -> TxRecord:
+    """Retry `get_tx_record` when data is anticipated and are not available yet.
+
+    Under load it might be necessary to wait for db-sync to index more blocks and retry
+    the query.
+    """
+    return get_tx_records_retry(txhashes=[txhash], retry_num=retry_num)[txhash]
 
 
 def _sum_mint_txouts(txouts: clusterlib.OptionalTxOuts) -> List[clusterlib.TxOut]:
@@ -649,7 +770,7 @@ def _tx_scripts_hashes(
     for r in records:
         if not r.script_file:
             continue
-        shash = cluster_obj.get_policyid(script_file=r.script_file)
+        shash = crypto_fast.get_policyid(cluster_obj=cluster_obj, script_file=r.script_file)
         shash_rec = hashes_db.get(shash)
         if shash_rec is None:
             hashes_db[shash] = [r]
@@ -750,17 +871,11 @@ def _txout_has_inline_datum(txout: clusterlib.TxOut) -> bool:
     return False
 
 
-def check_tx(
-    cluster_obj: clusterlib.ClusterLib, tx_raw_output: clusterlib.TxRawOutput, retry_num: int = 3
-) -> Optional[TxRecord]:
-    """Check a transaction in db-sync."""
+def _check_tx_record(
+    cluster_obj: clusterlib.ClusterLib, tx_raw_output: clusterlib.TxRawOutput, response: TxRecord
+) -> None:
+    """Compare transaction data with the transaction record from db-sync."""
     # pylint: disable=too-many-statements,too-many-locals
-    if not configuration.HAS_DBSYNC:
-        return None
-
-    txhash = cluster_obj.get_txid(tx_body_file=tx_raw_output.out_file)
-    response = get_tx_record_retry(txhash=txhash, retry_num=retry_num)
-
     tx_txouts = {_sanitize_txout(cluster_obj=cluster_obj, txout=r) for r in tx_raw_output.txouts}
     db_txouts = {utxodata2txout(r) for r in response.txouts}
 
@@ -942,7 +1057,7 @@ def check_tx(
 
     # check reference scripts
     tx_reference_script_hashes = {
-        cluster_obj.get_policyid(script_file=r.reference_script_file)
+        crypto_fast.get_policyid(cluster_obj=cluster_obj, script_file=r.reference_script_file)
         for r in tx_raw_output.txouts
         if r.reference_script_file
     }
@@ -956,9 +1071,55 @@ def check_tx(
         f"({tx_reference_script_hashes} != {db_reference_script_hashes})"
     )
 
+
+def check_tx(
+    cluster_obj: clusterlib.ClusterLib, tx_raw_output: clusterlib.TxRawOutput, retry_num: int = 3
+) -> Optional[TxRecord]:
+    """Check a transaction in db-sync."""
+    if not configuration.HAS_DBSYNC:
+        return None
+
+    txhash = crypto_fast.get_txid(cluster_obj=cluster_obj, tx_body_file=tx_raw_output.out_file)
+    wait_for_tip(cluster_obj=cluster_obj)
+    response = get_tx_record_retry(txhash=txhash, retry_num=retry_num)
+    _check_tx_record(cluster_obj=cluster_obj, tx_raw_output=tx_raw_output, response=response)
+
     return response
 
 
+def check_txs(
+    cluster_obj: clusterlib.ClusterLib,
+    tx_raw_outputs: Sequence[clusterlib.TxRawOutput],
+    retry_num: int = 3,
+) -> List[TxRecord]:
+    """Check multiple transactions in db-sync.
+
+    Data of all the transactions are fetched from db-sync in batches, which is much faster
+    than checking the transactions one by one using `check_tx`.
+
+    Returns:
+        List[TxRecord]: Transaction records in the same order as `tx_raw_outputs`, empty
+            if db-sync is not available.
+    """
+    if not configuration.HAS_DBSYNC:
+        return []
+
+    txhashes = [
+        crypto_fast.get_txid(cluster_obj=cluster_obj, tx_body_file=r.out_file)
+        for r in tx_raw_outputs
+    ]
+    wait_for_tip(cluster_obj=cluster_obj)
+    records = get_tx_records_retry(txhashes=txhashes, retry_num=retry_num)
+
+    responses = []
+    for txhash, tx_raw_output in zip(txhashes, tx_raw_outputs):
+        response = records[txhash]
+        _check_tx_record(cluster_obj=cluster_obj, tx_raw_output=tx_raw_output, response=response)
+        responses.append(response)
+
+    return responses
+
+
 def check_tx_phase_2_failure(
     cluster_obj: clusterlib.ClusterLib,
     tx_raw_output: clusterlib.TxRawOutput,
@@ -969,7 +1130,8 @@ def check_tx_phase_2_failure(
     if not configuration.HAS_DBSYNC:
         return None
 
-    txhash = cluster_obj.get_txid(tx_body_file=tx_raw_output.out_file)
+    txhash = crypto_fast.get_txid(cluster_obj=cluster_obj, tx_body_file=tx_raw_output.out_file)
+    wait_for_tip(cluster_obj=cluster_obj)
     response = get_tx_record_retry(txhash=txhash, retry_num=retry_num)
 
     # In case of a phase 2 failure, the collateral output becomes the output of the tx.
@@ -0,0 +1,91 @@
+"""Co-locating tests that wait for epoch boundaries on the same cluster instance.
+
+A test can declare its epoch-time profile when getting a cluster instance - number of epoch
+boundaries it waits for, and the interval within an epoch where it needs to be (the same `start`
+and `stop` as in `clusterlib_utils.wait_for_epoch_interval`).
+
+Tests with compatible profiles prefer cluster instances where such tests are already running, so
+their boundary waits overlap. The long waiting tests are then not spread over all the instances,
+and the other instances stay available for marked tests, singletons and restarts. The preference
+only changes order in which the instances are tried, it never makes a test wait.
+"""
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import NamedTuple
+
+
+def _from_end(seconds: int) -> bool:
+    return seconds < 0
+
+
+class EpochProfile(NamedTuple):
+    """Epoch-time profile of a test.
+
+    Position `start` == `stop` == 0 means that the test doesn't need any specific position
+    within an epoch.
+    """
+
+    boundaries: int = 0
+    start: int = 0
+    stop: int = 0
+
+    @property
+    def has_position(self) -> bool:
+        return bool(self.start or self.stop)
+
+    def to_name(self) -> str:
+        """Return the profile in format usable as a name of status record."""
+        return f"{self.boundaries}:{self.start}:{self.stop}"
+
+    @classmethod
+    def from_name(cls, name: str) -> "EpochProfile":
+        boundaries, start, stop = (int(p) for p in name.split(":"))
+        return cls(boundaries=boundaries, start=start, stop=stop)
+
+    def is_compatible(self, other: "EpochProfile") -> bool:
+        """Check if boundary waits of the two tests can overlap."""
+        if self.boundaries < 1 or other.boundaries < 1:
+            return False
+        if not (self.has_position and other.has_position):
+            return True
+
+        # the epoch length is not known here, so only positions counted from the same
+        # end of an epoch can be compared
+        refs = (_from_end(self.start), _from_end(self.stop))
+        if refs != (_from_end(other.start), _from_end(other.stop)):
+            return False
+        if refs[0] == refs[1]:
+            return max(self.start, other.start) < min(self.stop, other.stop)
+        # both intervals span the middle of an epoch
+        return True
+
+
+def order_instances(
+    profile: EpochProfile,
+    instances: Iterable[int],
+    running: Dict[int, List[EpochProfile]],
+) -> List[int]:
+    """Return cluster instances in order in which they should be tried by the test.
+
+    Args:
+        profile: An epoch-time profile of the test.
+        instances: Cluster instances in the default order.
+        running: A mapping of cluster instances to profiles of tests running there.
+
+    Returns:
+        List[int]: Instances with the most compatible running tests first, instances with
+            incompatible running tests last.
+    """
+
+    def _score(instance_num: int) -> int:
+        score = 0
+        for p in running.get(instance_num, ()):
+            score += 1 if profile.is_compatible(p) else -1
+        return score
+
+    instances = list(instances)
+    if profile.boundaries < 1:
+        return instances
+    # the sort is stable, so the default order is kept for instances with the same score
+    return sorted(instances, key=lambda i: -_score(i))
@@ -0,0 +1,281 @@
+"""Sending funds from faucet addresses.
+
+Faucet of a local cluster instance is split into shards (see `FAUCET_SHARDS`). Every shard is
+guarded by a file lock, so a shard is used by a single worker at a time.
+
+When `FUNDING_BATCH_WINDOW` is set, funding requests of all workers are coalesced. A worker
+that locks a free shard becomes batch leader. It waits for the batch window, collects all pending
+requests and sends the funds in a single transaction. Other workers wait for the result
+of their request, or become leaders themselves when a shard gets free.
+"""
+import contextlib
+import itertools
+import logging
+import os
+import pickle
+import random
+import time
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import filelock
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import temptools
+from cardano_node_tests.utils.types import FileType
+
+LOGGER = logging.getLogger(__name__)
+
+BATCH_DIR = "funding_batches"
+QUEUE_LOCK = ".queue.lock"
+REQ_SUFFIX = ".req"
+RES_SUFFIX = ".res"
+
+# keep the funding transaction well below the max tx size
+MAX_BATCH_OUTPUTS = 100
+# how long to wait for result of a funding request before sending the funds separately
+BATCH_TIMEOUT_SEC = 300
+# requests older than this are leftovers from an interrupted run
+STALE_REQUEST_SEC = 600
+
+
+class FundingResult(NamedTuple):
+    tx_raw_output: Optional[clusterlib.TxRawOutput]
+    error: str = ""
+
+
+def get_shards(faucet_data: dict) -> List[clusterlib.AddressRecord]:
+    """Return faucet addresses that can be used for funding."""
+    return list(faucet_data.get("shards") or ()) or [faucet_data["payment"]]
+
+
+def _get_shard_lock(shard: clusterlib.AddressRecord) -> Any:
+    return locking.FileLockIfXdist(f"{temptools.get_basetemp()}/{shard.address}.lock")
+
+
+def _try_lock_shard(
+    shards: List[clusterlib.AddressRecord],
+) -> Optional[Tuple[clusterlib.AddressRecord, Any]]:
+    """Lock the first shard that is not used by other worker, don't wait for any lock."""
+    for shard in shards:
+        shard_lock = _get_shard_lock(shard)
+        try:
+            shard_lock.acquire(timeout=0)
+        except filelock.Timeout:
+            continue
+        return shard, shard_lock
+    return None
+
+
+@contextlib.contextmanager
+def locked_shard(faucet_data: dict) -> Iterator[clusterlib.AddressRecord]:
+    """Lock a faucet shard for exclusive use by this worker - context manager.
+
+    Faucet shards that are not used by other workers are preferred. If all of them are in use,
+    wait for a randomly selected shard.
+    """
+    shards = get_shards(faucet_data)
+    random.shuffle(shards)
+
+    if not configuration.IS_XDIST:
+        yield shards[0]
+        return
+
+    locked = _try_lock_shard(shards)
+    if locked:
+        shard, shard_lock = locked
+        try:
+            yield shard
+        finally:
+            shard_lock.release()
+        return
+
+    with _get_shard_lock(shards[0]):
+        yield shards[0]
+
+
+def _send_from_shard(
+    cluster_obj: clusterlib.ClusterLib,
+    shard: clusterlib.AddressRecord,
+    destinations: List[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: FileType,
+) -> clusterlib.TxRawOutput:
+    return cluster_obj.send_funds(
+        src_address=shard.address,
+        destinations=destinations,
+        tx_name=tx_name,
+        tx_files=clusterlib.TxFiles(signing_key_files=[shard.skey_file]),
+        destination_dir=destination_dir,
+    )
+
+
+def _write_pickle(path: Path, obj: Any) -> None:
+    """Write the file atomically, so readers never see incomplete data."""
+    tmp_path = Path(f"{path}.tmp")
+    with open(tmp_path, "wb") as out_data:
+        pickle.dump(obj, out_data)
+    os.replace(tmp_path, path)
+
+
+def _read_pickle(path: Path) -> Any:
+    with open(path, "rb") as in_data:
+        return pickle.load(in_data)
+
+
+def _process_batch(
+    cluster_obj: clusterlib.ClusterLib,
+    shard: clusterlib.AddressRecord,
+    batch_dir: Path,
+    tx_name: str,
+    destination_dir: FileType,
+) -> None:
+    """Send funds for pending requests in a single transaction and store the results."""
+    requests: Dict[Path, List[clusterlib.TxOut]] = {}
+    num_outputs = 0
+    with locking.FileLockIfXdist(f"{batch_dir}/{QUEUE_LOCK}"):
+        for req_file in sorted(batch_dir.glob(f"*{REQ_SUFFIX}")):
+            if req_file.stat().st_mtime < time.time() - STALE_REQUEST_SEC:
+                req_file.unlink()
+                continue
+            req_destinations: List[clusterlib.TxOut] = _read_pickle(req_file)
+            if requests and num_outputs + len(req_destinations) > MAX_BATCH_OUTPUTS:
+                break
+            requests[req_file] = req_destinations
+            num_outputs += len(req_destinations)
+            req_file.unlink()
+
+    if not requests:
+        return
+
+    try:
+        tx_raw_output = _send_from_shard(
+            cluster_obj=cluster_obj,
+            shard=shard,
+            destinations=list(itertools.chain.from_iterable(requests.values())),
+            tx_name=f"{tx_name}_batch{len(requests)}",
+            destination_dir=destination_dir,
+        )
+        # other workers run in different working directories
+        result = FundingResult(
+            tx_raw_output=tx_raw_output._replace(out_file=tx_raw_output.out_file.resolve())
+        )
+    except Exception as err:
+        LOGGER.warning(f"Batched funding failed: {err}")
+        result = FundingResult(tx_raw_output=None, error=str(err))
+
+    for req_file in requests:
+        _write_pickle(req_file.with_suffix(RES_SUFFIX), result)
+
+
+def _send_batched(
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    destinations: List[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: FileType,
+) -> Optional[clusterlib.TxRawOutput]:
+    """Send funds in a single transaction together with funding requests of other workers.
+
+    Returns:
+        Optional[clusterlib.TxRawOutput]: Output of the batch transaction with `txouts` limited
+            to `destinations`, or None if the funds need to be sent separately.
+    """
+    batch_dir = temptools.get_basetemp() / BATCH_DIR / faucet_data["payment"].address
+    batch_dir.mkdir(parents=True, exist_ok=True)
+
+    req_id = helpers.get_timestamped_rand_str()
+    req_file = batch_dir / f"{req_id}{REQ_SUFFIX}"
+    res_file = batch_dir / f"{req_id}{RES_SUFFIX}"
+    _write_pickle(req_file, destinations)
+
+    shards = get_shards(faucet_data)
+    end_time = time.time() + BATCH_TIMEOUT_SEC
+    while not res_file.exists():
+        if end_time and time.time() > end_time:
+            # The request can be withdrawn only if no leader took it yet, otherwise the funds
+            # would be sent twice. The leader takes requests under the queue lock.
+            with locking.FileLockIfXdist(f"{batch_dir}/{QUEUE_LOCK}"):
+                try:
+                    req_file.unlink()
+                except FileNotFoundError:
+                    pass
+                else:
+                    LOGGER.warning(f"Batched funding request '{req_id}' timed out.")
+                    return None
+            LOGGER.warning(f"Batched funding request '{req_id}' is being processed, waiting.")
+            end_time = 0.0
+
+        random.shuffle(shards)
+        locked = _try_lock_shard(shards)
+        # the request is not processed yet, or it is being processed by other worker
+        if not locked or not req_file.exists():
+            if locked:
+                locked[1].release()
+            time.sleep(0.1)
+            continue
+
+        shard, shard_lock = locked
+        try:
+            # give other workers time to add their requests to the batch
+            time.sleep(configuration.FUNDING_BATCH_WINDOW)
+            _process_batch(
+                cluster_obj=cluster_obj,
+                shard=shard,
+                batch_dir=batch_dir,
+                tx_name=tx_name,
+                destination_dir=destination_dir,
+            )
+        finally:
+            shard_lock.release()
+
+    result: FundingResult = _read_pickle(res_file)
+    res_file.unlink()
+    if not result.tx_raw_output:
+        return None
+
+    own_addresses = {d.address for d in destinations}
+    return result.tx_raw_output._replace(
+        txouts=[t for t in result.tx_raw_output.txouts if t.address in own_addresses]
+    )
+
+
+def send_funds(
+    cluster_obj: clusterlib.ClusterLib,
+    faucet_data: dict,
+    destinations: List[clusterlib.TxOut],
+    tx_name: str,
+    destination_dir: FileType = ".",
+) -> clusterlib.TxRawOutput:
+    """Send funds from faucet to `destinations`.
+
+    The funds are sent in a batch with funding requests of other workers, if enabled.
+    """
+    if configuration.IS_XDIST and configuration.FUNDING_BATCH_WINDOW > 0:
+        tx_raw_output = _send_batched(
+            cluster_obj=cluster_obj,
+            faucet_data=faucet_data,
+            destinations=destinations,
+            tx_name=tx_name,
+            destination_dir=destination_dir,
+        )
+        if tx_raw_output:
+            return tx_raw_output
+
+    with locked_shard(faucet_data) as shard:
+        return _send_from_shard(
+            cluster_obj=cluster_obj,
+            shard=shard,
+            destinations=destinations,
+            tx_name=tx_name,
+            destination_dir=destination_dir,
+        )
@@ -0,0 +1,202 @@
+"""Detection of nodes that have forked blockchain or are out of sync.
+
+All nodes of a cluster instance are queried concurrently. Each query is bound to the socket of
+the queried node through environment of the `cardano-cli` process, so the
+`CARDANO_NODE_SOCKET_PATH` env variable of the test process is never modified.
+
+There are two modes of the check:
+
+* tips only - tips of all nodes are compared, this is cheap enough to run after every test
+* UTxO digest - digests of UTxO set of the given address are compared instead of tips
+"""
+import collections
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Set
+
+from cardano_clusterlib import clusterlib
+from cardano_clusterlib import coverage
+
+from cardano_node_tests.utils import cluster_nodes
+
+LOGGER = logging.getLogger(__name__)
+
+# number of rounds of queries before a node is considered forked or out of sync
+ATTEMPTS = 5
+# time between rounds, new blocks need some time to propagate to all nodes
+ATTEMPT_INTERVAL_SEC = 1.0
+
+
+class NodeState(NamedTuple):
+    node: str
+    synced: bool
+    tip_hash: str = ""
+    slot: int = -1
+    utxo_digest: str = ""
+    error: str = ""
+
+
+class ForkReport(NamedTuple):
+    forked_nodes: Set[str]
+    unsynced_nodes: Set[str]
+    node_states: Dict[str, NodeState]
+
+    @property
+    def diverged(self) -> bool:
+        return bool(self.forked_nodes or self.unsynced_nodes)
+
+
+def get_node_sockets(instance_num: Optional[int] = None) -> Dict[str, Path]:
+    """Return paths to sockets of all nodes of the cluster instance."""
+    if instance_num is None:
+        instance_num = cluster_nodes.get_instance_num()
+    return {
+        node: cluster_nodes.get_cardano_node_socket_path(
+            instance_num=instance_num, socket_file_name=f"{node}.socket"
+        )
+        for node in sorted(cluster_nodes.get_cluster_type().NODES)
+    }
+
+
+def _get_query_cmd(cluster_obj: clusterlib.ClusterLib, cli_args: List[str]) -> List[str]:
+    return [
+        "cardano-cli",
+        "query",
+        *cli_args,
+        *cluster_obj.magic_args,
+        f"--{cluster_obj.protocol}-mode",
+    ]
+
+
+def _query(cluster_obj: clusterlib.ClusterLib, socket_path: Path, cli_args: List[str]) -> str:
+    """Run `cardano-cli query` against the node listening on `socket_path`."""
+    cmd = _get_query_cmd(cluster_obj=cluster_obj, cli_args=cli_args)
+    env = {**os.environ, "CARDANO_NODE_SOCKET_PATH": str(socket_path)}
+
+    LOGGER.debug(f"Running `{' '.join(cmd)}` on '{socket_path}'")
+    proc = subprocess.run(cmd, env=env, capture_output=True, check=False)
+    if proc.returncode != 0:
+        raise clusterlib.CLIError(
+            f"An error occurred running a CLI command `{' '.join(cmd)}` on socket "
+            f"'{socket_path}': {proc.stderr.decode()}"
+        )
+    return proc.stdout.decode("utf-8")
+
+
+def _get_utxo_args(address: str) -> List[str]:
+    return ["utxo", "--address", address, "--out-file", "/dev/stdout"]
+
+
+def _get_utxo_digest(utxo_out: str) -> str:
+    utxo_canonical = json.dumps(json.loads(utxo_out), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(utxo_canonical.encode("utf-8")).hexdigest()
+
+
+def _get_node_state(
+    cluster_obj: clusterlib.ClusterLib, node: str, socket_path: Path, address: str
+) -> NodeState:
+    try:
+        tip = json.loads(_query(cluster_obj=cluster_obj, socket_path=socket_path, cli_args=["tip"]))
+        if float(tip.get("syncProgress") or 0) != 100:
+            return NodeState(node=node, synced=False)
+
+        utxo_digest = ""
+        if address:
+            utxo_out = _query(
+                cluster_obj=cluster_obj,
+                socket_path=socket_path,
+                cli_args=_get_utxo_args(address),
+            )
+            utxo_digest = _get_utxo_digest(utxo_out)
+    except Exception as exc:
+        return NodeState(node=node, synced=False, error=str(exc))
+
+    return NodeState(
+        node=node,
+        synced=True,
+        tip_hash=tip.get("hash") or "",
+        slot=tip.get("slot") or 0,
+        utxo_digest=utxo_digest,
+    )
+
+
+def _get_forked(states: Dict[str, NodeState], by_utxo: bool) -> Set[str]:
+    """Return nodes that differ from the majority of synced nodes."""
+    synced = [s for s in states.values() if s.synced]
+    if not synced:
+        return set()
+
+    groups: Dict[str, Set[str]] = collections.defaultdict(set)
+    for state in synced:
+        groups[state.utxo_digest if by_utxo else state.tip_hash].add(state.node)
+    majority = max(groups.values(), key=len)
+    return {s.node for s in synced} - majority
+
+
+def detect_fork(
+    cluster_obj: clusterlib.ClusterLib,
+    address: str = "",
+    node_sockets: Optional[Dict[str, Path]] = None,
+) -> ForkReport:
+    """Query all nodes concurrently and report nodes that diverged from the majority.
+
+    Args:
+        cluster_obj: An instance of `clusterlib.ClusterLib`.
+        address: An address whose UTxO digests are compared (optional, only tips are compared
+            by default).
+        node_sockets: A mapping of node names to their sockets (optional, all nodes
+            of the current cluster instance by default).
+
+    Returns:
+        ForkReport: Report of forked and unsynced nodes, and the last known state of each node.
+    """
+    node_sockets = node_sockets or get_node_sockets()
+    by_utxo = bool(address)
+
+    # the coverage is recorded here, not in the worker threads
+    for cli_args in (["tip"], _get_utxo_args(address)) if by_utxo else (["tip"],):
+        coverage.record_cli_coverage(
+            cli_args=_get_query_cmd(cluster_obj=cluster_obj, cli_args=cli_args),
+            coverage_dict=cluster_obj.cli_coverage,
+        )
+
+    states: Dict[str, NodeState] = {}
+    forked: Set[str] = set()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(node_sockets)) as executor:
+        for i in range(ATTEMPTS):
+            if i > 0:
+                time.sleep(ATTEMPT_INTERVAL_SEC)
+
+            # all nodes are queried in each round, as tips of the nodes in majority move as well
+            futures = {
+                n: executor.submit(
+                    _get_node_state,
+                    cluster_obj=cluster_obj,
+                    node=n,
+                    socket_path=s,
+                    address=address,
+                )
+                for n, s in node_sockets.items()
+            }
+            states = {n: f.result() for n, f in futures.items()}
+
+            forked = _get_forked(states=states, by_utxo=by_utxo)
+            if not forked and all(s.synced for s in states.values()):
+                break
+
+    unsynced = {s.node for s in states.values() if not s.synced}
+    for state in states.values():
+        if state.error:
+            LOGGER.warning(f"Failed to query node '{state.node}': {state.error}")
+
+    return ForkReport(forked_nodes=forked, unsynced_nodes=unsynced, node_states=states)
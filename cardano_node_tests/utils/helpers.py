@@ -27,6 +27,7 @@ from typing import Optional
 from typing import TypeVar
 from typing import Union
 
+from cardano_node_tests.utils import crypto_fast
 from cardano_node_tests.utils.types import FileType
 
 
@@ -218,12 +219,12 @@ def write_json(location: FileType, content: dict) -> FileType:
 
 def decode_bech32(bech32: str) -> str:
     """Convert from bech32 string."""
-    return run_command(f"echo '{bech32}' | bech32", shell=True).decode().strip()
+    return crypto_fast.decode_bech32(bech32=bech32)
 
 
 def encode_bech32(prefix: str, data: str) -> str:
     """Convert to bech32 string."""
-    return run_command(f"echo '{data}' | bech32 {prefix}", shell=True).decode().strip()
+    return crypto_fast.encode_bech32(prefix=prefix, data=data)
 
 
 def check_dir_arg(dir_path: str) -> Optional[Path]:
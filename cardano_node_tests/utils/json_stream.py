@@ -0,0 +1,248 @@
+"""Extraction of selected parts of large JSON documents from a stream.
+
+The JSON document is read in chunks. Parts of the document that were not selected are skipped
+without being parsed, and only the selected subtrees are parsed into Python objects. Reading
+of the stream stops as soon as all selected subtrees were found.
+
+Selectors are dot-separated paths of object keys, e.g. `stateBefore.esSnapshots.pstakeMark`.
+The `*` path element matches any key.
+"""
+import json
+import re
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import TextIO
+
+CHUNK_SIZE = 1024 * 1024
+
+_WS_RE = re.compile(r"[ \t\n\r]*")
+_STRUCT_RE = re.compile(r'[{}\[\]"]')
+_STRING_END_RE = re.compile(r'(?:[^"\\]|\\.)*"', re.DOTALL)
+_SCALAR_RE = re.compile(r"[^ \t\n\r,\]}]*")
+
+# selectors tree; `None` in place of a subtree selects the whole subtree
+SelectorsTree = Dict[str, Optional[dict]]
+
+_MISSING = object()
+
+
+def _get_tree(selectors: Iterable[str]) -> SelectorsTree:
+    """Convert dot-separated selectors to a tree."""
+    tree: SelectorsTree = {}
+    for selector in selectors:
+        node = tree
+        *parents, last = selector.split(".")
+        for key in parents:
+            child = node.get(key, {})
+            if child is None:
+                break
+            node[key] = child
+            node = child
+        else:
+            node[last] = None
+    return tree
+
+
+def _lookup(tree: SelectorsTree, key: str) -> Any:
+    if key in tree:
+        return tree[key]
+    return tree.get("*", _MISSING)
+
+
+def _count_leaves(tree: Optional[dict]) -> int:
+    """Return number of selected subtrees, -1 if it is not known in advance."""
+    if tree is None:
+        return 1
+    if "*" in tree:
+        return -1
+    counts = [_count_leaves(v) for v in tree.values()]
+    return -1 if -1 in counts else sum(counts)
+
+
+class _JsonScanner:
+    """Scanner of JSON document that keeps only the unprocessed part of the document in memory."""
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._eof = False
+        self._buf = ""
+        self._pos = 0
+        # start of data that needs to be kept in the buffer
+        self._mark: Optional[int] = None
+
+    def _fill(self) -> bool:
+        """Read next chunk of data, drop data that were already processed."""
+        if self._eof:
+            return False
+
+        keep_from = self._pos if self._mark is None else min(self._pos, self._mark)
+        if keep_from:
+            self._buf = self._buf[keep_from:]
+            self._pos -= keep_from
+            if self._mark is not None:
+                self._mark -= keep_from
+
+        chunk = self._stream.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf += chunk
+        return True
+
+    def peek(self) -> str:
+        """Return next non-whitespace character, don't consume it."""
+        while True:
+            self._pos = _WS_RE.match(self._buf, self._pos).end()  # type: ignore
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data.")
+
+    def _consume(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at '{self._buf[self._pos : self._pos + 20]}'.")
+        self._pos += 1
+
+    def _string_end(self) -> int:
+        """Return position after the string that starts at the current position."""
+        while True:
+            match = _STRING_END_RE.match(self._buf, self._pos + 1)
+            if match:
+                return match.end()
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON data in string.")
+
+    def _read_string(self) -> str:
+        if self.peek() != '"':
+            raise ValueError(f"Expected string at '{self._buf[self._pos : self._pos + 20]}'.")
+        end = self._string_end()
+        value: str = json.loads(self._buf[self._pos : end])
+        self._pos = end
+        return value
+
+    def _skip_scalar(self) -> None:
+        while True:
+            end = _SCALAR_RE.match(self._buf, self._pos).end()  # type: ignore
+            # the scalar can continue in the next chunk
+            if end < len(self._buf) or not self._fill():
+                break
+        self._pos = end
+
+    def skip_value(self) -> None:
+        """Skip the next JSON value without parsing it."""
+        char = self.peek()
+        if char == '"':
+            self._pos = self._string_end()
+            return
+        if char not in "{[":
+            self._skip_scalar()
+            return
+
+        depth = 0
+        while True:
+            match = _STRUCT_RE.search(self._buf, self._pos)
+            if not match:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON data.")
+                continue
+            self._pos = match.start()
+            if match.group() == '"':
+                self._pos = self._string_end()
+                continue
+            self._pos += 1
+            depth += 1 if match.group() in "{[" else -1
+            if depth == 0:
+                return
+
+    def read_value(self) -> Any:
+        """Parse the next JSON value."""
+        self.peek()
+        self._mark = self._pos
+        self.skip_value()
+        raw = self._buf[self._mark : self._pos]
+        self._mark = None
+        return json.loads(raw)
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over keys of JSON object, the value needs to be consumed after each key."""
+        self._consume("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._read_string()
+            self._consume(":")
+            yield key
+            char = self.peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Expected ',' or '}}' at '{self._buf[self._pos - 1:][:20]}'.")
+
+
+class _Extractor:
+    def __init__(self, scanner: _JsonScanner, include: Optional[SelectorsTree]) -> None:
+        self._scanner = scanner
+        # stop reading when all selected subtrees were found
+        self._remaining = _count_leaves(include) if include else -1
+
+    @property
+    def done(self) -> bool:
+        return self._remaining == 0
+
+    def extract(self, include: Optional[SelectorsTree], exclude: SelectorsTree) -> Any:
+        scanner = self._scanner
+        if not exclude and include is None:
+            return scanner.read_value()
+        if scanner.peek() != "{":
+            if include is None:
+                return scanner.read_value()
+            scanner.skip_value()
+            return _MISSING
+
+        obj = {}
+        for key in scanner.iter_object():
+            sub_include = None if include is None else _lookup(include, key)
+            sub_exclude = _lookup(exclude, key)
+            if sub_include is _MISSING or (sub_exclude is None):
+                scanner.skip_value()
+                continue
+
+            value = self.extract(
+                include=sub_include, exclude={} if sub_exclude is _MISSING else sub_exclude
+            )
+            if value is not _MISSING:
+                obj[key] = value
+            if include is not None and sub_include is None:
+                self._remaining -= 1
+            if self.done:
+                break
+
+        return obj
+
+
+def extract_json(
+    stream: TextIO, include: Iterable[str] = (), exclude: Iterable[str] = ()
+) -> Dict[str, Any]:
+    """Extract selected parts of JSON object from a stream.
+
+    Args:
+        stream: A text stream with JSON object.
+        include: Selectors of parts of the object to extract (optional, everything by default).
+        exclude: Selectors of parts of the object to skip (optional).
+
+    Returns:
+        Dict[str, Any]: The JSON object limited to the selected parts.
+    """
+    include_tree = _get_tree(include) or None
+    extractor = _Extractor(scanner=_JsonScanner(stream), include=include_tree)
+    extracted = extractor.extract(include=include_tree, exclude=_get_tree(exclude))
+    if not isinstance(extracted, dict):
+        raise ValueError("The JSON document is not an object.")
+    return extracted
@@ -0,0 +1,192 @@
+"""Compressed, deduplicated archive of ledger state dumps.
+
+Ledger state is split into chunks - every JSON object or array whose serialized size exceeds
+`MIN_CHUNK_SIZE` is stored as a separate chunk, with references to its child chunks. Chunks are
+compressed and stored under their content hash, so subtrees that didn't change between
+consecutive ledger states (e.g. stake snapshot that moved from "mark" to "set", protocol
+parameters, pool parameters) are stored only once.
+
+Every archived ledger state is represented by a small manifest file that points to the root
+chunk. The ledger state can be loaded either whole, or lazily, when chunks are loaded only when
+accessed.
+"""
+import collections.abc
+import hashlib
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils.types import FileType
+
+ARCHIVE_DIR = "ledger_archive"
+MANIFEST_SUFFIX = "_ledger_state.manifest.json"
+CHUNK_SUFFIX = ".zz"
+
+# objects and arrays smaller than this are stored inline in the parent chunk
+MIN_CHUNK_SIZE = 4096
+
+# chunk kinds
+KIND_OBJECT = "o"
+KIND_ARRAY = "a"
+
+
+class _ChunkWriter:
+    def __init__(self, archive_dir: Path) -> None:
+        self.archive_dir = archive_dir
+
+    def _store(self, chunk: dict) -> str:
+        chunk_bytes = json.dumps(chunk, separators=(",", ":")).encode("utf-8")
+        chunk_hash = hashlib.blake2b(chunk_bytes, digest_size=20).hexdigest()
+        chunk_file = self.archive_dir / chunk_hash[:2] / f"{chunk_hash}{CHUNK_SUFFIX}"
+        if chunk_file.exists():
+            return chunk_hash
+
+        chunk_file.parent.mkdir(parents=True, exist_ok=True)
+        # write to temporary file first, so concurrent writers never produce incomplete chunk
+        tmp_file = chunk_file.with_name(f".{chunk_file.name}_{helpers.get_rand_str(8)}")
+        try:
+            tmp_file.write_bytes(zlib.compress(chunk_bytes))
+            os.replace(tmp_file, chunk_file)
+        finally:
+            tmp_file.unlink(missing_ok=True)
+        return chunk_hash
+
+    def encode(self, value: Any) -> Tuple[bool, Any, int]:
+        """Encode value, store it as chunk if it is big enough.
+
+        Returns:
+            Tuple[bool, Any, int]: A flag indicating whether the value was stored as chunk,
+                the value or hash of the chunk, and approximate serialized size of the value.
+        """
+        if isinstance(value, dict):
+            kind = KIND_OBJECT
+            pairs = list(value.items())
+        elif isinstance(value, list):
+            kind = KIND_ARRAY
+            pairs = [("", v) for v in value]
+        else:
+            return False, value, len(str(value)) + 2
+
+        items: List[Any] = []
+        refs: List[int] = []
+        size = 0
+        for i, (key, child) in enumerate(pairs):
+            is_ref, encoded, encoded_size = self.encode(child)
+            items.append([key, encoded] if kind == KIND_OBJECT else encoded)
+            size += len(key) + encoded_size + 4
+            if is_ref:
+                refs.append(i)
+
+        # values with references to chunks can't be stored inline
+        if not refs and size < MIN_CHUNK_SIZE:
+            return False, value, size
+
+        chunk_hash = self._store({"kind": kind, "items": items, "refs": refs})
+        return True, chunk_hash, len(chunk_hash) + 2
+
+
+def _load_chunk(archive_dir: Path, chunk_hash: str) -> dict:
+    chunk_file = archive_dir / chunk_hash[:2] / f"{chunk_hash}{CHUNK_SUFFIX}"
+    chunk: dict = json.loads(zlib.decompress(chunk_file.read_bytes()))
+    return chunk
+
+
+def _decode_chunk(archive_dir: Path, chunk: dict) -> Any:
+    """Decode the whole value stored in chunk, including all child chunks."""
+    refs = set(chunk["refs"])
+    if chunk["kind"] == KIND_OBJECT:
+        return {
+            k: _decode(archive_dir, v) if i in refs else v
+            for i, (k, v) in enumerate(chunk["items"])
+        }
+    return [_decode(archive_dir, v) if i in refs else v for i, v in enumerate(chunk["items"])]
+
+
+def _decode(archive_dir: Path, chunk_hash: str) -> Any:
+    return _decode_chunk(
+        archive_dir=archive_dir, chunk=_load_chunk(archive_dir=archive_dir, chunk_hash=chunk_hash)
+    )
+
+
+def _decode_lazy(archive_dir: Path, chunk_hash: str) -> Any:
+    chunk = _load_chunk(archive_dir=archive_dir, chunk_hash=chunk_hash)
+    if chunk["kind"] == KIND_OBJECT:
+        return LazyObject(archive_dir=archive_dir, chunk=chunk)
+    return _decode_chunk(archive_dir=archive_dir, chunk=chunk)
+
+
+class LazyObject(collections.abc.Mapping):
+    """Read-only JSON object that loads its child chunks only when they are accessed."""
+
+    def __init__(self, archive_dir: Path, chunk: dict) -> None:
+        self._archive_dir = archive_dir
+        self._items: Dict[str, Any] = dict(chunk["items"])
+        self._refs = {chunk["items"][i][0] for i in chunk["refs"]}
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._items[key]
+        if key in self._refs:
+            value = _decode_lazy(archive_dir=self._archive_dir, chunk_hash=value)
+            self._items[key] = value
+            self._refs.discard(key)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+def save_ledger_state(ledger_state: dict, state_name: str, destination_dir: FileType = ".") -> Path:
+    """Store ledger state in the archive in `destination_dir`.
+
+    Returns:
+        Path: A path to the manifest file of the archived ledger state.
+    """
+    destination_dir = Path(destination_dir)
+    archive_dir = destination_dir / ARCHIVE_DIR
+    is_ref, root, __ = _ChunkWriter(archive_dir=archive_dir).encode(ledger_state)
+
+    manifest_file = destination_dir / f"{state_name}{MANIFEST_SUFFIX}"
+    manifest: Dict[str, Any] = {"archive_dir": ARCHIVE_DIR}
+    if is_ref:
+        manifest["root"] = root
+    else:
+        manifest["value"] = root
+    helpers.write_json(location=manifest_file, content=manifest)
+    return manifest_file
+
+
+def _read_manifest(manifest_file: FileType) -> Tuple[Path, dict]:
+    manifest_file = Path(manifest_file)
+    with open(manifest_file, encoding="utf-8") as in_json:
+        manifest: dict = json.load(in_json)
+    return manifest_file.parent / manifest["archive_dir"], manifest
+
+
+def load_ledger_state(manifest_file: FileType) -> dict:
+    """Load the whole archived ledger state."""
+    archive_dir, manifest = _read_manifest(manifest_file)
+    if "value" in manifest:
+        return dict(manifest["value"])
+    ledger_state: dict = _decode(archive_dir=archive_dir, chunk_hash=manifest["root"])
+    return ledger_state
+
+
+def load_ledger_state_lazy(manifest_file: FileType) -> collections.abc.Mapping:
+    """Load archived ledger state lazily, chunks are loaded only when accessed."""
+    archive_dir, manifest = _read_manifest(manifest_file)
+    if "value" in manifest:
+        return dict(manifest["value"])
+    lazy_state: collections.abc.Mapping = _decode_lazy(
+        archive_dir=archive_dir, chunk_hash=manifest["root"]
+    )
+    return lazy_state
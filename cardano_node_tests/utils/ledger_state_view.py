@@ -0,0 +1,110 @@
+"""Indexed view of ledger state dump.
+
+Records in ledger state dump (stake snapshots, reward update) are lists of
+`[credential, value]` pairs. The view indexes them by credential hash once, so lookups
+of individual credentials don't need to scan the lists.
+"""
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+# names of stake distribution snapshots and corresponding keys in the ledger state dump
+SNAPSHOT_KEYS = {"mark": "pstakeMark", "set": "pstakeSet", "go": "pstakeGo"}
+
+
+def get_cred_hash(cred: Dict[str, str]) -> str:
+    """Get credential hash (key or script) from credential record."""
+    # make it fail when neither key nor script hash is present
+    return cred.get("key hash") or cred["script hash"]
+
+
+class RewardRecord:
+    """Reward of a credential from reward update."""
+
+    __slots__ = ("reward_type", "amount", "pool_id")
+
+    def __init__(self, reward_type: str, amount: int, pool_id: str) -> None:
+        self.reward_type = reward_type
+        self.amount = amount
+        self.pool_id = pool_id
+
+    def __repr__(self) -> str:
+        return (
+            f"<RewardRecord: reward_type={self.reward_type}, amount={self.amount}, "
+            f"pool_id={self.pool_id}>"
+        )
+
+
+class StakeSnapshot:
+    """Stake distribution snapshot indexed by credential hashes and pool IDs."""
+
+    __slots__ = ("stake", "delegations", "pool_delegators", "pool_params")
+
+    def __init__(self, snapshot: Dict[str, Any]) -> None:
+        # credential hash -> staked amount
+        self.stake: Dict[str, int] = {}
+        for cred, amount in snapshot["stake"]:
+            cred_hash = get_cred_hash(cred)
+            self.stake[cred_hash] = self.stake.get(cred_hash, 0) + amount
+
+        # credential hash -> pool ID
+        self.delegations: Dict[str, str] = {}
+        # pool ID -> credential hashes
+        self.pool_delegators: Dict[str, List[str]] = {}
+        for cred, pool_id in snapshot["delegations"]:
+            cred_hash = get_cred_hash(cred)
+            self.delegations[cred_hash] = pool_id
+            self.pool_delegators.setdefault(pool_id, []).append(cred_hash)
+
+        self.pool_params: Dict[str, dict] = snapshot.get("poolParams") or {}
+
+
+class LedgerStateView:
+    """Ledger state dump indexed for lookups by credential hashes and pool IDs."""
+
+    __slots__ = ("blocks_before", "blocks_current", "account_state", "snapshots", "rewards")
+
+    def __init__(self, ledger_state: Dict[str, Any]) -> None:
+        self.blocks_before: Dict[str, int] = ledger_state.get("blocksBefore") or {}
+        self.blocks_current: Dict[str, int] = ledger_state.get("blocksCurrent") or {}
+
+        state_before = ledger_state["stateBefore"]
+        self.account_state: Dict[str, int] = state_before.get("esAccountState") or {}
+        es_snapshots = state_before["esSnapshots"]
+        self.snapshots: Dict[str, StakeSnapshot] = {
+            name: StakeSnapshot(es_snapshots[key]) for name, key in SNAPSHOT_KEYS.items()
+        }
+
+        # credential hash -> rewards
+        self.rewards: Dict[str, List[RewardRecord]] = {}
+        # make it fail when the reward update is missing
+        for cred, cred_rewards in ledger_state["possibleRewardUpdate"]["rs"]:
+            self.rewards.setdefault(get_cred_hash(cred), []).extend(
+                RewardRecord(
+                    reward_type=r["rewardType"],
+                    amount=r["rewardAmount"],
+                    pool_id=r.get("rewardPool") or "",
+                )
+                for r in cred_rewards
+            )
+
+    def get_stake(self, cred_hash: str, snapshot: str = "mark") -> Optional[int]:
+        """Return amount staked by credential in the given snapshot ("mark", "set" or "go")."""
+        return self.snapshots[snapshot].stake.get(cred_hash)
+
+    def get_reward_amount(self, cred_hash: str) -> int:
+        """Return total amount of rewards of credential in reward update."""
+        return sum(r.amount for r in self.rewards.get(cred_hash) or ())
+
+    def get_reward_types(self, cred_hash: str) -> List[str]:
+        """Return types of rewards of credential in reward update."""
+        return [r.reward_type for r in self.rewards.get(cred_hash) or ()]
+
+    def get_blocks_before(self, pool_id_dec: str) -> int:
+        """Return number of blocks made by the pool in the previous epoch."""
+        return self.blocks_before.get(pool_id_dec) or 0
+
+    def get_blocks_current(self, pool_id_dec: str) -> int:
+        """Return number of blocks made by the pool in the current epoch."""
+        return self.blocks_current.get(pool_id_dec) or 0
@@ -0,0 +1,122 @@
+"""Matching of multiple regexes against log data in a single pass.
+
+All patterns of a `PatternSet` are combined into one compiled regex that is used to find
+candidate lines in a memory-mapped log file. Only the (few) candidate lines are then matched
+against the individual patterns, to find out IDs of the patterns that hit on each line.
+"""
+import contextlib
+import mmap
+import re
+from pathlib import Path
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Pattern
+from typing import Tuple
+from typing import Union
+
+PatternType = Union[str, Pattern]
+
+
+class LineMatch(NamedTuple):
+    offset: int
+    line: str
+    pattern_ids: List[int]
+
+
+def _get_flags_prefix(flags: int) -> str:
+    return "i" if flags & re.IGNORECASE else ""
+
+
+class PatternSet:
+    """Set of regexes matched together, patterns are identified by their index in the set.
+
+    Patterns can be strings or compiled regexes. Of the regex flags, only `re.IGNORECASE`
+    is honored by the combined regex.
+    """
+
+    def __init__(self, patterns: Iterable[PatternType]) -> None:
+        self.patterns: List[Pattern] = [
+            p if isinstance(p, re.Pattern) else re.compile(p) for p in patterns
+        ]
+
+        alternatives = []
+        for p in self.patterns:
+            scoped_flags = _get_flags_prefix(p.flags)
+            alternatives.append(f"(?{scoped_flags}:{p.pattern})" if scoped_flags else p.pattern)
+        self._any_re: Optional[Pattern] = (
+            # the data are scanned as a whole, so `^` and `$` need to match at line boundaries
+            re.compile(
+                "|".join(f"(?:{a})" for a in alternatives).encode("utf-8"), flags=re.MULTILINE
+            )
+            if alternatives
+            else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def match_line(self, line: str) -> List[int]:
+        """Return IDs of patterns that match the line."""
+        return [i for i, p in enumerate(self.patterns) if p.search(line)]
+
+    def scan(
+        self, data: Union[bytes, mmap.mmap], pos: int = 0, endpos: int = -1
+    ) -> Iterator[LineMatch]:
+        """Find lines in `data[pos:endpos]` that match at least one of the patterns."""
+        if self._any_re is None:
+            return
+        endpos = len(data) if endpos < 0 else endpos
+
+        while pos < endpos:
+            match = self._any_re.search(data, pos, endpos)
+            if not match:
+                return
+            line_start = data.rfind(b"\n", pos, match.start()) + 1 or pos
+            line_end = data.find(b"\n", match.start(), endpos)
+            line_end = endpos if line_end == -1 else line_end
+            line = data[line_start:line_end].decode("utf-8", errors="replace")
+            pattern_ids = self.match_line(line)
+            if pattern_ids:
+                yield LineMatch(offset=line_start, line=line, pattern_ids=pattern_ids)
+            pos = line_end + 1
+
+
+@contextlib.contextmanager
+def _mmap_file(logfile: Path) -> Iterator[Union[bytes, mmap.mmap]]:
+    with open(logfile, "rb") as infile:
+        # empty file can't be memory-mapped
+        if not infile.seek(0, 2):
+            yield b""
+            return
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def scan_file(
+    pattern_set: PatternSet, logfile: Path, offset: int = 0, complete_lines: bool = True
+) -> Tuple[int, List[LineMatch]]:
+    """Find lines matching the patterns in the log file, starting at `offset`.
+
+    Args:
+        pattern_set: A set of patterns to match.
+        logfile: A path to the log file.
+        offset: An offset in the file where to start (optional, 0 by default).
+        complete_lines: Whether to skip incomplete last line, e.g. when the log file is still
+            being written to (optional, True by default).
+
+    Returns:
+        Tuple[int, List[LineMatch]]: An offset where the next scan should start and list
+            of matching lines.
+    """
+    with _mmap_file(logfile) as data:
+        endpos = len(data)
+        if complete_lines:
+            endpos = data.rfind(b"\n", offset) + 1 or offset
+        if endpos <= offset:
+            return offset, []
+        matches = list(pattern_set.scan(data, pos=offset, endpos=endpos))
+
+    return endpos, matches
@@ -2,19 +2,28 @@
 import contextlib
 import fnmatch
 import itertools
+import json
 import logging
 import os
 import re
+import threading
 import time
 from pathlib import Path
+from typing import Dict
 from typing import Iterator
 from typing import List
 from typing import NamedTuple
+from typing import Optional
+from typing import Set
 from typing import Tuple
 
+from filelock import FileLock
+from filelock import Timeout
+
 from cardano_node_tests.utils import cluster_nodes
 from cardano_node_tests.utils import helpers
 from cardano_node_tests.utils import locking
+from cardano_node_tests.utils import log_matcher
 from cardano_node_tests.utils import temptools
 from cardano_node_tests.utils.versions import VERSIONS
 
@@ -48,6 +57,24 @@ if VERSIONS.cluster_era >= VERSIONS.ALONZO:
     ERRORS_IGNORED.append(r"cardano\.node\.Mempool:Info")
 ERRORS_IGNORE_FILE_NAME = ".errors_to_ignore"
 
+ERRORS_PATTERN_SET = log_matcher.PatternSet([ERRORS_RE])
+ERRORS_INDEX_FILE_NAME = ".errors_index"
+# how often the background log tailer updates the errors index
+TAILER_INTERVAL_SEC = 10
+# only the worker holding this lock runs the log tailer of the cluster instance
+TAILER_OWNER_LOCK = "log_tailer_{instance_num}.lock"
+
+# serializes updates of errors index by threads of this process, `FileLockIfXdist`
+# serializes the updates across workers
+_SCAN_LOCK = threading.Lock()
+
+
+class ErrorRecord(NamedTuple):
+    logfile: str  # name of the "live" log file
+    offset: int
+    timestamp: float
+    line: str
+
 
 class RotableLog(NamedTuple):
     logfile: Path
@@ -102,21 +129,18 @@ def _get_ignore_rules(cluster_env: cluster_nodes.ClusterEnv) -> List[Tuple[str,
     return rules
 
 
-def _get_seek(fpath: Path) -> int:
-    with open(fpath, encoding="utf-8") as infile:
-        return int(infile.readline().strip())
+def _get_ignore_set(
+    ignore_rules: List[Tuple[str, str]], regexes: List[str]
+) -> Tuple[log_matcher.PatternSet, List[str]]:
+    """Combine global and file specific ignore rules into a single pattern set.
 
-
-def _get_ignore_regex(
-    ignore_rules: List[Tuple[str, str]], regexes: List[str], logfile: Path
-) -> str:
-    """Combine together regex for the given log file using file specific and global ignore rules."""
-    regex_set = set(regexes)
-    for record in ignore_rules:
-        files_glob, regex = record
-        if fnmatch.filter([logfile.name], files_glob):
-            regex_set.add(regex)
-    return "|".join(regex_set)
+    Returns:
+        Tuple[log_matcher.PatternSet, List[str]]: A pattern set and a list of file globs
+            the patterns apply to, indexed by pattern ID.
+    """
+    rules = sorted({("*", r) for r in regexes}.union(ignore_rules))
+    pattern_set = log_matcher.PatternSet(r[1] for r in rules)
+    return pattern_set, [r[0] for r in rules]
 
 
 def add_ignore_rule(files_glob: str, regex: str, ignore_file_id: str) -> None:
@@ -157,78 +181,272 @@ def expect_errors(regex_pairs: List[Tuple[str, str]], ignore_file_id: str) -> It
 
     yield
 
-    errors = []
-    for files_glob, regex in regex_pairs:
-        regex_comp = re.compile(regex)
-        # get list of records (file names and offsets) for given glob
-        matching_files = fnmatch.filter(seek_offsets, f"{state_dir}/{files_glob}")
-        for logfile in matching_files:
-            # skip if the log file is rotated log, it will be handled by `_get_rotated_logs`
-            if ROTATED_RE.match(logfile):
-                continue
+    # scan each log file just once for all the regexes that apply to it
+    pattern_set = log_matcher.PatternSet(r for __, r in regex_pairs)
+    errors: List[str] = []
+    for logfile, seek in seek_offsets.items():
+        # skip if the log file is rotated log, it will be handled by `_get_rotated_logs`
+        if ROTATED_RE.match(logfile):
+            continue
+
+        expected_ids = {
+            i
+            for i, (files_glob, __) in enumerate(regex_pairs)
+            if fnmatch.fnmatch(logfile, f"{state_dir}/{files_glob}")
+        }
+        found_ids: Set[int] = set()
+        for logfile_rec in _get_rotated_logs(logfile=Path(logfile), seek=seek, timestamp=timestamp):
+            __, matches = log_matcher.scan_file(
+                pattern_set=pattern_set,
+                logfile=logfile_rec.logfile,
+                offset=logfile_rec.seek,
+                complete_lines=False,
+            )
+            found_ids.update(itertools.chain.from_iterable(m.pattern_ids for m in matches))
+            if expected_ids.issubset(found_ids):
+                break
 
-            # search for the expected error
-            seek = seek_offsets.get(logfile) or 0
-            line_found = False
-            for logfile_rec in _get_rotated_logs(
-                logfile=Path(logfile), seek=seek, timestamp=timestamp
-            ):
-                with open(logfile_rec.logfile, encoding="utf-8") as infile:
-                    infile.seek(seek)
-                    for line in infile:
-                        if regex_comp.search(line):
-                            line_found = True
-                            break
-                if line_found:
-                    break
-            else:
-                errors.append(f"No line matching `{regex}` found in '{logfile}'.")
+        errors.extend(
+            f"No line matching `{regex_pairs[i][1]}` found in '{logfile}'."
+            for i in sorted(expected_ids - found_ids)
+        )
 
     if errors:
         errors_joined = "\n".join(errors)
         raise AssertionError(errors_joined) from None
 
 
+def _scan_logfile(
+    logfile: Path, offset: int, name: str, final: bool = False
+) -> Tuple[int, List[ErrorRecord]]:
+    """Search for error lines in data appended to the log file since `offset`.
+
+    Incomplete last line is left for the next scan, unless the log file is `final` (rotated).
+
+    Returns:
+        Tuple[int, List[ErrorRecord]]: An offset where the next scan should start and records
+            of found error lines.
+    """
+    timestamp = time.time()
+    offset, matches = log_matcher.scan_file(
+        pattern_set=ERRORS_PATTERN_SET, logfile=logfile, offset=offset, complete_lines=not final
+    )
+    records = [
+        ErrorRecord(logfile=name, offset=m.offset, timestamp=timestamp, line=m.line)
+        for m in matches
+    ]
+    return offset, records
+
+
+def _get_unscanned_rotated(logfile: Path, file_status: dict) -> List[Tuple[Path, int]]:
+    """Return rotated versions of the log file that were not fully scanned yet, oldest first.
+
+    The log file can be rotated more than once between two scans. The rotated file with
+    the recorded inode is scanned from the recorded offset, all newer rotated files are scanned
+    whole.
+
+    Returns:
+        List[Tuple[Path, int]]: Rotated log files and offsets where their scans should start.
+    """
+    rotated = sorted(
+        (f for f in logfile.parent.glob(f"{logfile.name}.*") if ROTATED_RE.match(f.name)),
+        key=os.path.getmtime,
+    )
+    for i, fpath in enumerate(rotated):
+        if fpath.stat().st_ino == file_status["inode"]:
+            return [(fpath, file_status["offset"]), *((f, 0) for f in rotated[i + 1 :])]
+
+    # the partially scanned file is gone, scan all rotated files modified since the last scan
+    rotated_logs = _get_rotated_logs(logfile=logfile, timestamp=file_status.get("timestamp", 0.0))
+    return [(r.logfile, 0) for r in reversed(rotated_logs) if ROTATED_RE.match(r.logfile.name)]
+
+
+class _ErrorsIndex:
+    """Incrementally updated index of error lines found in log files of a cluster instance.
+
+    The index records are stored in a JSON lines file. A status file keeps offsets up to which
+    the log files were already scanned, and an offset of the first index record that was not
+    yet reported.
+    """
+
+    def __init__(self, state_dir: Path) -> None:
+        self.state_dir = state_dir
+        self.index_file = state_dir / f"{ERRORS_INDEX_FILE_NAME}.jsonl"
+        self.status_file = state_dir / f"{ERRORS_INDEX_FILE_NAME}.json"
+
+    def _load_status(self) -> dict:
+        try:
+            with open(self.status_file, encoding="utf-8") as infile:
+                status: dict = json.load(infile)
+        except (FileNotFoundError, ValueError):
+            status = {"files": {}, "reported": 0}
+        return status
+
+    def _save_status(self, status: dict) -> None:
+        tmp_file = self.status_file.with_name(f"{self.status_file.name}.tmp")
+        with open(tmp_file, "w", encoding="utf-8") as outfile:
+            json.dump(status, outfile)
+        os.replace(tmp_file, self.status_file)
+
+    def update(self, status: Optional[dict] = None) -> dict:
+        """Scan data appended to the log files since the last update, store found errors."""
+        status = status or self._load_status()
+        files_status: Dict[str, dict] = status["files"]
+
+        scan_start = time.time()
+        new_records: List[ErrorRecord] = []
+        for logfile in self.state_dir.glob("*.std*"):
+            # skip rotated logs, they are handled together with the "live" log file
+            if ROTATED_RE.match(logfile.name):
+                continue
+
+            stat = logfile.stat()
+            file_status = files_status.get(logfile.name) or {"inode": stat.st_ino, "offset": 0}
+            if file_status["inode"] != stat.st_ino:
+                # the log file was rotated, finish scanning of the rotated versions first
+                for rotated, offset in _get_unscanned_rotated(
+                    logfile=logfile, file_status=file_status
+                ):
+                    __, records = _scan_logfile(
+                        logfile=rotated, offset=offset, name=logfile.name, final=True
+                    )
+                    new_records.extend(records)
+                file_status = {"inode": stat.st_ino, "offset": 0}
+            elif stat.st_size < file_status["offset"]:
+                # the log file was truncated
+                file_status["offset"] = 0
+
+            file_status["offset"], records = _scan_logfile(
+                logfile=logfile, offset=file_status["offset"], name=logfile.name
+            )
+            new_records.extend(records)
+            file_status["timestamp"] = scan_start
+            files_status[logfile.name] = file_status
+
+        if new_records:
+            with open(self.index_file, "a", encoding="utf-8") as outfile:
+                outfile.writelines(f"{json.dumps(r)}\n" for r in new_records)
+        self._save_status(status)
+
+        return status
+
+    def get_unreported(self) -> List[ErrorRecord]:
+        """Update the index and return errors that were not reported yet."""
+        status = self.update()
+        if not self.index_file.exists():
+            return []
+
+        with open(self.index_file, encoding="utf-8") as infile:
+            infile.seek(status["reported"])
+            records = [ErrorRecord(*json.loads(line)) for line in infile]
+            status["reported"] = infile.tell()
+        self._save_status(status)
+
+        return records
+
+
+class _LogTailer(threading.Thread):
+    """Background thread that keeps the errors index of a cluster instance up to date.
+
+    Each worker starts a tailer for the cluster instance it is using, but only the tailer holding
+    the owner lock updates the index, the others are parked until the owner stops. The tailer
+    never waits for the search lock, it skips the round when the lock is busy.
+    """
+
+    def __init__(self, state_dir: Path, lock_file: Path, owner_lock_file: Path) -> None:
+        super().__init__(name=f"log_tailer_{state_dir.name}", daemon=True)
+        self.state_dir = state_dir
+        self.lock_file = lock_file
+        self.owner_lock = FileLock(owner_lock_file)
+        self._stop_event = threading.Event()
+
+    def _update_index(self, errors_index: _ErrorsIndex) -> None:
+        if not _SCAN_LOCK.acquire(blocking=False):
+            return
+        try:
+            with FileLock(self.lock_file).acquire(timeout=0):
+                errors_index.update()
+        except Timeout:
+            pass
+        finally:
+            _SCAN_LOCK.release()
+
+    def run(self) -> None:
+        errors_index = _ErrorsIndex(state_dir=self.state_dir)
+        try:
+            while not self._stop_event.wait(TAILER_INTERVAL_SEC):
+                if not self.owner_lock.is_locked:
+                    try:
+                        self.owner_lock.acquire(timeout=0)
+                    except Timeout:
+                        continue
+                # the state dir is recreated when the cluster instance is restarted
+                if not self.state_dir.exists():
+                    continue
+                try:
+                    self._update_index(errors_index)
+                except Exception as exc:
+                    LOGGER.debug(f"Failed to update errors index in '{self.state_dir}': {exc}")
+        finally:
+            if self.owner_lock.is_locked:
+                self.owner_lock.release()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+class _TailerCache:
+    """Log tailer of this worker, for the cluster instance the worker is using."""
+
+    instance_num: int = -1
+    tailer: Optional[_LogTailer] = None
+
+
+def _start_log_tailer(cluster_env: cluster_nodes.ClusterEnv, lock_file: Path) -> None:
+    """Start the background log tailer for the cluster instance, stop the previous one."""
+    if _TailerCache.instance_num == cluster_env.instance_num:
+        return
+    if _TailerCache.tailer is not None:
+        _TailerCache.tailer.stop()
+
+    owner_lock_file = temptools.get_basetemp() / TAILER_OWNER_LOCK.format(
+        instance_num=cluster_env.instance_num
+    )
+    tailer = _LogTailer(
+        state_dir=cluster_env.state_dir, lock_file=lock_file, owner_lock_file=owner_lock_file
+    )
+    _TailerCache.instance_num = cluster_env.instance_num
+    _TailerCache.tailer = tailer
+    tailer.start()
+
+
 def search_cluster_artifacts() -> List[Tuple[Path, str]]:
-    """Search cluster artifacts for errors."""
+    """Search cluster artifacts for errors.
+
+    Log files are scanned incrementally and found error lines are stored in an index.
+    Errors that were not reported yet are returned, unless they match the ignore rules.
+    """
     cluster_env = cluster_nodes.get_cluster_env()
     lock_file = temptools.get_basetemp() / f"search_artifacts_{cluster_env.instance_num}.lock"
+    _start_log_tailer(cluster_env=cluster_env, lock_file=lock_file)
 
-    with locking.FileLockIfXdist(lock_file):
-        ignore_rules = _get_ignore_rules(cluster_env=cluster_env)
+    with _SCAN_LOCK, locking.FileLockIfXdist(lock_file):
+        records = _ErrorsIndex(state_dir=cluster_env.state_dir).get_unreported()
 
-        errors = []
-        for logfile in cluster_env.state_dir.glob("*.std*"):
-            # skip if the log file is status file or rotated log
-            if logfile.name.endswith(".offset") or ROTATED_RE.match(logfile.name):
-                continue
+    if not records:
+        return []
 
-            # read seek offset (from where to start searching) and timestamp of last search
-            offset_file = logfile.parent / f".{logfile.name}.offset"
-            if offset_file.exists():
-                seek = _get_seek(offset_file)
-                timestamp = os.path.getmtime(offset_file)
-            else:
-                seek = 0
-                timestamp = 0.0
-
-            errors_ignored = _get_ignore_regex(
-                ignore_rules=ignore_rules, regexes=ERRORS_IGNORED, logfile=logfile
-            )
-            errors_ignored_re = re.compile(errors_ignored)
-
-            # record offset for the "live" log file
-            with open(offset_file, "w", encoding="utf-8") as outfile:
-                outfile.write(str(helpers.get_eof_offset(logfile)))
-
-            for logfile_rec in _get_rotated_logs(logfile=logfile, seek=seek, timestamp=timestamp):
-                with open(logfile_rec.logfile, encoding="utf-8") as infile:
-                    infile.seek(seek)
-                    for line in infile:
-                        if ERRORS_RE.search(line) and not (
-                            errors_ignored and errors_ignored_re.search(line)
-                        ):
-                            errors.append((logfile, line))
+    ignore_set, ignore_globs = _get_ignore_set(
+        ignore_rules=_get_ignore_rules(cluster_env=cluster_env), regexes=ERRORS_IGNORED
+    )
+    errors = []
+    for record in records:
+        if any(
+            fnmatch.fnmatch(record.logfile, ignore_globs[i])
+            for i in ignore_set.match_line(record.line)
+        ):
+            continue
+        errors.append((cluster_env.state_dir / record.logfile, record.line))
 
     return errors
 
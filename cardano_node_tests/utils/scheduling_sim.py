@@ -0,0 +1,428 @@
+"""Offline simulator of scheduling of tests on cluster instances.
+
+Tests recorded in scheduling events log (see `SCHEDULING_EVENTS_LOG`) are replayed against the
+decision logic of `cluster_management._ClusterGetter`, using recorded (or synthetic) durations
+instead of running the tests and restarting clusters. This makes it possible to compare
+scheduling policies, like number of cluster instances, grouping of tests by marks or sets of
+resources, and predict total wall-clock time without booting any clusters.
+
+Tests are replayed with their recorded durations. Predicted utilization of cluster instances can
+be compared with the recorded (actual) utilization, e.g. to see the effect of co-locating tests
+that wait for epoch boundaries (see `epoch_batching`).
+"""
+import collections
+import dataclasses
+import heapq
+import json
+import logging
+import tempfile
+from pathlib import Path
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from cardano_node_tests.utils import cluster_management
+from cardano_node_tests.utils import epoch_batching
+from cardano_node_tests.utils import helpers
+from cardano_node_tests.utils import scheduling_state
+from cardano_node_tests.utils import wakeup
+from cardano_node_tests.utils.scheduling_state import StatusKinds
+from cardano_node_tests.utils.types import FileType
+
+LOGGER = logging.getLogger(__name__)
+
+DEFAULT_RESTART_DURATION = 120.0
+MAX_STEPS = 10_000_000
+
+
+@dataclasses.dataclass
+class SimTest:
+    """Single test recorded in scheduling events log."""
+
+    test: str
+    mark: str
+    lock_resources: List[str]
+    use_resources: List[str]
+    cleanup: bool
+    start_cmd: str
+    duration: float
+    epoch_profile: epoch_batching.EpochProfile = epoch_batching.EpochProfile()
+
+
+@dataclasses.dataclass
+class SimSession:
+    """Recorded testing session."""
+
+    tests: List[SimTest]
+    restart_durations: List[float]
+    num_workers: int
+    num_instances: int
+    wall_clock: float
+    instance_busy: Dict[int, float] = dataclasses.field(default_factory=dict)
+
+    @property
+    def utilization(self) -> Dict[int, float]:
+        """Return recorded fraction of wall-clock time when tests were running on each instance."""
+        if not self.wall_clock:
+            return {i: 0.0 for i in self.instance_busy}
+        return {i: b / self.wall_clock for i, b in self.instance_busy.items()}
+
+
+@dataclasses.dataclass
+class SimPolicy:
+    """Scheduling policy to simulate."""
+
+    num_instances: int
+    num_workers: int
+    restart_duration: float = DEFAULT_RESTART_DURATION
+    drop_marks: bool = False
+    drop_epoch_profiles: bool = False
+    drop_resources: Set[str] = dataclasses.field(default_factory=set)
+
+
+@dataclasses.dataclass
+class SimResult:
+    """Result of a simulation run."""
+
+    policy: SimPolicy
+    wall_clock: float = 0.0
+    restarts: int = 0
+    wait_times: Dict[str, float] = dataclasses.field(default_factory=dict)
+    instance_busy: Dict[int, float] = dataclasses.field(default_factory=dict)
+    instance_restarting: Dict[int, float] = dataclasses.field(default_factory=dict)
+
+    @property
+    def utilization(self) -> Dict[int, float]:
+        """Return fraction of wall-clock time when tests were running on each instance."""
+        if not self.wall_clock:
+            return {i: 0.0 for i in self.instance_busy}
+        return {i: b / self.wall_clock for i, b in self.instance_busy.items()}
+
+
+def load_session(events_file: FileType) -> SimSession:
+    """Load recorded tests from scheduling events log."""
+    tests: List[SimTest] = []
+    restart_durations: List[float] = []
+    started: Dict[str, dict] = {}
+    busy: Dict[int, List[Tuple[float, float]]] = collections.defaultdict(list)
+    workers: Set[str] = set()
+    instances: Set[int] = set()
+    first_ts = last_ts = 0.0
+
+    with open(events_file, encoding="utf-8") as in_fp:
+        for line in in_fp:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            first_ts = first_ts or record["ts"]
+            last_ts = record["ts"]
+            event = record["event"]
+            worker = record["worker"]
+
+            if event == "restart" and record.get("success"):
+                restart_durations.append(record["duration"])
+            elif event == "test_start":
+                started[worker] = record
+                workers.add(worker)
+                instances.add(record["instance"])
+            elif event == "test_stop" and worker in started:
+                start_record = started.pop(worker)
+                busy[start_record["instance"]].append((start_record["ts"], record["ts"]))
+                tests.append(
+                    SimTest(
+                        test=start_record["test"],
+                        mark=start_record["mark"],
+                        lock_resources=start_record["lock_resources"],
+                        use_resources=start_record["use_resources"],
+                        cleanup=start_record["cleanup"],
+                        start_cmd=start_record["start_cmd"],
+                        duration=record["ts"] - start_record["ts"],
+                        # not present in logs recorded by older versions
+                        epoch_profile=epoch_batching.EpochProfile(
+                            **start_record.get("epoch_profile", {})
+                        ),
+                    )
+                )
+
+    return SimSession(
+        tests=tests,
+        restart_durations=restart_durations,
+        num_workers=len(workers),
+        num_instances=len(instances),
+        wall_clock=last_ts - first_ts,
+        instance_busy={i: _merged_duration(b) for i, b in busy.items()},
+    )
+
+
+class _SimWakeup(wakeup.WakeupChannel):
+    """Wakeup notifications delivered by the simulator."""
+
+    def __init__(self, simulator: "Simulator", worker_id: str) -> None:
+        # pylint: disable=super-init-not-called
+        self.simulator = simulator
+        self.worker_id = worker_id
+        self.enabled = False
+
+    def notify_all(self) -> None:
+        self.simulator.notify_all()
+
+
+class _SimClusterManager(cluster_management.ClusterManager):
+    """Cluster manager that doesn't manage any real cluster instances."""
+
+    def __init__(  # pylint: disable=super-init-not-called
+        self,
+        simulator: "Simulator",
+        worker_id: str,
+        sim_dir: Path,
+        sched_state: scheduling_state.SchedulingState,
+    ) -> None:
+        self.simulator = simulator
+        self.cluster_obj = None
+        self.worker_id = worker_id
+        self.pytest_tmp_dir = sim_dir
+        self.is_xdist = True
+        self.num_of_instances = simulator.policy.num_instances
+        self.cluster_lock = f"{sim_dir}/{cluster_management.CLUSTER_LOCK}"
+        self.log_lock = f"{sim_dir}/{cluster_management.LOG_LOCK}"
+        self.sched_state = sched_state
+        self.wakeup = _SimWakeup(simulator=simulator, worker_id=worker_id)
+        self._cluster_instance_num = -1
+
+    def _log(self, msg: str) -> None:
+        pass
+
+    def _log_event(self, event: str, **data: object) -> None:
+        pass
+
+
+class _SimClusterGetter(cluster_management._ClusterGetter):
+    """Cluster getter with simulated cluster instances."""
+
+    def _now(self) -> float:
+        assert isinstance(self.cm, _SimClusterManager)
+        return self.cm.simulator.now
+
+    def _is_healthy(self, instance_num: int) -> bool:
+        return True
+
+
+@dataclasses.dataclass
+class _SimWorker:
+    worker_id: str
+    getter: _SimClusterGetter
+    state: str = "idle"
+    version: int = 0
+    test: Optional[SimTest] = None
+    cget_status: Optional[cluster_management.ClusterGetStatus] = None
+    marked_tests_cache: Dict[int, cluster_management.MarkedTestsStatus] = dataclasses.field(
+        default_factory=dict
+    )
+    wait_start: float = 0.0
+    busy_start: float = 0.0
+
+
+class Simulator:
+    """Discrete-event simulation of pytest workers sharing cluster instances.
+
+    Simulated time advances only when a worker waits, runs a test, or restarts a cluster
+    instance. All scheduling decisions are made by `_ClusterGetter` on a temporary
+    scheduling state.
+    """
+
+    def __init__(self, tests: List[SimTest], policy: SimPolicy) -> None:
+        self.tests = tests
+        self.policy = policy
+        self.now = 0.0
+        self.result = SimResult(policy=policy)
+        self._queue: Deque[SimTest] = collections.deque()
+        self._events: List[Tuple[float, int, int, int]] = []
+        self._seq = 0
+        self._workers: List[_SimWorker] = []
+        self._busy: Dict[int, List[Tuple[float, float]]] = collections.defaultdict(list)
+
+    def _apply_policy(self, test: SimTest) -> SimTest:
+        mark = test.mark
+        # custom start command can be used only together with mark or singleton
+        if self.policy.drop_marks and not test.start_cmd:
+            mark = ""
+        return dataclasses.replace(
+            test,
+            mark=mark,
+            epoch_profile=(
+                epoch_batching.EpochProfile()
+                if self.policy.drop_epoch_profiles
+                else test.epoch_profile
+            ),
+            lock_resources=[r for r in test.lock_resources if r not in self.policy.drop_resources],
+            use_resources=[r for r in test.use_resources if r not in self.policy.drop_resources],
+        )
+
+    def _schedule(self, worker_idx: int, at: float) -> None:
+        worker = self._workers[worker_idx]
+        worker.version += 1
+        self._seq += 1
+        heapq.heappush(self._events, (at, self._seq, worker_idx, worker.version))
+
+    def notify_all(self) -> None:
+        """Wake up all waiting workers."""
+        for idx, worker in enumerate(self._workers):
+            if worker.state != "waiting" or worker.cget_status is None:
+                continue
+            worker.cget_status.notified = True
+            self._schedule(worker_idx=idx, at=self.now)
+
+    def _record_wait(self, worker: _SimWorker) -> None:
+        cget_status = worker.cget_status
+        assert cget_status is not None
+        reason = cget_status.wait_reason or cluster_management.WaitReasons.UNKNOWN
+        self.result.wait_times[reason] = (
+            self.result.wait_times.get(reason, 0.0) + self.now - worker.wait_start
+        )
+
+    def _try_start(self, worker_idx: int) -> None:
+        worker = self._workers[worker_idx]
+        cget_status = worker.cget_status
+        assert cget_status is not None and worker.test is not None
+        getter = worker.getter
+
+        cget_status.first_iteration = False
+        getter.cm._cluster_instance_num = -1
+        if getter._select_instance(
+            cget_status=cget_status, marked_tests_cache=worker.marked_tests_cache
+        ):
+            getter._create_test_status_records(cget_status)
+            worker.state = "running"
+            worker.busy_start = self.now
+            self._schedule(worker_idx=worker_idx, at=self.now + worker.test.duration)
+        elif cget_status.restart_ready:
+            worker.state = "restarting"
+            worker.busy_start = self.now
+            self.result.restarts += 1
+            self._schedule(worker_idx=worker_idx, at=self.now + self.policy.restart_duration)
+        else:
+            worker.state = "waiting"
+            worker.wait_start = self.now
+            cget_status.notified = False
+            self._schedule(worker_idx=worker_idx, at=self.now + cget_status.sleep_delay)
+
+    def _start_next_test(self, worker_idx: int) -> None:
+        worker = self._workers[worker_idx]
+        if not self._queue:
+            worker.state = "finished"
+            return
+
+        test = self._queue.popleft()
+        # the same adjustments as in `ClusterManager.get`
+        use_resources = set(test.use_resources) | {cluster_management.Resources.CLUSTER}
+        worker.test = test
+        worker.marked_tests_cache = {}
+        worker.cget_status = cluster_management.ClusterGetStatus(
+            mark=test.mark,
+            lock_resources=test.lock_resources,
+            use_resources=list(use_resources - set(test.lock_resources)),
+            cleanup=test.cleanup or bool(test.start_cmd),
+            start_cmd=test.start_cmd,
+            current_test=test.test,
+            epoch_profile=test.epoch_profile,
+        )
+        self._try_start(worker_idx)
+
+    def _step(self, worker_idx: int) -> None:
+        worker = self._workers[worker_idx]
+        cget_status = worker.cget_status
+        sched_state = worker.getter.cm.sched_state
+
+        if worker.state == "running":
+            assert cget_status is not None
+            instance_num = cget_status.instance_num
+            self._busy[instance_num].append((worker.busy_start, self.now))
+            # the same actions as in `ClusterManager.on_test_stop`
+            sched_state.release_resources(instance_num=instance_num, worker_id=worker.worker_id)
+            sched_state.remove(
+                instance_num=instance_num, kind=StatusKinds.EPOCH_WAIT, worker_id=worker.worker_id
+            )
+            sched_state.remove(
+                instance_num=instance_num, kind=StatusKinds.TEST_RUNNING, worker_id=worker.worker_id
+            )
+            worker.state = "idle"
+            self.notify_all()
+            self._start_next_test(worker_idx)
+        elif worker.state == "restarting":
+            assert cget_status is not None
+            instance_num = cget_status.instance_num
+            self.result.instance_restarting[instance_num] = (
+                self.result.instance_restarting.get(instance_num, 0.0)
+                + self.now
+                - worker.busy_start
+            )
+            helpers.touch(cget_status.instance_dir / cluster_management.CLUSTER_RUNNING_FILE)
+            self._try_start(worker_idx)
+        elif worker.state == "waiting":
+            self._record_wait(worker)
+            self._try_start(worker_idx)
+        elif worker.state == "idle":
+            self._start_next_test(worker_idx)
+
+    def run(self) -> SimResult:
+        """Run the simulation."""
+        self._queue = collections.deque(self._apply_policy(t) for t in self.tests)
+
+        with tempfile.TemporaryDirectory(prefix="scheduling_sim_") as tmp_dir:
+            sim_dir = Path(tmp_dir)
+            sched_state = scheduling_state.SQLiteState(pytest_tmp_dir=sim_dir)
+
+            for num in range(self.policy.num_workers):
+                worker_id = f"gw{num}"
+                cluster_manager = _SimClusterManager(
+                    simulator=self, worker_id=worker_id, sim_dir=sim_dir, sched_state=sched_state
+                )
+                self._workers.append(
+                    _SimWorker(worker_id=worker_id, getter=_SimClusterGetter(cluster_manager))
+                )
+            for idx in range(len(self._workers)):
+                self._schedule(worker_idx=idx, at=0.0)
+
+            steps = 0
+            while self._events:
+                at, __, worker_idx, version = heapq.heappop(self._events)
+                # the event was superseded by a newer one
+                if version != self._workers[worker_idx].version:
+                    continue
+                self.now = at
+                self._step(worker_idx)
+
+                steps += 1
+                if steps > MAX_STEPS:
+                    raise RuntimeError("The simulation doesn't converge, no test can start.")
+
+            scheduling_state.SQLiteState._conns.pop(sched_state.db_file).close()
+
+        self.result.wall_clock = self.now
+        self.result.instance_busy = {
+            i: _merged_duration(self._busy.get(i, [])) for i in range(self.policy.num_instances)
+        }
+        return self.result
+
+
+def _merged_duration(intervals: List[Tuple[float, float]]) -> float:
+    """Return total duration covered by (possibly overlapping) intervals."""
+    total = 0.0
+    cur_start = cur_end = -1.0
+    for start, end in sorted(intervals):
+        if start > cur_end:
+            total += cur_end - cur_start
+            cur_start, cur_end = start, end
+        else:
+            cur_end = max(cur_end, end)
+    total += cur_end - cur_start
+    return total
+
+
+def simulate(session: SimSession, policy: SimPolicy) -> SimResult:
+    """Replay recorded session using the given scheduling policy."""
+    return Simulator(tests=session.tests, policy=policy).run()
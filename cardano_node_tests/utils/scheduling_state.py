@@ -0,0 +1,425 @@
+"""Shared scheduling state of cluster instances.
+
+The state is used by `cluster_management` for deciding where (and if) a test can run. It records
+which tests are running on which cluster instance, what resources are locked or in use, what
+marks are active and whether a cluster instance needs to be restarted.
+
+There are two backends available:
+
+* `SQLiteState` (default) - single SQLite database in WAL mode with indexed table
+* `FilesState` - status files in cluster instance directories (the original layout)
+
+The backend is selected by the `SCHEDULING_STATE_BACKEND` env variable ("sqlite" or "files").
+
+The state is not guarding consistency on its own. All the "check and modify" sequences still
+need to happen under the global cluster lock.
+"""
+import abc
+import contextlib
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Type
+
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils import helpers
+
+LOGGER = logging.getLogger(__name__)
+
+CLUSTER_DIR_TEMPLATE = "cluster"
+SQLITE_DB_FILE = ".scheduling_state.db"
+
+
+class StatusKinds:
+    """Kinds of status records.
+
+    The values are also used as prefixes of status files by the `FilesState` backend.
+    """
+
+    RESOURCE_LOCKED = ".resource_locked"
+    RESOURCE_IN_USE = ".resource_in_use"
+    RESTART_NEEDED = ".needs_restart"
+    RESTART_IN_PROGRESS = ".restart_in_progress"
+    RESTART_AFTER_MARK = ".restart_after_mark"
+    TEST_RUNNING = ".test_running"
+    TEST_CURR_MARK = ".curr_test_mark"
+    TEST_MARK_STARTING = ".starting_marked_tests"
+    STANDBY_STATE = ".standby_state"
+    STANDBY_POOL = ".standby_pool"
+    EPOCH_WAIT = ".epoch_wait"
+
+    # kinds of records that are further qualified by a name (resource name, mark, standby state,
+    # epoch profile)
+    NAMED = frozenset(
+        (
+            RESOURCE_LOCKED,
+            RESOURCE_IN_USE,
+            TEST_CURR_MARK,
+            TEST_MARK_STARTING,
+            STANDBY_STATE,
+            EPOCH_WAIT,
+        )
+    )
+
+
+class StandbyStates:
+    """States of standby cluster instances.
+
+    Cluster instance with a `STANDBY_STATE` record is not used for running tests.
+    """
+
+    PENDING = "pending"
+    BOOTING = "booting"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class StatusRecord(NamedTuple):
+    instance_num: int
+    kind: str
+    name: str
+    worker_id: str
+
+
+class SchedulingState(abc.ABC):
+    """Generic scheduling state backend.
+
+    Backends implement the `add`, `remove` and `query` primitives. Higher level operations are
+    built on top of them.
+    """
+
+    def __init__(self, pytest_tmp_dir: Path) -> None:
+        self.pytest_tmp_dir = pytest_tmp_dir
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several operations together - context manager."""
+        yield
+
+    @abc.abstractmethod
+    def add(self, instance_num: int, kind: str, worker_id: str, name: str = "") -> None:
+        """Add status record."""
+
+    @abc.abstractmethod
+    def remove(
+        self,
+        instance_num: int,
+        kind: str,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> int:
+        """Remove matching status records, return number of removed records."""
+
+    @abc.abstractmethod
+    def query(
+        self,
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[StatusRecord]:
+        """Return matching status records.
+
+        When `instance_num` is not specified, search all cluster instances.
+        """
+
+    def exists(
+        self,
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> bool:
+        """Check if there's any matching status record."""
+        return bool(
+            self.query(kind=kind, instance_num=instance_num, worker_id=worker_id, name=name)
+        )
+
+    def acquire_resources(
+        self, instance_num: int, worker_id: str, lock: List[str], use: List[str]
+    ) -> None:
+        """Mark resources as locked or in use by the worker."""
+        for res in use:
+            self.add(
+                instance_num=instance_num,
+                kind=StatusKinds.RESOURCE_IN_USE,
+                worker_id=worker_id,
+                name=res,
+            )
+        for res in lock:
+            self.add(
+                instance_num=instance_num,
+                kind=StatusKinds.RESOURCE_LOCKED,
+                worker_id=worker_id,
+                name=res,
+            )
+
+    def release_resources(self, instance_num: int, worker_id: str) -> None:
+        """Release all resources locked or used by the worker."""
+        self.remove(
+            instance_num=instance_num, kind=StatusKinds.RESOURCE_LOCKED, worker_id=worker_id
+        )
+        self.remove(
+            instance_num=instance_num, kind=StatusKinds.RESOURCE_IN_USE, worker_id=worker_id
+        )
+
+    def set_mark(self, instance_num: int, mark: str, worker_id: str) -> None:
+        """Set the mark as currently running mark on the cluster instance."""
+        self.add(
+            instance_num=instance_num,
+            kind=StatusKinds.TEST_CURR_MARK,
+            worker_id=worker_id,
+            name=mark,
+        )
+        self.remove(instance_num=instance_num, kind=StatusKinds.TEST_MARK_STARTING)
+
+    def set_needs_restart(self, instance_num: int, worker_id: str) -> None:
+        """Indicate that the cluster instance needs restart."""
+        self.add(instance_num=instance_num, kind=StatusKinds.RESTART_NEEDED, worker_id=worker_id)
+
+    def set_restart_in_progress(self, instance_num: int, worker_id: str) -> None:
+        """Indicate that the cluster instance is being restarted by the worker."""
+        self.add(
+            instance_num=instance_num, kind=StatusKinds.RESTART_IN_PROGRESS, worker_id=worker_id
+        )
+
+    def finish_restart(self, instance_num: int) -> None:
+        """Remove status records that are no longer valid after restart."""
+        self.remove(instance_num=instance_num, kind=StatusKinds.RESTART_IN_PROGRESS)
+        self.remove(instance_num=instance_num, kind=StatusKinds.RESTART_NEEDED)
+
+    def set_standby_state(self, instance_num: int, state: str, worker_id: str) -> None:
+        """Set state of the standby cluster instance."""
+        self.remove(instance_num=instance_num, kind=StatusKinds.STANDBY_STATE)
+        self.add(
+            instance_num=instance_num,
+            kind=StatusKinds.STANDBY_STATE,
+            worker_id=worker_id,
+            name=state,
+        )
+
+
+class FilesState(SchedulingState):
+    """Status files in cluster instance directories.
+
+    Status file names are `{kind}_{worker_id}`, or `{kind}_{name}_{worker_id}` for named kinds.
+    """
+
+    def _instance_dir(self, instance_num: int) -> Path:
+        return self.pytest_tmp_dir / f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+
+    def _sfile(self, instance_num: int, kind: str, worker_id: str, name: str = "") -> Path:
+        name_part = f"_{name}" if kind in StatusKinds.NAMED else ""
+        return self._instance_dir(instance_num) / f"{kind}{name_part}_{worker_id}"
+
+    @staticmethod
+    def _parse_sfile(sfile: Path, kind: str) -> Optional[StatusRecord]:
+        try:
+            instance_num = int(sfile.parent.name.replace(CLUSTER_DIR_TEMPLATE, ""))
+        except ValueError:
+            return None
+
+        # worker ids (e.g. "gw0") don't contain underscores, names (e.g. marks) can
+        rest = sfile.name[len(kind) + 1 :]
+        if kind in StatusKinds.NAMED:
+            name, __, worker_id = rest.rpartition("_")
+        else:
+            name, worker_id = "", rest
+
+        return StatusRecord(instance_num=instance_num, kind=kind, name=name, worker_id=worker_id)
+
+    def add(self, instance_num: int, kind: str, worker_id: str, name: str = "") -> None:
+        """Add status record."""
+        helpers.touch(
+            self._sfile(instance_num=instance_num, kind=kind, worker_id=worker_id, name=name)
+        )
+
+    def remove(
+        self,
+        instance_num: int,
+        kind: str,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> int:
+        """Remove matching status records, return number of removed records."""
+        records = self.query(kind=kind, instance_num=instance_num, worker_id=worker_id, name=name)
+        for r in records:
+            self._sfile(
+                instance_num=r.instance_num, kind=r.kind, worker_id=r.worker_id, name=r.name
+            ).unlink(missing_ok=True)
+        return len(records)
+
+    def query(
+        self,
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[StatusRecord]:
+        """Return matching status records.
+
+        When `instance_num` is not specified, search all cluster instances.
+        """
+        instance_glob = (
+            f"{CLUSTER_DIR_TEMPLATE}*"
+            if instance_num is None
+            else f"{CLUSTER_DIR_TEMPLATE}{instance_num}"
+        )
+        name_glob = f"_{name or '*'}" if kind in StatusKinds.NAMED else ""
+        sfiles = self.pytest_tmp_dir.glob(f"{instance_glob}/{kind}{name_glob}_{worker_id or '*'}")
+
+        records = []
+        for sf in sfiles:
+            record = self._parse_sfile(sfile=sf, kind=kind)
+            # the glob can match also records with names that only start with the given name
+            if record is None or (name is not None and record.name != name):
+                continue
+            records.append(record)
+
+        return records
+
+
+class SQLiteState(SchedulingState):
+    """Single SQLite database shared by all pytest workers."""
+
+    _conns: Dict[Path, sqlite3.Connection] = {}
+
+    def __init__(self, pytest_tmp_dir: Path) -> None:
+        super().__init__(pytest_tmp_dir=pytest_tmp_dir)
+        self.db_file = pytest_tmp_dir / SQLITE_DB_FILE
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Return connection to the database, shared by all instances in the worker."""
+        conn = self._conns.get(self.db_file)
+        if conn is None:
+            conn = self._connect(self.db_file)
+            self._conns[self.db_file] = conn
+        return conn
+
+    @staticmethod
+    def _connect(db_file: Path) -> sqlite3.Connection:
+        # autocommit mode, transactions are started explicitly in `transaction`
+        conn = sqlite3.connect(db_file, timeout=60, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS status ("
+            " instance_num INTEGER NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " name TEXT NOT NULL DEFAULT '',"
+            " worker_id TEXT NOT NULL,"
+            " PRIMARY KEY (instance_num, kind, name, worker_id))"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS status_kind_name ON status (kind, name)")
+        conn.execute("CREATE INDEX IF NOT EXISTS status_worker ON status (worker_id, kind)")
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Execute all enclosed operations in single transaction - context manager."""
+        conn = self.conn
+        # the connection is shared, nested transactions are part of the outer transaction
+        if conn.in_transaction:
+            yield
+            return
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def add(self, instance_num: int, kind: str, worker_id: str, name: str = "") -> None:
+        """Add status record."""
+        self.conn.execute(
+            "INSERT OR IGNORE INTO status (instance_num, kind, name, worker_id) "
+            "VALUES (?, ?, ?, ?)",
+            (instance_num, kind, name, worker_id),
+        )
+
+    @staticmethod
+    def _where(
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> tuple:
+        clauses = ["kind = ?"]
+        params: list = [kind]
+        if instance_num is not None:
+            clauses.append("instance_num = ?")
+            params.append(instance_num)
+        if worker_id is not None:
+            clauses.append("worker_id = ?")
+            params.append(worker_id)
+        if name is not None:
+            clauses.append("name = ?")
+            params.append(name)
+        return " AND ".join(clauses), params
+
+    def remove(
+        self,
+        instance_num: int,
+        kind: str,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> int:
+        """Remove matching status records, return number of removed records."""
+        where, params = self._where(
+            kind=kind, instance_num=instance_num, worker_id=worker_id, name=name
+        )
+        cur = self.conn.execute(f"DELETE FROM status WHERE {where}", params)
+        return int(cur.rowcount)
+
+    def query(
+        self,
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> List[StatusRecord]:
+        """Return matching status records.
+
+        When `instance_num` is not specified, search all cluster instances.
+        """
+        where, params = self._where(
+            kind=kind, instance_num=instance_num, worker_id=worker_id, name=name
+        )
+        cur = self.conn.execute(
+            f"SELECT instance_num, kind, name, worker_id FROM status WHERE {where}", params
+        )
+        return [StatusRecord(*r) for r in cur.fetchall()]
+
+    def exists(
+        self,
+        kind: str,
+        instance_num: Optional[int] = None,
+        worker_id: Optional[str] = None,
+        name: Optional[str] = None,
+    ) -> bool:
+        """Check if there's any matching status record."""
+        where, params = self._where(
+            kind=kind, instance_num=instance_num, worker_id=worker_id, name=name
+        )
+        cur = self.conn.execute(f"SELECT EXISTS (SELECT 1 FROM status WHERE {where})", params)
+        return bool(cur.fetchone()[0])
+
+
+BACKENDS: Dict[str, Type[SchedulingState]] = {
+    "sqlite": SQLiteState,
+    "files": FilesState,
+}
+
+
+def get_scheduling_state(pytest_tmp_dir: Path) -> SchedulingState:
+    """Return instance of the scheduling state backend indicated by configuration."""
+    backend = BACKENDS[configuration.SCHEDULING_STATE_BACKEND]
+    return backend(pytest_tmp_dir=pytest_tmp_dir)
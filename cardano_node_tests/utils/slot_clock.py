@@ -0,0 +1,278 @@
+"""Wall-clock model of slots and epochs of a cluster instance.
+
+The model is built from genesis files and the slots offset, so wall-clock time of any slot
+or epoch boundary can be computed without querying the node. Waits for slots and epochs are
+a single sleep followed by a query of the tip that confirms the wait.
+
+The tip of the node is the slot of the last block, so it is expected to lag behind the model by
+a few slots. When the tip is ahead of the model, or it lags too much, the node time diverges
+from the model and the waits fall back to polling the tip.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from datetime import timezone
+from pathlib import Path
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from cardano_clusterlib import clusterlib
+
+from cardano_node_tests.utils import active_slots
+
+LOGGER = logging.getLogger(__name__)
+
+# max difference between the local clock and the clock of the node
+CLOCK_TOLERANCE_SEC = 1.0
+# max number of (average) block intervals the tip can lag behind the model
+MAX_LAG_BLOCKS = 10
+# how long is the result of the drift check valid
+DRIFT_CHECK_INTERVAL_SEC = 600
+# default padding after epoch boundary, same as in `clusterlib.ClusterLib.wait_for_new_epoch`
+EPOCH_PADDING_SLOTS = 5
+
+
+def _parse_system_start(system_start: str) -> float:
+    """Convert e.g. "2020-07-08T02:39:16.033076859Z" to timestamp."""
+    date_str, __, fraction = system_start.rstrip("Z").partition(".")
+    converted_time = datetime.strptime(date_str, "%Y-%m-%dT%H:%M:%S")
+    timestamp = converted_time.replace(tzinfo=timezone.utc).timestamp()
+    return timestamp + float(f"0.{fraction}") if fraction else timestamp
+
+
+class SlotClock:
+    """Mapping of slots and epochs to wall-clock time.
+
+    The cluster starts in Byron era with `byron_epochs` epochs, followed by Shelley-based eras.
+    Number of Byron epochs is derived from the slots offset, the same way as
+    `clusterlib` does it.
+    """
+
+    def __init__(
+        self,
+        system_start: float,
+        slot_length: float,
+        epoch_length: int,
+        active_slots_coeff: float = 1.0,
+        slots_offset: int = 0,
+        byron_slot_length: float = 0.0,
+        byron_epoch_length: int = 0,
+    ) -> None:
+        self.system_start = system_start
+        self.slot_length = slot_length
+        self.epoch_length = epoch_length
+        self.slots_offset = slots_offset
+        self.byron_slot_length = byron_slot_length
+        self.byron_epoch_length = byron_epoch_length
+
+        self.byron_epochs = 0
+        if slots_offset and byron_epoch_length and epoch_length != byron_epoch_length:
+            self.byron_epochs = slots_offset // (epoch_length - byron_epoch_length)
+
+        self.shelley_start_slot = self.byron_epochs * byron_epoch_length
+        self.shelley_start_time = system_start + self.shelley_start_slot * byron_slot_length
+        self.max_lag_sec = MAX_LAG_BLOCKS * slot_length / active_slots_coeff
+        # time and result of the last drift check
+        self._drift_check: Tuple[float, bool] = (0.0, False)
+
+    def slot_time(self, slot: int) -> float:
+        """Return timestamp of start of the slot."""
+        if slot < self.shelley_start_slot:
+            return self.system_start + slot * self.byron_slot_length
+        return self.shelley_start_time + (slot - self.shelley_start_slot) * self.slot_length
+
+    def get_slot(self, timestamp: Optional[float] = None) -> int:
+        """Return slot number at the given time (now by default)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        if timestamp < self.shelley_start_time:
+            return int((timestamp - self.system_start) / self.byron_slot_length)
+        return self.shelley_start_slot + int(
+            (timestamp - self.shelley_start_time) / self.slot_length
+        )
+
+    def epoch_of_slot(self, slot: int) -> int:
+        if slot < self.shelley_start_slot:
+            return slot // self.byron_epoch_length
+        return (slot + self.slots_offset) // self.epoch_length
+
+    def epoch_first_slot(self, epoch: int) -> int:
+        if epoch < self.byron_epochs:
+            return epoch * self.byron_epoch_length
+        return epoch * self.epoch_length - self.slots_offset
+
+    def epoch_start_time(self, epoch: int) -> float:
+        """Return timestamp of start of the epoch."""
+        return self.slot_time(self.epoch_first_slot(epoch))
+
+    def get_epoch(self, timestamp: Optional[float] = None) -> int:
+        """Return epoch number at the given time (now by default)."""
+        return self.epoch_of_slot(self.get_slot(timestamp))
+
+    def time_from_epoch_start(self, timestamp: Optional[float] = None) -> float:
+        """How many seconds passed from start of the current epoch."""
+        timestamp = time.time() if timestamp is None else timestamp
+        return timestamp - self.epoch_start_time(self.get_epoch(timestamp))
+
+    def time_to_epoch_end(self, timestamp: Optional[float] = None) -> float:
+        """How many seconds to go to start of a new epoch."""
+        timestamp = time.time() if timestamp is None else timestamp
+        return self.epoch_start_time(self.get_epoch(timestamp) + 1) - timestamp
+
+    def sleep_until(self, timestamp: float) -> None:
+        """Sleep until the given time, the test can be suspended meanwhile."""
+        to_sleep = timestamp - time.time()
+        if to_sleep > 0:
+            if to_sleep > 15:
+                LOGGER.info(f"Waiting for {to_sleep:.2f} sec.")
+            active_slots.sleep(to_sleep)
+
+    def get_drift(self, tip: dict) -> float:
+        """Return how many seconds is the tip ahead of the model (negative when lagging)."""
+        return self.slot_time(int(tip["slot"])) - time.time()
+
+    def check_drift(self, tip: dict) -> bool:
+        """Check that the tip of the node is consistent with the model."""
+        drift = self.get_drift(tip)
+        if drift > self.slot_length + CLOCK_TOLERANCE_SEC or drift < -self.max_lag_sec:
+            LOGGER.warning(
+                f"Node time diverges from the slot clock model by {drift:.2f} sec "
+                f"(tip slot {tip['slot']}, model slot {self.get_slot()})."
+            )
+            self._drift_check = (time.time(), False)
+            return False
+        self._drift_check = (time.time(), True)
+        return True
+
+    def is_consistent(self, get_tip: Callable[[], dict]) -> bool:
+        """Check the model against the node tip, at most once per `DRIFT_CHECK_INTERVAL_SEC`."""
+        checked_at, result = self._drift_check
+        if time.time() - checked_at <= DRIFT_CHECK_INTERVAL_SEC:
+            return result
+        return self.check_drift(tip=get_tip())
+
+
+def _find_byron_genesis(state_dir: Path) -> Optional[Path]:
+    for genesis_file in (state_dir / "byron" / "genesis.json", state_dir / "genesis-byron.json"):
+        if genesis_file.exists():
+            return genesis_file
+    return None
+
+
+def _create_slot_clock(cluster_obj: clusterlib.ClusterLib) -> SlotClock:
+    genesis = cluster_obj.genesis
+    byron_slot_length = 0.0
+    byron_epoch_length = 0
+
+    genesis_byron = _find_byron_genesis(cluster_obj.state_dir) if cluster_obj.slots_offset else None
+    if genesis_byron:
+        with open(genesis_byron, encoding="utf-8") as in_json:
+            byron_dict = json.load(in_json)
+        byron_slot_length = int(byron_dict["blockVersionData"]["slotDuration"]) / 1000
+        byron_epoch_length = int(byron_dict["protocolConsts"]["k"]) * 10
+    elif cluster_obj.slots_offset:
+        LOGGER.warning("Byron genesis not found, slot clock model will not be accurate.")
+
+    return SlotClock(
+        system_start=_parse_system_start(genesis["systemStart"]),
+        slot_length=float(cluster_obj.slot_length),
+        epoch_length=int(cluster_obj.epoch_length),
+        active_slots_coeff=float(genesis["activeSlotsCoeff"]),
+        slots_offset=cluster_obj.slots_offset,
+        byron_slot_length=byron_slot_length,
+        byron_epoch_length=byron_epoch_length,
+    )
+
+
+class SlotClockCache:
+    """Cache slot clock for each cluster instance."""
+
+    # (state dir, system start, slots offset) -> slot clock
+    clocks: Dict[Tuple[str, str, int], SlotClock] = {}
+    lock = threading.Lock()
+
+
+def get_slot_clock(cluster_obj: clusterlib.ClusterLib) -> SlotClock:
+    """Return slot clock of the cluster instance, create it if needed."""
+    # the system start changes when the cluster instance is restarted
+    key = (str(cluster_obj.state_dir), cluster_obj.genesis["systemStart"], cluster_obj.slots_offset)
+    with SlotClockCache.lock:
+        clock = SlotClockCache.clocks.get(key)
+        if clock is None:
+            clock = _create_slot_clock(cluster_obj)
+            SlotClockCache.clocks[key] = clock
+    return clock
+
+
+class SlotClockClusterLib(clusterlib.ClusterLib):
+    """`ClusterLib` that waits for slots and epochs using the slot clock model."""
+
+    @property
+    def slot_clock(self) -> SlotClock:
+        return get_slot_clock(self)
+
+    def wait_for_slot(self, slot: int) -> int:
+        """Wait for slot number.
+
+        Sleep until the slot according to the model, then wait for block in the slot or later.
+
+        Args:
+            slot: A slot number to wait for.
+
+        Returns:
+            int: A slot number of last block.
+        """
+        clock = self.slot_clock
+        if clock.get_slot() < slot and clock.is_consistent(get_tip=self.get_tip):
+            clock.sleep_until(clock.slot_time(slot))
+        slot_no: int = super().wait_for_slot(slot=slot)
+        return slot_no
+
+    def wait_for_new_epoch(self, new_epochs: int = 1, padding_seconds: int = 0) -> int:
+        """Wait for new epoch(s).
+
+        Args:
+            new_epochs: A number of new epochs to wait for (optional).
+            padding_seconds: A number of additional seconds to wait for (optional).
+
+        Returns:
+            int: The current epoch.
+        """
+        tip = self.get_tip()
+        start_epoch = int(tip["epoch"])
+        if new_epochs < 1:
+            return start_epoch
+
+        clock = self.slot_clock
+        if not clock.check_drift(tip=tip):
+            epoch_no: int = super().wait_for_new_epoch(
+                new_epochs=new_epochs, padding_seconds=padding_seconds
+            )
+            return epoch_no
+
+        exp_epoch = start_epoch + new_epochs
+        LOGGER.debug(
+            f"Current epoch: {start_epoch}; Waiting for the beginning of epoch: {exp_epoch}"
+        )
+
+        # same padding as in `clusterlib.ClusterLib.wait_for_new_epoch`
+        padding_slots = (
+            int(padding_seconds / clock.slot_length) if padding_seconds else EPOCH_PADDING_SLOTS
+        )
+        exp_slot = clock.epoch_first_slot(exp_epoch) + padding_slots
+        clock.sleep_until(clock.slot_time(exp_slot))
+        # make sure the padding slot was really reached, even if no block was created
+        # in the new epoch yet
+        super().wait_for_slot(slot=exp_slot)
+
+        this_epoch = self.get_epoch()
+        if this_epoch != exp_epoch:
+            raise clusterlib.CLIError(
+                f"Waited for epoch number {exp_epoch} and current epoch is number {this_epoch}."
+            )
+
+        LOGGER.debug(f"Expected epoch started; epoch number: {this_epoch}")
+        return this_epoch
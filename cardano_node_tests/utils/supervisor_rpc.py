@@ -0,0 +1,164 @@
+"""Client for the XML-RPC interface of supervisord that manages cluster instance services.
+
+A client is kept for each supervisord port, so the HTTP connection to supervisord is reused
+between calls. Actions on multiple services are sent to supervisord in a single
+`system.multicall` request.
+"""
+import http.client
+import logging
+import threading
+import time
+import xmlrpc.client
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+
+LOGGER = logging.getLogger(__name__)
+
+# how long is a snapshot of services status considered fresh
+STATUS_TTL_SEC = 2.0
+# timeout for a single request to supervisord
+RPC_TIMEOUT_SEC = 120
+
+# supervisord fault codes that don't mean failure of the action
+FAULT_ALREADY_STARTED = 60
+FAULT_NOT_RUNNING = 70
+FAULT_SUCCESS = 80
+_OK_CODES = (FAULT_ALREADY_STARTED, FAULT_NOT_RUNNING, FAULT_SUCCESS)
+
+ACTIONS = ("start", "stop", "restart")
+
+
+class _TimeoutTransport(xmlrpc.client.Transport):
+    def make_connection(self, host: Any) -> http.client.HTTPConnection:
+        conn = super().make_connection(host)
+        conn.timeout = RPC_TIMEOUT_SEC
+        return conn
+
+
+def _get_calls(service_name: str, action: str) -> List[Dict[str, Any]]:
+    """Return `system.multicall` calls that perform the action on the service.
+
+    Service name ending with ":" stands for all services in the group, e.g. "nodes:".
+    """
+    if service_name.endswith(":"):
+        method_suffix, arg = "ProcessGroup", service_name[:-1]
+    else:
+        method_suffix, arg = "Process", service_name
+
+    actions = ("stop", "start") if action == "restart" else (action,)
+    return [
+        {"methodName": f"supervisor.{a}{method_suffix}", "params": [arg, True]} for a in actions
+    ]
+
+
+def _get_faults(results: List[Any]) -> List[str]:
+    """Return faults from `system.multicall` results, ignore faults about the state reached."""
+    faults: List[str] = []
+    for result in results:
+        # group actions return list of results for individual processes
+        items = result if isinstance(result, list) else [result]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            code = item.get("faultCode", item.get("status"))
+            if code in _OK_CODES:
+                continue
+            faults.append(
+                item.get("faultString") or f"{item.get('name')}: {item.get('description')}"
+            )
+    return faults
+
+
+class SupervisorClient:
+    """XML-RPC client of supervisord running on `port`."""
+
+    def __init__(self, port: int) -> None:
+        self.url = f"http://127.0.0.1:{port}/RPC2"
+        self._lock = threading.Lock()
+        self._proxy = self._get_proxy()
+        self._status: List[Dict[str, Any]] = []
+        self._status_time = 0.0
+
+    def _get_proxy(self) -> xmlrpc.client.ServerProxy:
+        return xmlrpc.client.ServerProxy(self.url, transport=_TimeoutTransport())
+
+    def _call(self, func: Callable[[xmlrpc.client.ServerProxy], Any]) -> Any:
+        """Call the RPC method, reconnect and try once more if the connection was lost."""
+        with self._lock:
+            try:
+                return func(self._proxy)
+            except (OSError, http.client.HTTPException) as err:
+                # supervisord may have been restarted since the last call
+                LOGGER.debug(f"Reconnecting to supervisord at '{self.url}': {err}")
+                self._proxy("close")()
+                self._proxy = self._get_proxy()
+            return func(self._proxy)
+
+    def get_all_process_info(self, max_age: float = 0.0) -> List[Dict[str, Any]]:
+        """Return info about all processes, the snapshot can be up to `max_age` seconds old."""
+        now = time.monotonic()
+        if max_age and now - self._status_time <= max_age:
+            return self._status
+
+        status: List[Dict[str, Any]] = self._call(lambda p: p.supervisor.getAllProcessInfo())
+        self._status, self._status_time = status, now
+        return status
+
+    def invalidate_status(self) -> None:
+        self._status_time = 0.0
+
+    def services_action(self, service_names: List[str], action: str) -> List[str]:
+        """Perform the action on all the services in a single request.
+
+        Args:
+            service_names: A list of service names, e.g. "nodes:pool1", "nodes:".
+            action: One of "start", "stop", "restart".
+
+        Returns:
+            List[str]: A list of faults reported by supervisord.
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Unknown action '{action}', expected one of {ACTIONS}.")
+        if not service_names:
+            return []
+
+        # stop all services first, so services that are restarted together are down together
+        calls = [c for s in service_names for c in _get_calls(service_name=s, action=action)]
+        calls.sort(key=lambda c: not c["methodName"].startswith("supervisor.stop"))
+
+        try:
+            results: List[Any] = self._call(lambda p: p.system.multicall(calls))
+        finally:
+            self.invalidate_status()
+        return _get_faults(results)
+
+    def close(self) -> None:
+        with self._lock:
+            self._proxy("close")()
+
+
+class SupervisorCache:
+    """Cache supervisord client for each supervisord port."""
+
+    clients: Dict[int, SupervisorClient] = {}
+    lock = threading.Lock()
+
+
+def get_client(port: int) -> SupervisorClient:
+    """Return client of supervisord running on `port`."""
+    with SupervisorCache.lock:
+        client: Optional[SupervisorClient] = SupervisorCache.clients.get(port)
+        if client is None:
+            client = SupervisorClient(port=port)
+            SupervisorCache.clients[port] = client
+    return client
+
+
+def get_namespec(process_info: Dict[str, Any]) -> str:
+    """Return service name in the same format as `supervisorctl` does."""
+    name: str = process_info["name"]
+    group: str = process_info["group"]
+    return name if name == group else f"{group}:{name}"
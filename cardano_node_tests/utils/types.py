@@ -8,3 +8,4 @@ FileType = Union[str, Path]
 FileTypeList = Union[List[str], List[Path], Set[str], Set[Path]]
 # list of `FileType`s, empty list, or empty tuple
 OptionalFiles = Union[FileTypeList, Tuple[()]]
+UnpackableSequence = Union[list, tuple, set, frozenset]
@@ -0,0 +1,132 @@
+"""Cache of UTxO queries.
+
+Ledger state, and so the result of `cardano-cli query utxo`, changes only when the node adopts
+a new block. Results of UTxO queries are cached and reused for as long as the tip of the queried
+node stays the same. The tip is read from Prometheus metrics of the node, which is much cheaper
+than spawning `cardano-cli`.
+
+The cache is enabled by setting `UTXO_CACHE`. With `UTXO_CACHE_CHECK`, the node is queried also
+on every cache hit and the results are compared.
+"""
+import logging
+import os
+from pathlib import Path
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+import requests
+
+from cardano_node_tests.utils import cli_cache
+from cardano_node_tests.utils import cluster_scripts
+from cardano_node_tests.utils import configuration
+from cardano_node_tests.utils.types import FileType
+from cardano_node_tests.utils.types import UnpackableSequence
+
+LOGGER = logging.getLogger(__name__)
+
+METRIC_BLOCK_NUM = "cardano_node_metrics_blockNum_int"
+METRIC_SLOT_NUM = "cardano_node_metrics_slotNum_int"
+METRICS_TIMEOUT_SEC = 2
+
+TipType = Tuple[int, int]
+
+
+def _get_instance_num(socket_path: Path) -> int:
+    """Return number of the cluster instance the socket belongs to."""
+    return int(socket_path.parent.name.replace("state-cluster", "") or 0)
+
+
+class UtxoCacheClusterLib(cli_cache.CliCacheClusterLib):
+    """`ClusterLib` that caches results of UTxO queries for as long as the chain tip is the same.
+
+    Only local cluster instances are supported, as the tip is read from the node metrics.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:  # type: ignore
+        super().__init__(*args, **kwargs)
+        # socket path -> (tip, {CLI args -> query output})
+        self._utxo_cache: Dict[str, Tuple[TipType, Dict[Tuple[str, ...], str]]] = {}
+        self._metrics_urls: Dict[str, str] = {}
+
+    def _get_metrics_url(self, socket_path: Path) -> str:
+        """Return URL of Prometheus metrics of the node that listens on the socket."""
+        url = self._metrics_urls.get(str(socket_path))
+        if url is not None:
+            return url
+
+        instance_ports = cluster_scripts.LocalScripts().get_instance_ports(
+            _get_instance_num(socket_path)
+        )
+        port = getattr(instance_ports, f"prometheus_{socket_path.stem}", None)
+        url = f"http://localhost:{port}/metrics" if port else ""
+        self._metrics_urls[str(socket_path)] = url
+        return url
+
+    def _get_tip(self, socket_path: Path) -> Optional[TipType]:
+        """Return block number and slot number of the chain tip of the node."""
+        url = self._get_metrics_url(socket_path)
+        if not url:
+            return None
+
+        try:
+            resp = requests.get(url, timeout=METRICS_TIMEOUT_SEC)
+        except requests.RequestException:
+            return None
+        if not resp.ok:
+            return None
+
+        block_num = slot_num = -1
+        for line in resp.text.splitlines():
+            if line.startswith(f"{METRIC_BLOCK_NUM} "):
+                block_num = int(line.split()[1])
+            elif line.startswith(f"{METRIC_SLOT_NUM} "):
+                slot_num = int(line.split()[1])
+
+        if block_num < 0 or slot_num < 0:
+            return None
+        return block_num, slot_num
+
+    def query_cli(self, cli_args: UnpackableSequence) -> str:
+        """Run the `cardano-cli query` command, reuse output of UTxO queries if possible."""
+        cli_args = list(cli_args)
+        if not (configuration.UTXO_CACHE and cli_args and cli_args[0] == "utxo"):
+            return super().query_cli(cli_args)
+
+        socket_path = os.environ.get("CARDANO_NODE_SOCKET_PATH") or ""
+        tip = self._get_tip(Path(socket_path)) if socket_path else None
+        if tip is None:
+            return super().query_cli(cli_args)
+
+        cache_key = tuple(str(a) for a in cli_args)
+        cached_tip, cached_results = self._utxo_cache.get(socket_path) or (None, {})
+        if cached_tip == tip and cache_key in cached_results:
+            cached_out = cached_results[cache_key]
+            if configuration.UTXO_CACHE_CHECK:
+                node_out = super().query_cli(cli_args)
+                assert node_out == cached_out, (
+                    f"Cached result of `query {' '.join(cache_key)}` doesn't match the node:\n"
+                    f"{cached_out}\nvs\n{node_out}"
+                )
+            return cached_out
+
+        out = super().query_cli(cli_args)
+
+        # the result is cached only if no block was adopted while the query was running
+        if self._get_tip(Path(socket_path)) == tip:
+            if cached_tip != tip:
+                cached_results = {}
+                self._utxo_cache[socket_path] = (tip, cached_results)
+            cached_results[cache_key] = out
+
+        return out
+
+    def submit_tx_bare(self, tx_file: FileType) -> None:
+        """Submit a transaction, don't do any verification that it made it to the chain."""
+        super().submit_tx_bare(tx_file=tx_file)
+        # the UTxO can't change before the next block, but keep the cache strictly conservative
+        self.clear_utxo_cache()
+
+    def clear_utxo_cache(self) -> None:
+        """Drop all cached results of UTxO queries."""
+        self._utxo_cache.clear()
@@ -0,0 +1,116 @@
+"""Wakeup notifications for pytest workers waiting for a cluster instance.
+
+Every waiting worker listens on its own Unix domain datagram socket. Worker that changes
+scheduling state in a way that can allow other tests to start (test finished, restart finished,
+resources released) sends a short datagram to sockets of all other workers. Waiting workers
+block on their sockets, with timeout as a safety net.
+
+Notifications carry no data, they just mean "scheduling state has changed, check again".
+"""
+import errno
+import logging
+import select
+import socket
+from pathlib import Path
+from typing import Dict
+
+from cardano_node_tests.utils import configuration
+
+LOGGER = logging.getLogger(__name__)
+
+WAKEUP_DIR = ".wakeup"
+SOCKET_SUFFIX = ".sock"
+# max length of Unix domain socket path is 108 bytes on Linux, including the terminating null
+MAX_SOCKET_PATH_LEN = 107
+
+
+class WakeupChannel:
+    """Wait for and send wakeup notifications."""
+
+    _socks: Dict[Path, socket.socket] = {}
+
+    def __init__(self, pytest_tmp_dir: Path, worker_id: str) -> None:
+        self.channel_dir = pytest_tmp_dir / WAKEUP_DIR
+        self.worker_id = worker_id
+        self.sock_path = self.channel_dir / f"{worker_id}{SOCKET_SUFFIX}"
+
+        # notifications make sense only when there are multiple workers
+        self.enabled = configuration.IS_XDIST
+        if self.enabled and len(str(self.sock_path)) > MAX_SOCKET_PATH_LEN:
+            LOGGER.warning(
+                f"Path '{self.sock_path}' is too long for a socket, wakeup notifications disabled."
+            )
+            self.enabled = False
+
+    def _get_sock(self) -> socket.socket:
+        """Return socket of this worker, shared by all instances in the worker."""
+        sock = self._socks.get(self.sock_path)
+        if sock is not None:
+            return sock
+
+        self.channel_dir.mkdir(parents=True, exist_ok=True)
+        self.sock_path.unlink(missing_ok=True)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(str(self.sock_path))
+        sock.setblocking(False)
+        self._socks[self.sock_path] = sock
+        return sock
+
+    def drain(self) -> None:
+        """Discard all pending notifications.
+
+        Must be called under the global cluster lock, before the scheduling state is checked.
+        Notifications that were sent before that are already reflected in the state.
+        """
+        if not self.enabled:
+            return
+
+        sock = self._get_sock()
+        while True:
+            try:
+                sock.recv(16)
+            except BlockingIOError:
+                return
+
+    def wait(self, timeout: float) -> bool:
+        """Wait for a notification for at most `timeout` seconds.
+
+        Returns:
+            bool: True if woken up by a notification, False on timeout.
+        """
+        if not self.enabled:
+            return False
+
+        readable, *__ = select.select([self._get_sock()], [], [], timeout)
+        return bool(readable)
+
+    def notify_all(self) -> None:
+        """Wake up all other workers that are waiting for a notification."""
+        if not self.enabled or not self.channel_dir.exists():
+            return
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            for sock_path in self.channel_dir.glob(f"*{SOCKET_SUFFIX}"):
+                if sock_path == self.sock_path:
+                    continue
+                try:
+                    sock.sendto(b"1", str(sock_path))
+                except OSError as err:
+                    # Full buffer means there are notifications pending already. The worker
+                    # might also be already finished and its socket no longer valid.
+                    if err.errno not in (
+                        errno.EAGAIN,
+                        errno.ECONNREFUSED,
+                        errno.ENOENT,
+                        errno.ENOBUFS,
+                    ):
+                        LOGGER.debug(f"Failed to send wakeup notification to '{sock_path}': {err}")
+
+    @classmethod
+    def close_all(cls) -> None:
+        """Close sockets of this worker."""
+        for sock_path, sock in cls._socks.items():
+            sock.close()
+            sock_path.unlink(missing_ok=True)
+        cls._socks.clear()